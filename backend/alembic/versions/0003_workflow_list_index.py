@@ -0,0 +1,27 @@
+"""add workflow listing index
+
+Revision ID: 0003_workflow_list_index
+Revises: 0002_templates_password_reset
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "0003_workflow_list_index"
+down_revision = "0002_templates_password_reset"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_workflows_owner_template_updated",
+        "workflows",
+        ["owner_id", "is_template", "updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_workflows_owner_template_updated", table_name="workflows")
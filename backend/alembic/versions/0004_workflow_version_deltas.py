@@ -0,0 +1,189 @@
+"""store workflow versions as deltas
+
+Revision ID: 0004_workflow_version_deltas
+Revises: 0003_workflow_list_index
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import copy
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_workflow_version_deltas"
+down_revision = "0003_workflow_list_index"
+branch_labels = None
+depends_on = None
+
+# Frozen copies of the delta helpers as of this revision, so later changes to app code can't alter the migration.
+SNAPSHOT_INTERVAL = 20
+HEADER_KEYS = ("id", "name", "updatedAt")
+GRAPH_KEYS = ("nodes", "edges")
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _json_equal(a, b) -> bool:
+    if type(a) is not type(b) or a != b:
+        return False
+    if isinstance(a, dict):
+        return all(_json_equal(value, b[key]) for key, value in a.items())
+    if isinstance(a, list):
+        return all(map(_json_equal, a, b))
+    return True
+
+
+def _diff(src, dst, path: str, ops: list) -> None:
+    if _json_equal(src, dst):
+        return
+    if isinstance(src, dict) and isinstance(dst, dict):
+        for key in src:
+            if key not in dst:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in dst.items():
+            child = f"{path}/{_escape(key)}"
+            if key in src:
+                _diff(src[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+        return
+    if isinstance(src, list) and isinstance(dst, list):
+        start = 0
+        while start < len(src) and start < len(dst) and _json_equal(src[start], dst[start]):
+            start += 1
+        end_src, end_dst = len(src), len(dst)
+        while end_src > start and end_dst > start and _json_equal(src[end_src - 1], dst[end_dst - 1]):
+            end_src -= 1
+            end_dst -= 1
+        common = min(end_src, end_dst) - start
+        for offset in range(common):
+            idx = start + offset
+            _diff(src[idx], dst[idx], f"{path}/{idx}", ops)
+        for idx in range(end_src - 1, start + common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{idx}"})
+        for idx in range(start + common, end_dst):
+            ops.append({"op": "add", "path": f"{path}/{idx}", "value": dst[idx]})
+        return
+    ops.append({"op": "replace", "path": path, "value": dst})
+
+
+def _graph_delta(previous: dict, current: dict) -> list:
+    ops = [{"op": "replace", "path": f"/{key}", "value": current[key]} for key in HEADER_KEYS]
+    _diff({key: previous.get(key) for key in GRAPH_KEYS}, {key: current.get(key) for key in GRAPH_KEYS}, "", ops)
+    return ops
+
+
+def _is_snapshot_due(version: int) -> bool:
+    return (version - 1) % SNAPSHOT_INTERVAL == 0
+
+
+def _tokens(pointer: str) -> list[str]:
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer.split("/")[1:]] if pointer else []
+
+
+def _resolve(doc, tokens: list[str]):
+    for token in tokens:
+        doc = doc[int(token) if isinstance(doc, list) else token]
+    return doc
+
+
+def _apply_op(doc, patch_op: dict):
+    # Stored deltas were validated when they were written, so no error handling here.
+    name = patch_op["op"]
+    if name == "test":
+        return doc
+    if name in ("move", "copy"):
+        value = _resolve(doc, _tokens(patch_op["from"]))
+        if name == "move":
+            doc = _apply_op(doc, {"op": "remove", "path": patch_op["from"]})
+        else:
+            value = copy.deepcopy(value)
+        return _apply_op(doc, {"op": "add", "path": patch_op["path"], "value": value})
+    tokens = _tokens(patch_op["path"])
+    if not tokens:
+        return patch_op["value"]
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, list):
+        idx = len(parent) if key == "-" else int(key)
+        if name == "add":
+            parent.insert(idx, patch_op["value"])
+        elif name == "remove":
+            del parent[idx]
+        else:
+            parent[idx] = patch_op["value"]
+    elif name == "remove":
+        del parent[key]
+    else:
+        parent[key] = patch_op["value"]
+    return doc
+
+
+def _apply_patch(doc, ops: list):
+    doc = copy.deepcopy(doc)
+    for patch_op in ops:
+        doc = _apply_op(doc, patch_op)
+    return doc
+
+
+def _workflow_ids(bind) -> list[str]:
+    return [row[0] for row in bind.execute(sa.text("SELECT DISTINCT workflow_id FROM workflow_versions"))]
+
+
+def upgrade() -> None:
+    op.add_column("workflow_versions", sa.Column("kind", sa.String(), nullable=False, server_default="snapshot"))
+    op.add_column("workflow_versions", sa.Column("base_version", sa.Integer(), nullable=True))
+    op.create_index(
+        "ix_workflow_versions_workflow_version",
+        "workflow_versions",
+        ["workflow_id", "version"],
+        unique=False,
+    )
+
+    bind = op.get_bind()
+    update = sa.text(
+        "UPDATE workflow_versions SET kind = 'delta', base_version = :base, data_json = :data WHERE id = :id"
+    )
+    for workflow_id in _workflow_ids(bind):
+        rows = bind.execute(
+            sa.text("SELECT id, version, data_json FROM workflow_versions WHERE workflow_id = :wid ORDER BY version"),
+            {"wid": workflow_id},
+        ).all()
+        previous = None
+        previous_version = None
+        for row_id, version, data_json in rows:
+            current = json.loads(data_json)
+            if previous is not None and not _is_snapshot_due(version):
+                delta_json = json.dumps(_graph_delta(previous, current))
+                if len(delta_json) < len(data_json):
+                    bind.execute(update, {"base": previous_version, "data": delta_json, "id": row_id})
+            previous = current
+            previous_version = version
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    update = sa.text("UPDATE workflow_versions SET data_json = :data WHERE id = :id")
+    for workflow_id in _workflow_ids(bind):
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, version, kind, base_version, data_json FROM workflow_versions "
+                "WHERE workflow_id = :wid ORDER BY version"
+            ),
+            {"wid": workflow_id},
+        ).all()
+        documents = {}
+        for row_id, version, kind, base_version, data_json in rows:
+            if kind == "snapshot":
+                documents[version] = json.loads(data_json)
+                continue
+            documents[version] = _apply_patch(documents[base_version], json.loads(data_json))
+            bind.execute(update, {"data": json.dumps(documents[version]), "id": row_id})
+
+    op.drop_index("ix_workflow_versions_workflow_version", table_name="workflow_versions")
+    op.drop_column("workflow_versions", "base_version")
+    op.drop_column("workflow_versions", "kind")
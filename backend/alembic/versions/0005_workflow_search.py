@@ -0,0 +1,95 @@
+"""add workflow full-text search index
+
+Revision ID: 0005_workflow_search
+Revises: 0004_workflow_version_deltas
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_workflow_search"
+down_revision = "0004_workflow_version_deltas"
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of the JSON column decoder as of this revision: compressed rows are bytes behind a two-byte marker.
+def _decode(value):
+    if value is None or isinstance(value, str):
+        return value
+    marker, payload = bytes(value[:2]), value[2:]
+    if marker == b"\x00z":
+        return zlib.decompress(payload).decode("utf-8")
+    if marker == b"\x00s":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    return bytes(value).decode("utf-8")
+
+
+def _document_fields(name: str, description: str | None, data: dict) -> dict[str, str]:
+    labels = []
+    descriptions = []
+    for node in data.get("nodes", []):
+        node_data = node.get("data") or {}
+        if node_data.get("label"):
+            labels.append(str(node_data["label"]))
+        if node_data.get("description"):
+            descriptions.append(str(node_data["description"]))
+    return {
+        "name": name,
+        "description": description or "",
+        "node_labels": "\n".join(labels),
+        "node_descriptions": "\n".join(descriptions),
+    }
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    op.create_table(
+        "workflow_search_ids",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("workflow_id", sa.String(), nullable=False),
+    )
+    op.create_index("ix_workflow_search_ids_workflow_id", "workflow_search_ids", ["workflow_id"], unique=True)
+    op.execute(
+        "CREATE VIRTUAL TABLE workflow_search USING fts5("
+        "workflow_id UNINDEXED, name, description, node_labels, node_descriptions, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+    select = sa.text(
+        "SELECT id, name, description, data_json FROM workflows WHERE id > :after ORDER BY id LIMIT :batch"
+    )
+    after = ""
+    while True:
+        rows = bind.execute(select, {"after": after, "batch": 500}).all()
+        if not rows:
+            break
+        for workflow_id, name, description, data_json in rows:
+            bind.execute(sa.text("INSERT INTO workflow_search_ids (workflow_id) VALUES (:id)"), {"id": workflow_id})
+            bind.execute(
+                sa.text(
+                    "INSERT INTO workflow_search "
+                    "(rowid, workflow_id, name, description, node_labels, node_descriptions) "
+                    "SELECT id, :id, :name, :description, :node_labels, :node_descriptions "
+                    "FROM workflow_search_ids WHERE workflow_id = :id"
+                ),
+                {"id": workflow_id, **_document_fields(name, description, json.loads(_decode(data_json)))},
+            )
+        after = rows[-1][0]
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TABLE workflow_search")
+    op.drop_index("ix_workflow_search_ids_workflow_id", table_name="workflow_search_ids")
+    op.drop_table("workflow_search_ids")
@@ -0,0 +1,43 @@
+"""add workflow runs
+
+Revision ID: 0006_workflow_runs
+Revises: 0005_workflow_search
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_workflow_runs"
+down_revision = "0005_workflow_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workflow_runs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("workflow_id", sa.String(), sa.ForeignKey("workflows.id"), nullable=False),
+        sa.Column("workflow_version", sa.Integer(), nullable=False),
+        sa.Column("actor_id", sa.String(), nullable=True),
+        sa.Column("trigger", sa.String(), nullable=False),
+        sa.Column("trigger_node_id", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("input_json", sa.Text(), nullable=True),
+        sa.Column("output_json", sa.Text(), nullable=True),
+        sa.Column("steps_json", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_workflow_runs_workflow_created", "workflow_runs", ["workflow_id", "created_at"], unique=False)
+    op.create_index("ix_workflow_runs_status", "workflow_runs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_workflow_runs_status", table_name="workflow_runs")
+    op.drop_index("ix_workflow_runs_workflow_created", table_name="workflow_runs")
+    op.drop_table("workflow_runs")
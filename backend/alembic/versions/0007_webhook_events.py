@@ -0,0 +1,36 @@
+"""add webhook events
+
+Revision ID: 0007_webhook_events
+Revises: 0006_workflow_runs
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_webhook_events"
+down_revision = "0006_workflow_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_events",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("workflow_id", sa.String(), sa.ForeignKey("workflows.id"), nullable=False),
+        sa.Column("node_id", sa.String(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=True),
+        sa.Column("payload_json", sa.Text(), nullable=True),
+        sa.Column("run_id", sa.String(), nullable=True),
+        sa.Column("received_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_webhook_events_workflow_received", "webhook_events", ["workflow_id", "received_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_events_workflow_received", table_name="webhook_events")
+    op.drop_table("webhook_events")
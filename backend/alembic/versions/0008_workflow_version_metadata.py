@@ -0,0 +1,112 @@
+"""add workflow version size and node count
+
+Revision ID: 0008_workflow_version_metadata
+Revises: 0007_webhook_events
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import copy
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_workflow_version_metadata"
+down_revision = "0007_webhook_events"
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of the JSON column decoder as of this revision: compressed rows are bytes behind a two-byte marker.
+def _decode(value):
+    if value is None or isinstance(value, str):
+        return value
+    marker, payload = bytes(value[:2]), value[2:]
+    if marker == b"\x00z":
+        return zlib.decompress(payload).decode("utf-8")
+    if marker == b"\x00s":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    return bytes(value).decode("utf-8")
+
+
+# Frozen JSON Patch applier for stored deltas.
+def _tokens(pointer: str) -> list[str]:
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer.split("/")[1:]] if pointer else []
+
+
+def _resolve(doc, tokens: list[str]):
+    for token in tokens:
+        doc = doc[int(token) if isinstance(doc, list) else token]
+    return doc
+
+
+def _apply_op(doc, patch_op: dict):
+    # Stored deltas were validated when they were written, so no error handling here.
+    name = patch_op["op"]
+    if name == "test":
+        return doc
+    if name in ("move", "copy"):
+        value = _resolve(doc, _tokens(patch_op["from"]))
+        if name == "move":
+            doc = _apply_op(doc, {"op": "remove", "path": patch_op["from"]})
+        else:
+            value = copy.deepcopy(value)
+        return _apply_op(doc, {"op": "add", "path": patch_op["path"], "value": value})
+    tokens = _tokens(patch_op["path"])
+    if not tokens:
+        return patch_op["value"]
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, list):
+        idx = len(parent) if key == "-" else int(key)
+        if name == "add":
+            parent.insert(idx, patch_op["value"])
+        elif name == "remove":
+            del parent[idx]
+        else:
+            parent[idx] = patch_op["value"]
+    elif name == "remove":
+        del parent[key]
+    else:
+        parent[key] = patch_op["value"]
+    return doc
+
+
+def _apply_patch(doc, ops: list):
+    doc = copy.deepcopy(doc)
+    for patch_op in ops:
+        doc = _apply_op(doc, patch_op)
+    return doc
+
+
+def upgrade() -> None:
+    op.add_column("workflow_versions", sa.Column("size", sa.Integer(), nullable=True))
+    op.add_column("workflow_versions", sa.Column("node_count", sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    update = sa.text("UPDATE workflow_versions SET size = :size, node_count = :nodes WHERE id = :id")
+    workflow_ids = [row[0] for row in bind.execute(sa.text("SELECT DISTINCT workflow_id FROM workflow_versions"))]
+    for workflow_id in workflow_ids:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, version, kind, base_version, data_json FROM workflow_versions "
+                "WHERE workflow_id = :wid ORDER BY version"
+            ),
+            {"wid": workflow_id},
+        ).all()
+        documents = {}
+        for row_id, version, kind, base_version, data_json in rows:
+            data = json.loads(_decode(data_json))
+            if kind != "snapshot":
+                data = _apply_patch(documents[base_version], data)
+            documents[version] = data
+            bind.execute(update, {"size": len(json.dumps(data)), "nodes": len(data.get("nodes", [])), "id": row_id})
+
+
+def downgrade() -> None:
+    op.drop_column("workflow_versions", "node_count")
+    op.drop_column("workflow_versions", "size")
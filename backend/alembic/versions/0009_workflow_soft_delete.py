@@ -0,0 +1,25 @@
+"""add workflow soft delete
+
+Revision ID: 0009_workflow_soft_delete
+Revises: 0008_workflow_version_metadata
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_workflow_soft_delete"
+down_revision = "0008_workflow_version_metadata"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("workflows", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_workflows_deleted_at", "workflows", ["deleted_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_workflows_deleted_at", table_name="workflows")
+    op.drop_column("workflows", "deleted_at")
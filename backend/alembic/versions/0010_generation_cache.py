@@ -0,0 +1,32 @@
+"""add generation cache
+
+Revision ID: 0010_generation_cache
+Revises: 0009_workflow_soft_delete
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_generation_cache"
+down_revision = "0009_workflow_soft_delete"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "generation_cache",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("response_json", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_generation_cache_created_at", "generation_cache", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_generation_cache_created_at", table_name="generation_cache")
+    op.drop_table("generation_cache")
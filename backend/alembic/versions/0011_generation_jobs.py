@@ -0,0 +1,40 @@
+"""add generation jobs
+
+Revision ID: 0011_generation_jobs
+Revises: 0010_generation_cache
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_generation_jobs"
+down_revision = "0010_generation_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "generation_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("actor_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("request_json", sa.Text(), nullable=False),
+        sa.Column("result_json", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("error_status", sa.Integer(), nullable=True),
+        sa.Column("cache", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_generation_jobs_status", "generation_jobs", ["status"], unique=False)
+    op.create_index("ix_generation_jobs_actor_created", "generation_jobs", ["actor_id", "created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_generation_jobs_actor_created", table_name="generation_jobs")
+    op.drop_index("ix_generation_jobs_status", table_name="generation_jobs")
+    op.drop_table("generation_jobs")
@@ -0,0 +1,57 @@
+"""record compressed workflow JSON columns
+
+Revision ID: 0012_workflow_json_codec
+Revises: 0011_generation_jobs
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_workflow_json_codec"
+down_revision = "0011_generation_jobs"
+branch_labels = None
+depends_on = None
+
+# workflows.data_json and workflow_versions.data_json may hold compressed bytes (see app.db.types) since the
+# codec was introduced. Plain-text rows stay readable, so upgrading changes nothing; downgrading writes every
+# compressed row back as plain text, which is what the earlier revisions and their code expect.
+TABLES = ("workflows", "workflow_versions")
+BATCH_SIZE = 500
+
+
+# Frozen copy of the JSON column decoder as of this revision: compressed rows are bytes behind a two-byte marker.
+def _decode(value):
+    if value is None or isinstance(value, str):
+        return value
+    marker, payload = bytes(value[:2]), value[2:]
+    if marker == b"\x00z":
+        return zlib.decompress(payload).decode("utf-8")
+    if marker == b"\x00s":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    return bytes(value).decode("utf-8")
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table in TABLES:
+        select = sa.text(f"SELECT id, data_json FROM {table} WHERE id > :after ORDER BY id LIMIT :batch")
+        update = sa.text(f"UPDATE {table} SET data_json = :data WHERE id = :id")
+        after = ""
+        while True:
+            rows = bind.execute(select, {"after": after, "batch": BATCH_SIZE}).all()
+            if not rows:
+                break
+            for row_id, data_json in rows:
+                if not isinstance(data_json, str):
+                    bind.execute(update, {"data": _decode(data_json), "id": row_id})
+            after = rows[-1][0]
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, users, workflows, generate, audit
+from app.api.routes import auth, users, workflows, generate, audit, metrics, runs, hooks, versions
 
 api_router = APIRouter()
 
@@ -8,4 +8,8 @@ api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(workflows.router, prefix="/workflows", tags=["workflows"])
 api_router.include_router(generate.router, prefix="/workflows", tags=["generate"])
+api_router.include_router(versions.router, prefix="/workflows", tags=["versions"])
+api_router.include_router(runs.router, prefix="/workflows", tags=["runs"])
+api_router.include_router(hooks.router, prefix="/hooks", tags=["hooks"])
 api_router.include_router(audit.router, prefix="/audit", tags=["audit"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -1,26 +1,172 @@
+import json
 import logging
+from datetime import datetime
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.deps import get_current_user, get_db
-from app.schemas.workflow import GenerateRequest, GenerateResponse
-from app.services.generate import generate_workflow
+from app.db.session import SessionLocal
+from app.models.generation_job import GenerationJob
+from app.models.user import User
+from app.schemas.workflow import GenerateRequest, GenerateResponse, GenerationJobOut, WorkflowData
+from app.services.generate import generate_workflow, generation_error, stream_workflow
+from app.services.generation_cache import cache_status, generation_cache
+from app.services.generation_jobs import JobQueueFull, fail_job, generation_jobs
+from app.services.generation_limits import GenerationBusy, generation_limiter
 from app.services.audit import log_event
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _log_generate(actor_id: str, workflow_id: str) -> None:
+    db = SessionLocal()
+    try:
+        log_event(db, action="workflow.generate", actor_id=actor_id, target_type="workflow", target_id=workflow_id)
+    finally:
+        db.close()
+
+
+def _ms(start: datetime | None, end: datetime | None) -> int | None:
+    return int((end - start).total_seconds() * 1000) if start and end else None
+
+
+def _job_to_out(job: GenerationJob) -> GenerationJobOut:
+    return GenerationJobOut(
+        id=job.id,
+        status=job.status,
+        cache=job.cache,
+        workflow=WorkflowData.model_validate_json(job.result_json) if job.result_json else None,
+        error=job.error,
+        error_status=job.error_status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        queue_ms=_ms(job.created_at, job.started_at),
+        duration_ms=_ms(job.started_at, job.finished_at),
+    )
+
+
+def _create_job(db: Session, payload: GenerateRequest, user: User) -> GenerationJobOut:
+    job = GenerationJob(
+        actor_id=user.id,
+        status="queued",
+        request_json=payload.model_dump_json(),
+        created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    return _job_to_out(job)
+
+
+def _load_job(db: Session, job_id: str, user: User) -> GenerationJobOut:
+    db.expire_all()
+    query = db.query(GenerationJob).filter(GenerationJob.id == job_id)
+    if user.role != "admin":
+        query = query.filter(GenerationJob.actor_id == user.id)
+    job = query.first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return _job_to_out(job)
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
 @router.post("/generate", response_model=GenerateResponse)
-def generate(payload: GenerateRequest, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def generate(
+    payload: GenerateRequest, response: Response, db: Session = Depends(get_db), user=Depends(get_current_user)
+):
+    key, cached = await generation_cache.lookup(payload)
     try:
-        workflow = generate_workflow(payload)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+        workflow = await generate_workflow(payload, key, user.id, cached)
     except Exception as exc:  # noqa: BLE001
-        logger.exception("Workflow generation failed")
-        raise HTTPException(status_code=500, detail="Generation failed") from exc
+        status_code, detail = generation_error(exc)
+        headers = {"Retry-After": "1"} if status_code == 429 else None
+        raise HTTPException(status_code=status_code, detail=detail, headers=headers) from exc
 
-    log_event(db, action="workflow.generate", actor_id=user.id, target_type="workflow", target_id=workflow.id)
+    response.headers["X-Generation-Cache"] = cache_status(payload, cached)
+    await run_in_threadpool(
+        log_event, db, action="workflow.generate", actor_id=user.id, target_type="workflow", target_id=workflow.id
+    )
     return GenerateResponse(workflow=workflow)
+
+
+@router.post("/generate/stream")
+async def generate_stream(payload: GenerateRequest, user=Depends(get_current_user)):
+    key, cached = await generation_cache.lookup(payload)
+    if cached is None and not settings.OPENAI_API_KEY:
+        raise HTTPException(status_code=400, detail="OPENAI_API_KEY is not configured")
+    actor_id = user.id
+    slot = None
+    if cached is None:
+        try:
+            slot = await generation_limiter.acquire(actor_id)
+        except GenerationBusy as exc:
+            raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+    async def events():
+        try:
+            async for kind, item in stream_workflow(payload, key, cached):
+                if kind == "workflow":
+                    await run_in_threadpool(_log_generate, actor_id, item.id)
+                    yield _sse("workflow", GenerateResponse(workflow=item).model_dump(mode="json"))
+                else:
+                    yield _sse(kind, item)
+        except Exception as exc:  # noqa: BLE001
+            status_code, detail = generation_error(exc)
+            yield _sse("error", {"status": status_code, "detail": detail})
+        finally:
+            if slot is not None:
+                slot.release()
+
+    body = events()
+    if slot is not None:
+        slot.release_with(body)
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Generation-Cache": cache_status(payload, cached),
+        },
+    )
+
+
+@router.post("/generate/jobs", response_model=GenerationJobOut, status_code=202)
+async def submit_generation_job(
+    payload: GenerateRequest, db: Session = Depends(get_db), user: User = Depends(get_current_user)
+):
+    if generation_jobs.full():
+        raise HTTPException(status_code=429, detail="Generation job queue is full", headers={"Retry-After": "5"})
+    job = await run_in_threadpool(_create_job, db, payload, user)
+    try:
+        generation_jobs.submit(job.id)
+    except JobQueueFull as exc:
+        # Filled up while the row was being written.
+        await run_in_threadpool(fail_job, job.id, "Generation job queue is full", 429)
+        raise HTTPException(
+            status_code=429, detail="Generation job queue is full", headers={"Retry-After": "5"}
+        ) from exc
+    return job
+
+
+@router.get("/generate/jobs/{job_id}", response_model=GenerationJobOut)
+async def get_generation_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+    wait: float = Query(default=0, ge=0, le=60, description="long-poll up to this many seconds"),
+):
+    job = await run_in_threadpool(_load_job, db, job_id, user)
+    if wait and job.status in ("queued", "running"):
+        await generation_jobs.wait(job_id, wait)
+        job = await run_in_threadpool(_load_job, db, job_id, user)
+    return job
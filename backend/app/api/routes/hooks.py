@@ -0,0 +1,76 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import get_current_user, get_db, get_owned_workflow
+from app.models.user import User
+from app.models.webhook_event import WebhookEvent
+from app.schemas.run import WebhookEventOut
+from app.services.webhooks import QueueFull, webhooks
+
+router = APIRouter()
+
+
+@router.post("/{workflow_id}/{node_id}", status_code=202)
+async def receive_webhook(workflow_id: str, node_id: str, request: Request):
+    route = await webhooks.resolve(workflow_id, node_id)
+    if route is None:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    if not webhooks.check_secret(route, request.headers.get("x-webhook-secret")):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.WEBHOOK_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Payload too large")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.WEBHOOK_MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Payload too large")
+
+    content_type = request.headers.get("content-type")
+    text = body.decode("utf-8", errors="replace")
+    if content_type and content_type.split(";")[0].strip().endswith("json"):
+        try:
+            json.loads(text or "null")
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Invalid JSON body") from exc
+        payload = text or "null"
+    else:
+        payload = json.dumps(text)
+    try:
+        event_id = webhooks.submit(workflow_id, node_id, route, content_type, payload)
+    except QueueFull:
+        return JSONResponse(
+            status_code=429, content={"detail": "Too many webhook events"}, headers={"Retry-After": "1"}
+        )
+    return {"accepted": True, "event_id": event_id}
+
+
+@router.get("/{workflow_id}/events", response_model=list[WebhookEventOut])
+def list_webhook_events(
+    workflow_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    node_id: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    query = db.query(WebhookEvent).filter(WebhookEvent.workflow_id == workflow.id)
+    if node_id:
+        query = query.filter(WebhookEvent.node_id == node_id)
+    events = query.order_by(WebhookEvent.received_at.desc()).limit(limit).all()
+    return [
+        WebhookEventOut(
+            id=event.id,
+            workflow_id=event.workflow_id,
+            node_id=event.node_id,
+            content_type=event.content_type,
+            payload=json.loads(event.payload_json) if event.payload_json else None,
+            run_id=event.run_id,
+            received_at=event.received_at,
+        )
+        for event in events
+    ]
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+
+from app.core.deps import get_current_admin
+from app.services.diff import diff_cache_stats
+from app.services.generate import repair_stats
+from app.services.generation_cache import generation_cache
+from app.services.generation_jobs import generation_jobs
+from app.services.generation_limits import generation_flights, generation_limiter
+from app.services.graph import report_cache_stats
+from app.services.retention import retention
+from app.services.runs import runner_stats
+from app.services.scheduler import scheduler
+from app.services.threadpool import threadpool_stats
+from app.services.webhooks import webhooks
+from app.services.workflow_cache import cache_stats
+
+router = APIRouter()
+
+
+@router.get("", dependencies=[Depends(get_current_admin)])
+def get_metrics():
+    return {
+        "workflow_cache": cache_stats(),
+        "graph_report_cache": report_cache_stats(),
+        "version_diff_cache": diff_cache_stats(),
+        "generation_cache": generation_cache.stats(),
+        "generation": {
+            **generation_limiter.stats(),
+            **generation_flights.stats(),
+            "repair": repair_stats.stats(),
+        },
+        "generation_jobs": generation_jobs.stats(),
+        "runs": runner_stats(),
+        "scheduler": scheduler.stats(),
+        "webhooks": webhooks.stats(),
+        "retention": retention.stats(),
+        "threadpool": threadpool_stats(),
+    }
@@ -0,0 +1,96 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_current_user, get_db, get_owned_workflow
+from app.models.user import User
+from app.models.workflow_run import WorkflowRun
+from app.schemas.run import RunCreate, WorkflowRunOut, WorkflowRunSummaryOut
+from app.services.audit import log_event
+from app.services.graph import analyze_graph_cached
+from app.services.runs import add_run, start_run
+
+router = APIRouter()
+
+
+def _run_to_out(run: WorkflowRun) -> WorkflowRunOut:
+    return WorkflowRunOut(
+        id=run.id,
+        workflow_id=run.workflow_id,
+        workflow_version=run.workflow_version,
+        actor_id=run.actor_id,
+        trigger=run.trigger,
+        trigger_node_id=run.trigger_node_id,
+        status=run.status,
+        input=json.loads(run.input_json) if run.input_json else None,
+        output=json.loads(run.output_json) if run.output_json else None,
+        steps=json.loads(run.steps_json) if run.steps_json else None,
+        error=run.error,
+        created_at=run.created_at,
+        started_at=run.started_at,
+        finished_at=run.finished_at,
+    )
+
+
+def _create_run(db: Session, workflow_id: str, payload: RunCreate, user: User) -> str:
+    workflow = get_owned_workflow(db, workflow_id, user)
+    data = json.loads(workflow.data_json)
+    report = analyze_graph_cached(data.get("nodes", []), data.get("edges", []))
+    if not report.valid:
+        raise HTTPException(status_code=422, detail=[issue.model_dump() for issue in report.errors])
+    if payload.node_id is not None and payload.node_id not in report.start_nodes:
+        raise HTTPException(status_code=400, detail="node_id must be a start or trigger node")
+    run = add_run(db, workflow, actor_id=user.id, trigger_node_id=payload.node_id, payload=payload.input)
+    db.flush()
+    log_event(db, action="workflow.run", actor_id=user.id, target_type="workflow_run", target_id=run.id)
+    return run.id
+
+
+def _load_run(db: Session, workflow_id: str, run_id: str, user: User) -> WorkflowRunOut:
+    workflow = get_owned_workflow(db, workflow_id, user)
+    run = db.query(WorkflowRun).filter(WorkflowRun.id == run_id, WorkflowRun.workflow_id == workflow.id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return _run_to_out(run)
+
+
+@router.post("/{workflow_id}/runs", response_model=WorkflowRunOut)
+async def create_run(
+    workflow_id: str,
+    payload: RunCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    wait: bool = Query(default=False),
+):
+    run_id = await run_in_threadpool(_create_run, db, workflow_id, payload, current_user)
+    task = start_run(run_id)
+    if wait:
+        await task
+    return await run_in_threadpool(_load_run, db, workflow_id, run_id, current_user)
+
+
+@router.get("/{workflow_id}/runs", response_model=list[WorkflowRunSummaryOut])
+def list_runs(
+    workflow_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    status: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    query = db.query(WorkflowRun).filter(WorkflowRun.workflow_id == workflow.id)
+    if status:
+        query = query.filter(WorkflowRun.status == status)
+    return query.order_by(WorkflowRun.created_at.desc()).limit(limit).all()
+
+
+@router.get("/{workflow_id}/runs/{run_id}", response_model=WorkflowRunOut)
+def get_run(
+    workflow_id: str,
+    run_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _load_run(db, workflow_id, run_id, current_user)
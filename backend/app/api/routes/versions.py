@@ -0,0 +1,105 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_current_user, get_db, get_owned_workflow
+from app.models.user import User
+from app.models.workflow_version import WorkflowVersion
+from app.schemas.workflow import VersionDiff, WorkflowOut, WorkflowVersionOut, WorkflowVersionSummary
+from app.services.audit import log_event
+from app.services.diff import diff_versions
+from app.services.versions import materialize_version
+from app.services.workflow_cache import invalidate_workflow
+from app.services.workflow_store import save_graph, workflow_to_out
+
+router = APIRouter()
+
+
+def _version_row(db: Session, workflow_id: str, version: int):
+    row = (
+        db.query(WorkflowVersion.version, WorkflowVersion.created_at, WorkflowVersion.size, WorkflowVersion.node_count)
+        .filter(WorkflowVersion.workflow_id == workflow_id, WorkflowVersion.version == version)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return row
+
+
+@router.get("/{workflow_id}/versions", response_model=list[WorkflowVersionSummary])
+def list_versions(
+    workflow_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: int | None = Query(default=None, description="version to continue below"),
+):
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    query = db.query(
+        WorkflowVersion.version, WorkflowVersion.created_at, WorkflowVersion.size, WorkflowVersion.node_count
+    ).filter(WorkflowVersion.workflow_id == workflow.id)
+    if cursor is not None:
+        query = query.filter(WorkflowVersion.version < cursor)
+    rows = query.order_by(WorkflowVersion.version.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1].version)
+    return [WorkflowVersionSummary.model_validate(row) for row in rows]
+
+
+@router.get("/{workflow_id}/versions/{version}", response_model=WorkflowVersionOut)
+def get_version(
+    workflow_id: str,
+    version: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    row = _version_row(db, workflow.id, version)
+    data = materialize_version(db, workflow.id, version)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return WorkflowVersionOut(
+        version=row.version, created_at=row.created_at, size=row.size, node_count=row.node_count, data=data
+    )
+
+
+@router.post("/{workflow_id}/versions/{version}/restore", response_model=WorkflowOut)
+def restore_version(
+    workflow_id: str,
+    version: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    data = materialize_version(db, workflow.id, version)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    save_graph(db, workflow, data, previous=json.loads(workflow.data_json))
+    log_event(
+        db,
+        action="workflow.restore",
+        actor_id=current_user.id,
+        target_type="workflow",
+        target_id=workflow.id,
+        meta={"version": version},
+    )
+    invalidate_workflow(workflow.id)
+    return workflow_to_out(workflow)
+
+
+@router.get("/{workflow_id}/versions/{from_version}/diff/{to_version}", response_model=VersionDiff)
+def diff_workflow_versions(
+    workflow_id: str,
+    from_version: int,
+    to_version: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    result = diff_versions(db, workflow.id, from_version, to_version)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return result
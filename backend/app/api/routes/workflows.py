@@ -1,42 +1,78 @@
+import base64
+import binascii
 import json
+import zlib
 from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, defer
 
-from app.core.deps import get_current_admin, get_current_user, get_db
+from app.core.deps import get_current_admin, get_current_user, get_db, get_owned_workflow
 from app.models.user import User
 from app.models.workflow import Workflow
-from app.models.workflow_version import WorkflowVersion
-from app.schemas.workflow import WorkflowCreate, WorkflowEnvelope, WorkflowOut, WorkflowUpdate
-from app.services.audit import log_event
+from app.schemas.workflow import (
+    GraphReport,
+    WorkflowBatchRequest,
+    WorkflowBatchResponse,
+    WorkflowBatchResult,
+    WorkflowCreate,
+    WorkflowData,
+    WorkflowEnvelope,
+    WorkflowOut,
+    WorkflowPatch,
+    WorkflowSearchHit,
+    WorkflowSummaryOut,
+    WorkflowUpdate,
+)
+from app.services.audit import log_event, log_events
+from app.services.bulk import (
+    IMPORT_BATCH_SIZE,
+    MAX_REPORTED_ERRORS,
+    ImportTooLarge,
+    gzip_chunks,
+    insert_workflows,
+    iter_export_lines,
+    iter_ndjson_lines,
+    log_bulk_import,
+)
+from app.services.graph import analyze_graph_cached
+from app.services.graph_patch import GraphPatchValidationError, apply_graph_patch
+from app.services.json_patch import JsonPatchError, JsonPatchTestFailed
+from app.services.layout import apply_layout
+from app.services.search import search_workflows
+from app.services.workflow_store import (
+    add_duplicate,
+    add_workflow,
+    delete_workflows,
+    save_graph,
+    update_workflow_fields,
+    workflow_to_out,
+)
+from app.services.workflow_json import envelope_json, workflow_list_json, workflow_out_json
+from app.services.workflow_cache import get_workflow_data, invalidate_workflow
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
 
-def _workflow_to_out(workflow: Workflow) -> WorkflowOut:
-    data = json.loads(workflow.data_json)
-    return WorkflowOut(
-        id=workflow.id,
-        owner_id=workflow.owner_id,
-        name=workflow.name,
-        description=workflow.description,
-        is_template=workflow.is_template,
-        version=workflow.version,
-        data=data,
-        created_at=workflow.created_at,
-        updated_at=workflow.updated_at,
-    )
+
+def _encode_cursor(workflow: Workflow) -> str:
+    raw = f"{workflow.updated_at.isoformat()}|{workflow.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
 
 
-def _get_workflow(db: Session, workflow_id: str, user: User) -> Workflow:
-    query = db.query(Workflow).filter(Workflow.id == workflow_id)
-    if user.role != "admin":
-        query = query.filter(Workflow.owner_id == user.id)
-    workflow = query.first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    return workflow
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        updated_at, workflow_id = raw.split("|", 1)
+        return datetime.fromisoformat(updated_at), workflow_id
+    except (ValueError, binascii.Error) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
 
 
 @router.post("", response_model=WorkflowOut)
@@ -45,56 +81,220 @@ def create_workflow(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    workflow = Workflow(
+    workflow = add_workflow(
+        db,
         owner_id=current_user.id,
         name=payload.name,
+        data=payload.data.model_dump(),
         description=payload.description,
         is_template=payload.is_template,
-        version=1,
-        data_json="{}",
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
     )
-    db.add(workflow)
-    db.commit()
-    db.refresh(workflow)
-
-    data = payload.data.model_dump()
-    data["id"] = workflow.id
-    data["name"] = workflow.name
-    data["updatedAt"] = datetime.utcnow().isoformat()
-    workflow.data_json = json.dumps(data)
-    db.add(workflow)
-    db.commit()
+    log_event(db, action="workflow.create", actor_id=current_user.id, target_type="workflow", target_id=workflow.id)
+    return workflow_to_out(workflow)
 
-    version = WorkflowVersion(
-        workflow_id=workflow.id,
-        version=1,
-        data_json=workflow.data_json,
-        created_at=datetime.utcnow(),
-    )
-    db.add(version)
-    db.commit()
 
-    log_event(db, action="workflow.create", actor_id=current_user.id, target_type="workflow", target_id=workflow.id)
-    return _workflow_to_out(workflow)
+@router.post(":batch", response_model=WorkflowBatchResponse)
+def batch_workflows(
+    payload: WorkflowBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    target_ids = {op.id for op in payload.ops if op.op != "create"}
+    targets: dict[str, Workflow] = {}
+    if target_ids:
+        query = db.query(Workflow).filter(Workflow.id.in_(target_ids), Workflow.deleted_at.is_(None))
+        if current_user.role != "admin":
+            query = query.filter(Workflow.owner_id == current_user.id)
+        targets = {workflow.id: workflow for workflow in query.all()}
+
+    results: list[WorkflowBatchResult] = []
+    events: list[dict] = []
+    staged: list[tuple[WorkflowBatchResult, Workflow]] = []
+    deleted: list[Workflow] = []
+    for index, op in enumerate(payload.ops):
+        if op.op == "create":
+            workflow = add_workflow(
+                db,
+                owner_id=current_user.id,
+                name=op.workflow.name,
+                data=op.workflow.data.model_dump(),
+                description=op.workflow.description,
+                is_template=op.workflow.is_template,
+            )
+        else:
+            workflow = targets.get(op.id)
+            if workflow is None:
+                result = WorkflowBatchResult(
+                    index=index, op=op.op, ok=False, status=404, id=op.id, error="Workflow not found"
+                )
+                results.append(result)
+                continue
+            if op.op == "update":
+                update_workflow_fields(db, workflow, op.changes)
+            elif op.op == "duplicate":
+                workflow = add_duplicate(db, workflow)
+            else:
+                deleted.append(targets.pop(op.id))
+        result = WorkflowBatchResult(index=index, op=op.op, ok=True, status=200, id=workflow.id)
+        results.append(result)
+        if op.op != "delete":
+            staged.append((result, workflow))
+        events.append(
+            {
+                "action": f"workflow.{op.op}",
+                "actor_id": current_user.id,
+                "target_type": "workflow",
+                "target_id": workflow.id,
+            }
+        )
+
+    delete_workflows(db, deleted)
+    db.flush()
+    for result, workflow in staged:
+        result.version = workflow.version
+    events.append(
+        {
+            "action": "workflow.batch",
+            "actor_id": current_user.id,
+            "meta": {"ops": len(payload.ops), "failed": sum(not result.ok for result in results)},
+        }
+    )
+    log_events(db, events)
+    for workflow_id in target_ids:
+        invalidate_workflow(workflow_id)
+    return WorkflowBatchResponse(results=results)
 
 
-@router.get("", response_model=list[WorkflowOut])
+@router.get("", response_model=list[WorkflowOut] | list[WorkflowSummaryOut])
 def list_workflows(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     templates: str | None = Query(default=None, description="only|exclude"),
+    fields: str | None = Query(default=None, description="summary"),
+    limit: int | None = Query(default=None, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    raw: bool = Query(default=False),
 ):
-    query = db.query(Workflow)
+    query = db.query(Workflow).filter(Workflow.deleted_at.is_(None))
+    if fields == "summary":
+        query = query.options(defer(Workflow.data_json))
     if current_user.role != "admin":
         query = query.filter(Workflow.owner_id == current_user.id)
     if templates == "only":
         query = query.filter(Workflow.is_template.is_(True))
     elif templates == "exclude":
         query = query.filter(Workflow.is_template.is_(False))
-    workflows = query.order_by(Workflow.updated_at.desc()).all()
-    return [_workflow_to_out(wf) for wf in workflows]
+    if cursor:
+        updated_at, workflow_id = _decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                Workflow.updated_at < updated_at,
+                and_(Workflow.updated_at == updated_at, Workflow.id < workflow_id),
+            )
+        )
+    query = query.order_by(Workflow.updated_at.desc(), Workflow.id.desc())
+    # Admins list every user's workflows, so they always get pages. Other users still get their whole list without
+    # limit or cursor, as before pagination existed; that fallback is deprecated.
+    if limit is None and cursor is None and current_user.role != "admin":
+        workflows = query.all()
+    else:
+        limit = limit or DEFAULT_PAGE_SIZE
+        workflows = query.limit(limit + 1).all()
+    if limit is not None and len(workflows) > limit:
+        workflows = workflows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(workflows[-1])
+    if fields == "summary":
+        return [WorkflowSummaryOut.model_validate(wf) for wf in workflows]
+    if raw:
+        headers = dict(response.headers)
+        return Response(content=workflow_list_json(workflows), media_type="application/json", headers=headers)
+    return [workflow_to_out(wf) for wf in workflows]
+
+
+@router.get("/search", response_model=list[WorkflowSearchHit])
+def search(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    templates: str | None = Query(default=None, description="only|exclude"),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+):
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    owner_id = None if current_user.role == "admin" else current_user.id
+    rows = search_workflows(db, q, owner_id, templates, limit + 1, offset)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(offset + limit)
+    return [WorkflowSearchHit.model_validate(row._mapping) for row in rows]
+
+
+@router.post("/validate", response_model=GraphReport)
+def validate_workflow_data(payload: WorkflowData, current_user: User = Depends(get_current_user)):
+    data = payload.model_dump(include={"nodes", "edges"})
+    return analyze_graph_cached(data["nodes"], data["edges"])
+
+
+@router.get("/bulk/export")
+def bulk_export_workflows(
+    current_user: User = Depends(get_current_user),
+    templates: str | None = Query(default=None, description="only|exclude"),
+    owner_id: str | None = Query(default=None, description="admin only"),
+    gzip: bool = Query(default=False),
+):
+    if current_user.role != "admin":
+        owner_id = current_user.id
+    lines = iter_export_lines(owner_id, templates)
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(lines),
+            media_type="application/gzip",
+            headers={"Content-Disposition": 'attachment; filename="workflows.ndjson.gz"'},
+        )
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="workflows.ndjson"'},
+    )
+
+
+@router.post("/bulk/import")
+async def bulk_import_workflows(request: Request, current_user: User = Depends(get_current_user)):
+    content_encoding = request.headers.get("content-encoding", "").lower()
+    gzipped = True if content_encoding == "gzip" else None
+    imported = 0
+    failed = 0
+    errors: list[dict] = []
+    batch = []
+    try:
+        async for line_no, line in iter_ndjson_lines(request.stream(), gzipped=gzipped):
+            try:
+                batch.append(WorkflowEnvelope.model_validate_json(line))
+            except ValidationError as exc:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    detail = exc.errors(include_url=False, include_context=False, include_input=False)
+                    errors.append({"line": line_no, "detail": detail})
+                continue
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                imported += len(await run_in_threadpool(insert_workflows, current_user.id, batch))
+                batch = []
+        if batch:
+            imported += len(await run_in_threadpool(insert_workflows, current_user.id, batch))
+    except (ValueError, zlib.error) as exc:
+        errors.append({"line": None, "detail": str(exc)})
+    except ImportTooLarge as exc:
+        raise HTTPException(
+            status_code=413, detail=f"{exc}; {imported} workflows were imported before the limit"
+        ) from exc
+    finally:
+        await run_in_threadpool(log_bulk_import, current_user.id, imported, failed)
+    return {"imported": imported, "failed": failed, "errors": errors}
 
 
 @router.get("/{workflow_id}", response_model=WorkflowOut)
@@ -102,9 +302,23 @@ def get_workflow(
     workflow_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    raw: bool = Query(default=False),
 ):
-    workflow = _get_workflow(db, workflow_id, current_user)
-    return _workflow_to_out(workflow)
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    if raw:
+        return Response(content=workflow_out_json(workflow), media_type="application/json")
+    return workflow_to_out(workflow)
+
+
+@router.get("/{workflow_id}/validate", response_model=GraphReport)
+def validate_workflow(
+    workflow_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    data = json.loads(workflow.data_json)
+    return analyze_graph_cached(data.get("nodes", []), data.get("edges", []))
 
 
 @router.patch("/{workflow_id}", response_model=WorkflowOut)
@@ -113,45 +327,47 @@ def update_workflow(
     payload: WorkflowUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    layout: Literal["auto"] | None = Query(default=None),
 ):
-    workflow = _get_workflow(db, workflow_id, current_user)
-
-    if payload.name is not None:
-        workflow.name = payload.name
-    if payload.description is not None:
-        workflow.description = payload.description
-    if payload.is_template is not None:
-        workflow.is_template = payload.is_template
-    if payload.data is None and payload.name is not None:
-        try:
-            data = json.loads(workflow.data_json)
-            data["name"] = workflow.name
-            data["id"] = workflow.id
-            data["updatedAt"] = datetime.utcnow().isoformat()
-            workflow.data_json = json.dumps(data)
-        except Exception:
-            pass
-    if payload.data is not None:
-        data = payload.data.model_dump()
-        data["id"] = workflow.id
-        data["name"] = workflow.name
-        data["updatedAt"] = datetime.utcnow().isoformat()
-        workflow.data_json = json.dumps(data)
-        workflow.version += 1
-        version = WorkflowVersion(
-            workflow_id=workflow.id,
-            version=workflow.version,
-            data_json=workflow.data_json,
-            created_at=datetime.utcnow(),
-        )
-        db.add(version)
-
-    workflow.updated_at = datetime.utcnow()
-    db.add(workflow)
-    db.commit()
-    db.refresh(workflow)
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    update_workflow_fields(db, workflow, payload, auto_layout=layout == "auto")
     log_event(db, action="workflow.update", actor_id=current_user.id, target_type="workflow", target_id=workflow.id)
-    return _workflow_to_out(workflow)
+    invalidate_workflow(workflow.id)
+    return workflow_to_out(workflow)
+
+
+@router.patch("/{workflow_id}/graph", response_model=WorkflowOut)
+def patch_workflow_graph(
+    workflow_id: str,
+    payload: WorkflowPatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    if payload.base_version is not None and payload.base_version != workflow.version:
+        raise HTTPException(status_code=409, detail="Workflow has changed since base_version")
+
+    ops = [op.model_dump(by_alias=True, exclude_unset=True) for op in payload.ops]
+    try:
+        data, recorded = apply_graph_patch(json.loads(workflow.data_json), ops)
+    except JsonPatchTestFailed as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except JsonPatchError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except GraphPatchValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
+    save_graph(db, workflow, data, graph_ops=recorded)
+    log_event(
+        db,
+        action="workflow.patch",
+        actor_id=current_user.id,
+        target_type="workflow",
+        target_id=workflow.id,
+        meta={"ops": len(ops)},
+    )
+    invalidate_workflow(workflow.id)
+    return workflow_to_out(workflow)
 
 
 @router.post("/{workflow_id}/template", response_model=WorkflowOut)
@@ -161,12 +377,10 @@ def toggle_template(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin),
 ):
-    workflow = _get_workflow(db, workflow_id, current_user)
+    workflow = get_owned_workflow(db, workflow_id, current_user)
     workflow.is_template = is_template
     workflow.updated_at = datetime.utcnow()
     db.add(workflow)
-    db.commit()
-    db.refresh(workflow)
     log_event(
         db,
         action="workflow.template",
@@ -175,7 +389,8 @@ def toggle_template(
         target_id=workflow.id,
         meta={"is_template": is_template},
     )
-    return _workflow_to_out(workflow)
+    invalidate_workflow(workflow.id)
+    return workflow_to_out(workflow)
 
 
 @router.delete("/{workflow_id}")
@@ -184,11 +399,10 @@ def delete_workflow(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    workflow = _get_workflow(db, workflow_id, current_user)
-    db.query(WorkflowVersion).filter(WorkflowVersion.workflow_id == workflow.id).delete()
-    db.delete(workflow)
-    db.commit()
-    log_event(db, action="workflow.delete", actor_id=current_user.id, target_type="workflow", target_id=workflow.id)
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    delete_workflows(db, [workflow])
+    log_event(db, action="workflow.delete", actor_id=current_user.id, target_type="workflow", target_id=workflow_id)
+    invalidate_workflow(workflow_id)
     return {"ok": True}
 
 
@@ -198,32 +412,11 @@ def duplicate_workflow(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    workflow = _get_workflow(db, workflow_id, current_user)
-
-    new_workflow = Workflow(
-        owner_id=workflow.owner_id,
-        name=f"{workflow.name} Copy",
-        description=workflow.description,
-        version=1,
-        data_json=workflow.data_json,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
-    )
-    db.add(new_workflow)
-    db.commit()
-    db.refresh(new_workflow)
-
-    version = WorkflowVersion(
-        workflow_id=new_workflow.id,
-        version=1,
-        data_json=new_workflow.data_json,
-        created_at=datetime.utcnow(),
-    )
-    db.add(version)
-    db.commit()
+    workflow = get_owned_workflow(db, workflow_id, current_user)
 
+    new_workflow = add_duplicate(db, workflow)
     log_event(db, action="workflow.duplicate", actor_id=current_user.id, target_type="workflow", target_id=new_workflow.id)
-    return _workflow_to_out(new_workflow)
+    return workflow_to_out(new_workflow)
 
 
 @router.post("/{workflow_id}/export", response_model=WorkflowEnvelope)
@@ -231,9 +424,14 @@ def export_workflow(
     workflow_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    raw: bool = Query(default=False),
 ):
-    workflow = _get_workflow(db, workflow_id, current_user)
-    data = json.loads(workflow.data_json)
+    workflow = get_owned_workflow(db, workflow_id, current_user)
+    if raw:
+        content = envelope_json(workflow.data_json, datetime.utcnow().isoformat())
+        log_event(db, action="workflow.export", actor_id=current_user.id, target_type="workflow", target_id=workflow.id)
+        return Response(content=content, media_type="application/json")
+    data = get_workflow_data(workflow)
     log_event(db, action="workflow.export", actor_id=current_user.id, target_type="workflow", target_id=workflow.id)
     return WorkflowEnvelope(
         version=1,
@@ -247,37 +445,11 @@ def import_workflow(
     payload: WorkflowEnvelope,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    layout: Literal["auto"] | None = Query(default=None),
 ):
-    data = payload.workflow
-    workflow = Workflow(
-        owner_id=current_user.id,
-        name=data.name,
-        description=None,
-        version=1,
-        data_json="{}",
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
-    )
-    db.add(workflow)
-    db.commit()
-    db.refresh(workflow)
-
-    payload_data = data.model_dump()
-    payload_data["id"] = workflow.id
-    payload_data["name"] = workflow.name
-    payload_data["updatedAt"] = datetime.utcnow().isoformat()
-    workflow.data_json = json.dumps(payload_data)
-    db.add(workflow)
-    db.commit()
-
-    version = WorkflowVersion(
-        workflow_id=workflow.id,
-        version=1,
-        data_json=workflow.data_json,
-        created_at=datetime.utcnow(),
-    )
-    db.add(version)
-    db.commit()
-
+    data = payload.workflow.model_dump()
+    if layout == "auto":
+        apply_layout(data)
+    workflow = add_workflow(db, owner_id=current_user.id, name=data["name"], data=data)
     log_event(db, action="workflow.import", actor_id=current_user.id, target_type="workflow", target_id=workflow.id)
-    return _workflow_to_out(workflow)
+    return workflow_to_out(workflow)
@@ -24,9 +24,62 @@ class Settings(BaseSettings):
 
     OPENAI_API_KEY: str | None = None
     OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_BASE_URL: str | None = None  # e.g. http://localhost:9100/v1 for scripts/mock_openai.py
     OPENAI_API_MODE: str = "responses"  # responses | chat
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    OPENAI_MAX_RETRIES: int = 2
+    OPENAI_MAX_CONNECTIONS: int = 20
+
+    GENERATION_RESPONSE_FORMAT: str = "json_schema"  # json_schema | json_object
+    GENERATION_REPAIR_ATTEMPTS: int = 2
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    GENERATION_CACHE_MEMORY_BYTES: int = 16 * 1024 * 1024
+    GENERATION_CACHE_MAX_ROWS: int = 10000
+    GENERATION_MAX_CONCURRENT: int = 16
+    GENERATION_MAX_PER_USER: int = 2
+    GENERATION_QUEUE_SIZE: int = 64
+    GENERATION_QUEUE_PER_USER: int = 4
+    GENERATION_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    GENERATION_JOB_WORKERS: int = 4
+    GENERATION_JOB_QUEUE_SIZE: int = 1000
+    GENERATION_JOB_RETENTION_DAYS: int = 7
 
     CORS_ORIGINS: str = ""
 
+    WORKFLOW_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    WORKFLOW_VERSION_SNAPSHOT_INTERVAL: int = 20
+    WORKFLOW_JSON_CODEC: str = "zlib"  # zlib | zstd | none
+    WORKFLOW_JSON_ZLIB_LEVEL: int = 1
+    WORKFLOW_JSON_COMPRESS_MIN_BYTES: int = 256
+    BULK_IMPORT_MAX_BYTES: int = 1024 * 1024 * 1024  # after decompression
+    GRAPH_REPORT_CACHE_SIZE: int = 1024
+    VERSION_DIFF_CACHE_SIZE: int = 256
+
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE: int = 20
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 30.0
+    RUN_MAX_CONCURRENT: int = 50
+    RUN_MAX_STEPS: int = 10000
+    RUN_LOOP_CONCURRENCY: int = 8
+
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_MAX_CONCURRENT_FIRES: int = 8
+    SCHEDULER_QUEUE_SIZE: int = 1000
+
+    WEBHOOK_QUEUE_SIZE: int = 10000
+    WEBHOOK_BATCH_SIZE: int = 500
+    WEBHOOK_MAX_BODY_BYTES: int = 1024 * 1024
+
+    RETENTION_ENABLED: bool = True
+    RETENTION_INTERVAL_SECONDS: float = 3600.0
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_KEEP_LAST: int = 50
+    RETENTION_HOURLY_AFTER_HOURS: int = 24
+    RETENTION_DAILY_AFTER_DAYS: int = 30
+    RETENTION_VACUUM: bool = True
+    RETENTION_FULL_VACUUM_FREE_RATIO: float = 0.25
+
 
 settings = Settings()
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.user import User
+from app.models.workflow import Workflow
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
@@ -43,3 +44,14 @@ def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin privileges required")
     return current_user
+
+
+def get_owned_workflow(db: Session, workflow_id: str, user: User) -> Workflow:
+    """Load a live workflow the user may see (admins see all), or raise 404."""
+    query = db.query(Workflow).filter(Workflow.id == workflow_id, Workflow.deleted_at.is_(None))
+    if user.role != "admin":
+        query = query.filter(Workflow.owner_id == user.id)
+    workflow = query.first()
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return workflow
@@ -0,0 +1,57 @@
+import zlib
+
+from sqlalchemy.types import Text, TypeDecorator
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Compressed values are stored as bytes behind a two-byte marker; SQLite keeps them as BLOBs in the TEXT
+# column. Legacy rows come back as str and are returned untouched, so no data migration is needed.
+ZLIB_MARKER = b"\x00z"
+ZSTD_MARKER = b"\x00s"
+
+
+def encode_json_text(value: str, codec: str | None = None, min_bytes: int | None = None) -> str | bytes:
+    codec = codec or settings.WORKFLOW_JSON_CODEC
+    if min_bytes is None:
+        min_bytes = settings.WORKFLOW_JSON_COMPRESS_MIN_BYTES
+    raw = value.encode("utf-8")
+    if codec == "none" or len(raw) < min_bytes:
+        return value
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("WORKFLOW_JSON_CODEC=zstd requires the zstandard package")
+        return ZSTD_MARKER + zstandard.ZstdCompressor().compress(raw)
+    if codec == "zlib":
+        return ZLIB_MARKER + zlib.compress(raw, settings.WORKFLOW_JSON_ZLIB_LEVEL)
+    raise ValueError(f"Unknown JSON codec: {codec}")
+
+
+def decode_json_text(value: str | bytes | None) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    marker, payload = bytes(value[:2]), value[2:]
+    if marker == ZLIB_MARKER:
+        return zlib.decompress(payload).decode("utf-8")
+    if marker == ZSTD_MARKER:
+        if zstandard is None:
+            raise RuntimeError("Reading zstd-compressed rows requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    return bytes(value).decode("utf-8")
+
+
+class CompressedJSONText(TypeDecorator):
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_json_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_json_text(value)
@@ -2,12 +2,20 @@ import os
 from datetime import datetime
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
 from app.core.config import settings
 from app.core.security import get_password_hash
 from app.db.session import SessionLocal
+from app.services.generation_jobs import generation_jobs
+from app.services.http_client import close_http_client
+from app.services.openai_client import close_openai_client
+from app.services.retention import retention
+from app.services.runs import recover_runs, start_runner, stop_runner
+from app.services.scheduler import scheduler
+from app.services.webhooks import webhooks
 from app.models.user import User
 from app.models.refresh_token import RefreshToken  # noqa: F401
 from app.models.workflow import Workflow  # noqa: F401
@@ -25,6 +33,7 @@ if origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Generation-Cache"],
     )
 
 
@@ -72,6 +81,37 @@ def on_startup():
             db.close()
 
 
+def _recover_runs() -> int:
+    db = SessionLocal()
+    try:
+        return recover_runs(db)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_services():
+    await run_in_threadpool(_recover_runs)
+    start_runner()
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.start()
+    await webhooks.start()
+    await generation_jobs.start()
+    if settings.RETENTION_ENABLED:
+        await retention.start()
+
+
+@app.on_event("shutdown")
+async def stop_services():
+    await retention.stop()
+    await scheduler.stop()
+    await webhooks.stop()
+    await generation_jobs.stop()
+    await stop_runner()
+    await close_http_client()
+    await close_openai_client()
+
+
 @app.get("/health")
 def health():
     return {"ok": True}
@@ -4,3 +4,7 @@ from app.models.workflow import Workflow  # noqa: F401
 from app.models.workflow_version import WorkflowVersion  # noqa: F401
 from app.models.audit_log import AuditLog  # noqa: F401
 from app.models.password_reset import PasswordResetToken  # noqa: F401
+from app.models.workflow_run import WorkflowRun  # noqa: F401
+from app.models.webhook_event import WebhookEvent  # noqa: F401
+from app.models.generation_cache import GenerationCacheEntry  # noqa: F401
+from app.models.generation_job import GenerationJob  # noqa: F401
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String
+
+from app.db.base import Base
+from app.db.types import CompressedJSONText
+
+
+class GenerationCacheEntry(Base):
+    __tablename__ = "generation_cache"
+
+    # sha256 of the normalized request (see app.services.generation_cache.cache_key).
+    key = Column(String, primary_key=True)
+    model = Column(String, nullable=False)
+    response_json = Column(CompressedJSONText, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
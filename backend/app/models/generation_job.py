@@ -0,0 +1,24 @@
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from app.db.base import Base
+from app.db.types import CompressedJSONText
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    __table_args__ = (Index("ix_generation_jobs_actor_created", "actor_id", "created_at"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    actor_id = Column(String, ForeignKey("users.id"), nullable=False)
+    status = Column(String, default="queued", index=True, nullable=False)  # queued | running | succeeded | failed
+    request_json = Column(Text, nullable=False)
+    result_json = Column(CompressedJSONText, nullable=True)
+    error = Column(Text, nullable=True)
+    error_status = Column(Integer, nullable=True)
+    cache = Column(String, nullable=True)  # hit | miss | bypass
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
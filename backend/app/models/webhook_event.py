@@ -0,0 +1,19 @@
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Text
+
+from app.db.base import Base
+
+
+class WebhookEvent(Base):
+    __tablename__ = "webhook_events"
+    __table_args__ = (Index("ix_webhook_events_workflow_received", "workflow_id", "received_at"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    workflow_id = Column(String, ForeignKey("workflows.id"), nullable=False)
+    node_id = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    payload_json = Column(Text, nullable=True)
+    run_id = Column(String, nullable=True)
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
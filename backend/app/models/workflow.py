@@ -1,13 +1,15 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 
 from app.db.base import Base
+from app.db.types import CompressedJSONText
 
 
 class Workflow(Base):
     __tablename__ = "workflows"
+    __table_args__ = (Index("ix_workflows_owner_template_updated", "owner_id", "is_template", "updated_at"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     owner_id = Column(String, ForeignKey("users.id"), index=True, nullable=False)
@@ -15,6 +17,8 @@ class Workflow(Base):
     description = Column(String, nullable=True)
     is_template = Column(Boolean, default=False, nullable=False)
     version = Column(Integer, default=1, nullable=False)
-    data_json = Column(Text, nullable=False)
+    data_json = Column(CompressedJSONText, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Soft-deleted workflows are hidden everywhere and purged (with their history) by the retention worker.
+    deleted_at = Column(DateTime, nullable=True, index=True)
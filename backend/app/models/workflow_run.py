@@ -0,0 +1,26 @@
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from app.db.base import Base
+
+
+class WorkflowRun(Base):
+    __tablename__ = "workflow_runs"
+    __table_args__ = (Index("ix_workflow_runs_workflow_created", "workflow_id", "created_at"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    workflow_id = Column(String, ForeignKey("workflows.id"), nullable=False)
+    workflow_version = Column(Integer, nullable=False)
+    actor_id = Column(String, nullable=True)
+    trigger = Column(String, default="manual", nullable=False)  # manual | schedule | webhook
+    trigger_node_id = Column(String, nullable=True)
+    status = Column(String, default="queued", index=True, nullable=False)  # queued | running | succeeded | failed
+    input_json = Column(Text, nullable=True)
+    output_json = Column(Text, nullable=True)
+    steps_json = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
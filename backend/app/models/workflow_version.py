@@ -1,16 +1,24 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 
 from app.db.base import Base
+from app.db.types import CompressedJSONText
 
 
 class WorkflowVersion(Base):
     __tablename__ = "workflow_versions"
+    __table_args__ = (Index("ix_workflow_versions_workflow_version", "workflow_id", "version"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     workflow_id = Column(String, ForeignKey("workflows.id"), index=True, nullable=False)
     version = Column(Integer, nullable=False)
-    data_json = Column(Text, nullable=False)
+    # "snapshot" rows hold the full document; "delta" rows hold a JSON Patch against base_version.
+    kind = Column(String, default="snapshot", nullable=False)
+    base_version = Column(Integer, nullable=True)
+    data_json = Column(CompressedJSONText, nullable=False)
+    # Size of the full document in bytes and its node count, so history listings never touch data_json.
+    size = Column(Integer, nullable=True)
+    node_count = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class RunCreate(BaseModel):
+    input: Any = None
+    node_id: str | None = None
+
+
+class WorkflowRunOut(BaseModel):
+    id: str
+    workflow_id: str
+    workflow_version: int
+    actor_id: str | None = None
+    trigger: str
+    trigger_node_id: str | None = None
+    status: str
+    input: Any = None
+    output: Any = None
+    steps: list[dict[str, Any]] | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class WorkflowRunSummaryOut(BaseModel):
+    id: str
+    workflow_id: str
+    workflow_version: int
+    trigger: str
+    status: str
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookEventOut(BaseModel):
+    id: str
+    workflow_id: str
+    node_id: str
+    content_type: str | None = None
+    payload: Any = None
+    run_id: str | None = None
+    received_at: datetime
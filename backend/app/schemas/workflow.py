@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Literal
+from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -84,6 +84,65 @@ class WorkflowUpdate(BaseModel):
     data: WorkflowData | None = None
 
 
+class JsonPatchOperation(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    from_: str | None = Field(default=None, alias="from")
+    value: Any = None
+
+
+class WorkflowPatch(BaseModel):
+    ops: list[JsonPatchOperation] = Field(..., min_length=1)
+    base_version: int | None = None
+
+
+class BatchCreateOp(BaseModel):
+    op: Literal["create"]
+    workflow: WorkflowCreate
+
+
+class BatchUpdateOp(BaseModel):
+    op: Literal["update"]
+    id: str
+    changes: WorkflowUpdate
+
+
+class BatchDuplicateOp(BaseModel):
+    op: Literal["duplicate"]
+    id: str
+
+
+class BatchDeleteOp(BaseModel):
+    op: Literal["delete"]
+    id: str
+
+
+WorkflowBatchOp = Annotated[
+    BatchCreateOp | BatchUpdateOp | BatchDuplicateOp | BatchDeleteOp,
+    Field(discriminator="op"),
+]
+
+
+class WorkflowBatchRequest(BaseModel):
+    ops: list[WorkflowBatchOp] = Field(..., min_length=1, max_length=500)
+
+
+class WorkflowBatchResult(BaseModel):
+    index: int
+    op: str
+    ok: bool
+    status: int
+    id: str | None = None
+    version: int | None = None
+    error: str | None = None
+
+
+class WorkflowBatchResponse(BaseModel):
+    results: list[WorkflowBatchResult]
+
+
 class WorkflowOut(BaseModel):
     id: str
     owner_id: str
@@ -99,12 +158,118 @@ class WorkflowOut(BaseModel):
         from_attributes = True
 
 
+class WorkflowSummaryOut(BaseModel):
+    id: str
+    owner_id: str
+    name: str
+    description: str | None = None
+    is_template: bool
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WorkflowSearchHit(WorkflowSummaryOut):
+    rank: float
+    match: str | None = None
+
+
+class GraphIssue(BaseModel):
+    code: str
+    message: str
+    node_id: str | None = None
+    edge_id: str | None = None
+
+
+class GraphCycle(BaseModel):
+    nodes: list[str]
+    allowed: bool
+
+
+class ForkJoinPair(BaseModel):
+    fork: str
+    joins: list[str]
+
+
+class GraphReport(BaseModel):
+    valid: bool
+    node_count: int
+    edge_count: int
+    errors: list[GraphIssue] = []
+    warnings: list[GraphIssue] = []
+    start_nodes: list[str] = []
+    unreachable: list[str] = []
+    cycles: list[GraphCycle] = []
+    topological_order: list[str] = []
+    fork_joins: list[ForkJoinPair] = []
+
+
+class WorkflowVersionSummary(BaseModel):
+    version: int
+    created_at: datetime
+    size: int | None = None
+    node_count: int | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class WorkflowVersionOut(WorkflowVersionSummary):
+    data: WorkflowData
+
+
+class FieldChange(BaseModel):
+    op: Literal["add", "remove", "replace"]
+    path: str
+    old: Any = None
+    new: Any = None
+
+
+class ItemChange(BaseModel):
+    id: str
+    changes: list[FieldChange]
+
+
+class CollectionDiff(BaseModel):
+    added: list[dict[str, Any]] = []
+    removed: list[str] = []
+    changed: list[ItemChange] = []
+
+
+class VersionDiff(BaseModel):
+    workflow_id: str
+    from_version: int
+    to_version: int
+    header: list[FieldChange]
+    nodes: CollectionDiff
+    edges: CollectionDiff
+
+
 class GenerateRequest(BaseModel):
     description: str = Field(..., min_length=3)
     mode: Literal["replace", "append"] = "replace"
     existing_workflow: WorkflowData | None = None
     name: str | None = None
+    # "bypass" skips the generation cache lookup; the fresh result still replaces the cached one.
+    cache: Literal["default", "bypass"] = "default"
 
 
 class GenerateResponse(BaseModel):
     workflow: WorkflowData
+
+
+class GenerationJobOut(BaseModel):
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    cache: str | None = None
+    workflow: WorkflowData | None = None
+    error: str | None = None
+    error_status: int | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    queue_ms: int | None = None
+    duration_ms: int | None = None
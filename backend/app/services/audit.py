@@ -1,7 +1,9 @@
 import json
 from datetime import datetime
 from typing import Any
+from uuid import uuid4
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.audit_log import AuditLog
@@ -25,3 +27,26 @@ def log_event(
     )
     db.add(entry)
     db.commit()
+
+
+def log_events(db: Session, events: list[dict[str, Any]]) -> None:
+    """Write several audit entries as one multi-row insert and commit them with any pending changes."""
+    if events:
+        created_at = datetime.utcnow()
+        db.execute(
+            insert(AuditLog).values(
+                [
+                    {
+                        "id": str(uuid4()),
+                        "actor_id": event.get("actor_id"),
+                        "action": event["action"],
+                        "target_type": event.get("target_type"),
+                        "target_id": event.get("target_id"),
+                        "meta_json": json.dumps(event["meta"]) if event.get("meta") is not None else None,
+                        "created_at": created_at,
+                    }
+                    for event in events
+                ]
+            )
+        )
+    db.commit()
@@ -0,0 +1,123 @@
+import zlib
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import datetime
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.workflow import Workflow
+from app.schemas.workflow import WorkflowEnvelope
+from app.services.audit import log_event
+from app.services.workflow_json import envelope_json
+from app.services.workflow_store import add_workflow
+
+EXPORT_BATCH_SIZE = 200
+IMPORT_BATCH_SIZE = 200
+MAX_LINE_BYTES = 32 * 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+INFLATE_CHUNK_BYTES = 1024 * 1024
+
+
+class ImportTooLarge(Exception):
+    pass
+
+
+def iter_export_lines(owner_id: str | None, templates: str | None) -> Iterator[bytes]:
+    """Yield one export envelope per workflow as NDJSON, holding at most one fetch batch in memory."""
+    db = SessionLocal()
+    try:
+        query = db.query(Workflow).filter(Workflow.deleted_at.is_(None))
+        if owner_id is not None:
+            query = query.filter(Workflow.owner_id == owner_id)
+        if templates == "only":
+            query = query.filter(Workflow.is_template.is_(True))
+        elif templates == "exclude":
+            query = query.filter(Workflow.is_template.is_(False))
+        exported_at = datetime.utcnow().isoformat()
+        for workflow in query.order_by(Workflow.created_at, Workflow.id).yield_per(EXPORT_BATCH_SIZE):
+            yield envelope_json(workflow.data_json, exported_at) + b"\n"
+    finally:
+        db.close()
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes], gzipped: bool | None = None
+) -> AsyncIterator[tuple[int, bytes]]:
+    """Split a (possibly gzip-compressed) byte stream into numbered non-empty lines.
+
+    With ``gzipped=None`` compression is detected from the gzip magic bytes of the first chunk. Raises
+    ImportTooLarge once the decompressed stream passes BULK_IMPORT_MAX_BYTES; compressed input is inflated in
+    bounded pieces, so a small gzip bomb never expands in memory.
+    """
+    decompressor = None
+    buffer = bytearray()
+    line_no = 0
+    total = 0
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if gzipped is None:
+            gzipped = chunk[:2] == b"\x1f\x8b"
+        if gzipped and decompressor is None:
+            decompressor = zlib.decompressobj(wbits=47)
+        for piece in _inflate(decompressor, chunk) if decompressor else (chunk,):
+            total += len(piece)
+            if total > settings.BULK_IMPORT_MAX_BYTES:
+                raise ImportTooLarge(f"Import exceeds {settings.BULK_IMPORT_MAX_BYTES} bytes")
+            scan_from = len(buffer)
+            buffer += piece
+            start = 0
+            while (end := buffer.find(b"\n", scan_from)) >= 0:
+                line_no += 1
+                line = bytes(buffer[start:end])
+                if line.strip():
+                    yield line_no, line
+                start = scan_from = end + 1
+            del buffer[:start]
+            if len(buffer) > MAX_LINE_BYTES:
+                raise ValueError(f"Line {line_no + 1} exceeds {MAX_LINE_BYTES} bytes")
+    if decompressor is not None:
+        buffer += decompressor.flush()
+    for line in bytes(buffer).split(b"\n"):
+        line_no += 1
+        if line.strip():
+            yield line_no, line
+
+
+def _inflate(decompressor, data: bytes) -> Iterator[bytes]:
+    while data:
+        piece = decompressor.decompress(data, INFLATE_CHUNK_BYTES)
+        data = decompressor.unconsumed_tail
+        if piece:
+            yield piece
+
+
+def insert_workflows(owner_id: str, envelopes: list[WorkflowEnvelope]) -> list[str]:
+    """Insert imported workflows and their first versions in a single transaction."""
+    db = SessionLocal()
+    try:
+        ids = []
+        for envelope in envelopes:
+            data = envelope.workflow.model_dump()
+            workflow = add_workflow(db, owner_id=owner_id, name=envelope.workflow.name, data=data)
+            ids.append(workflow.id)
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+
+def log_bulk_import(actor_id: str, imported: int, failed: int) -> None:
+    db = SessionLocal()
+    try:
+        log_event(db, action="workflow.import.bulk", actor_id=actor_id, meta={"imported": imported, "failed": failed})
+    finally:
+        db.close()
@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by the summed ``size`` of its entries.
+
+    Entries may carry a ``tag`` (e.g. a version stamp); a lookup with a
+    different tag is a miss, so stale entries never need to be found and
+    removed before they are overwritten.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, tuple[Any, Any, int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, tag: Any = None) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != tag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, size: int = 1, tag: Any = None) -> None:
+        if size > self.max_size:
+            self.pop(key)
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[2]
+            self._entries[key] = (value, tag, size)
+            self._size += size
+            while self._size > self.max_size:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry[2]
+
+    def pop_tagged(self, tag: Any) -> int:
+        """Remove every entry stored with ``tag``; returns how many were removed."""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry[1] == tag]
+            for key in keys:
+                self._size -= self._entries.pop(key)[2]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size": self._size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
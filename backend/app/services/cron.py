@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# Five-field cron expressions (minute hour day-of-month month day-of-week) evaluated in UTC. Supports "*", lists,
+# ranges, steps and the usual month/day names. Like classic cron, when both day fields are restricted a day
+# matches if either does.
+
+_MONTHS = {name: idx for idx, name in enumerate(("jan feb mar apr may jun jul aug sep oct nov dec").split(), start=1)}
+_DAYS = {name: idx for idx, name in enumerate(("sun mon tue wed thu fri sat").split())}
+_FIELDS = ((0, 59, {}), (0, 23, {}), (1, 31, {}), (1, 12, _MONTHS), (0, 7, _DAYS))
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+_SEARCH_YEARS = 5
+
+
+def _value(token: str, names: dict[str, int]) -> int:
+    token = token.lower()
+    if token in names:
+        return names[token]
+    if not token.isdigit():
+        raise ValueError(f"Invalid cron value {token!r}")
+    return int(token)
+
+
+def _parse_field(field: str, low: int, high: int, names: dict[str, int]) -> frozenset[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if step < 1:
+            raise ValueError(f"Invalid cron step in {part!r}")
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start_text, end_text = base.split("-", 1)
+            start, end = _value(start_text, names), _value(end_text, names)
+        else:
+            start = _value(base, names)
+            end = high if step_text else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"Cron field {part!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSpec:
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        fields = _MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError("Cron expression must have 5 fields")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(field, low, high, names) for field, (low, high, names) in zip(fields, _FIELDS)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days = days
+        self.months = months
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # Vixie cron: the day fields are ORed only when both are restricted; a field starting with "*" (even "*/2")
+        # makes them ANDed.
+        self.any_day = fields[2].startswith("*")
+        self.any_weekday = fields[4].startswith("*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime | None:
+        """First matching minute strictly after ``moment``, jumping field by field rather than minute by minute."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate.year + _SEARCH_YEARS
+        while candidate.year <= limit:
+            if candidate.month not in self.months:
+                if candidate.month == 12:
+                    year, month = candidate.year + 1, 1
+                else:
+                    year, month = candidate.year, candidate.month + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            hour = next((value for value in self.hours if value >= candidate.hour), None)
+            if hour is None:
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if hour != candidate.hour:
+                candidate = candidate.replace(hour=hour, minute=0)
+            minute = next((value for value in self.minutes if value >= candidate.minute), None)
+            if minute is None:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            return candidate.replace(minute=minute)
+        return None
+
+
+@lru_cache(maxsize=4096)
+def parse_cron(expression: str) -> CronSpec:
+    return CronSpec(expression)
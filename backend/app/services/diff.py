@@ -0,0 +1,86 @@
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.workflow import CollectionDiff, FieldChange, ItemChange, VersionDiff
+from app.services.cache import LRUCache
+from app.services.json_patch import json_equal
+from app.services.versions import materialize_version
+
+# Entries are tagged with their workflow id so a workflow's diffs can be dropped together when retention deletes
+# versions or the workflow is deleted.
+_diff_cache = LRUCache(max_size=settings.VERSION_DIFF_CACHE_SIZE)
+
+
+def field_changes(old: Any, new: Any, path: str = "") -> list[FieldChange]:
+    """Dotted-path changes between two JSON values; objects are compared key by key, anything else as a whole."""
+    changes: list[FieldChange] = []
+    _collect(old, new, path, changes)
+    return changes
+
+
+def _collect(old: Any, new: Any, path: str, changes: list[FieldChange]) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in old.items():
+            child = f"{path}.{key}" if path else key
+            if key not in new:
+                changes.append(FieldChange(op="remove", path=child, old=value))
+            else:
+                _collect(value, new[key], child, changes)
+        for key, value in new.items():
+            if key not in old:
+                changes.append(FieldChange(op="add", path=f"{path}.{key}" if path else key, new=value))
+    elif not json_equal(old, new):
+        changes.append(FieldChange(op="replace", path=path, old=old, new=new))
+
+
+def diff_items(old_items: list[dict[str, Any]], new_items: list[dict[str, Any]]) -> CollectionDiff:
+    old_by_id = {item["id"]: item for item in old_items}
+    new_ids = set()
+    result = CollectionDiff()
+    for item in new_items:
+        item_id = item["id"]
+        new_ids.add(item_id)
+        previous = old_by_id.get(item_id)
+        if previous is None:
+            result.added.append(item)
+        elif not json_equal(previous, item):
+            result.changed.append(ItemChange(id=item_id, changes=field_changes(previous, item)))
+    result.removed = [item_id for item_id in old_by_id if item_id not in new_ids]
+    return result
+
+
+def diff_documents(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "header": field_changes({"name": old.get("name")}, {"name": new.get("name")}),
+        "nodes": diff_items(old.get("nodes", []), new.get("nodes", [])),
+        "edges": diff_items(old.get("edges", []), new.get("edges", [])),
+    }
+
+
+def diff_versions(db: Session, workflow_id: str, from_version: int, to_version: int) -> VersionDiff | None:
+    key = (workflow_id, from_version, to_version)
+    cached = _diff_cache.get(key, tag=workflow_id)
+    if cached is not None:
+        return cached
+    old = materialize_version(db, workflow_id, from_version)
+    new = materialize_version(db, workflow_id, to_version) if to_version != from_version else old
+    if old is None or new is None:
+        return None
+    result = VersionDiff(
+        workflow_id=workflow_id,
+        from_version=from_version,
+        to_version=to_version,
+        **diff_documents(old, new),
+    )
+    _diff_cache.set(key, result, tag=workflow_id)
+    return result
+
+
+def invalidate_diffs(workflow_id: str) -> None:
+    _diff_cache.pop_tagged(workflow_id)
+
+
+def diff_cache_stats() -> dict:
+    return _diff_cache.stats()
@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import re
+import time
+from collections import ChainMap
+from datetime import datetime
+from typing import Any, Awaitable
+
+import httpx
+
+from app.core.config import settings
+from app.services.graph import START_TYPES, analyze_graph_cached
+from app.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+_TEMPLATE = re.compile(r"\{\{\s*([\w.\-]+)\s*\}\}")
+_MISSING = object()
+
+
+class RunFailed(Exception):
+    pass
+
+
+def resolve_path(scope: Any, path: str) -> Any:
+    """Look up a dotted path ("input.order.id", "nodes.node_2.body.items.0") in the run scope."""
+    value = scope
+    for token in path.split("."):
+        if isinstance(value, (dict, ChainMap)):
+            value = value.get(token, _MISSING)
+        elif isinstance(value, list) and token.lstrip("-").isdigit() and -len(value) <= int(token) < len(value):
+            value = value[int(token)]
+        else:
+            value = _MISSING
+        if value is _MISSING:
+            return None
+    return value
+
+
+def render(value: Any, scope: Any) -> Any:
+    if isinstance(value, str):
+        match = _TEMPLATE.fullmatch(value.strip())
+        if match:
+            return resolve_path(scope, match.group(1))
+        return _TEMPLATE.sub(lambda m: "" if (found := resolve_path(scope, m.group(1))) is None else str(found), value)
+    if isinstance(value, dict):
+        return {key: render(item, scope) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render(item, scope) for item in value]
+    return value
+
+
+def _compare(left: Any, operator: str, right: Any) -> bool:
+    try:
+        if operator == "eq":
+            return left == right
+        if operator == "ne":
+            return left != right
+        if operator == "gt":
+            return left > right
+        if operator == "gte":
+            return left >= right
+        if operator == "lt":
+            return left < right
+        if operator == "lte":
+            return left <= right
+        if operator == "in":
+            return left in right
+        if operator == "exists":
+            return left is not None
+    except TypeError:
+        return False
+    return bool(left)
+
+
+async def _gather(coros: list[Awaitable[Any]]) -> list[Any]:
+    """Run coroutines concurrently; the first failure cancels the rest and is re-raised as-is."""
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(coro) for coro in coros]
+    except BaseExceptionGroup as exc:
+        raise exc.exceptions[0] from None
+    return [task.result() for task in tasks]
+
+
+class WorkflowEngine:
+    """Executes a workflow document.
+
+    Each path through the graph is a coroutine: parallel_fork branches run concurrently up to their paired
+    join_merge, loop_foreach iterations run concurrently (bounded) up to the edge back into the loop, and
+    delays are timers on the event loop.
+    """
+
+    def __init__(
+        self,
+        data: dict[str, Any],
+        client: httpx.AsyncClient | None = None,
+        max_steps: int | None = None,
+        loop_concurrency: int | None = None,
+    ) -> None:
+        nodes = data.get("nodes", [])
+        edges = data.get("edges", [])
+        report = analyze_graph_cached(nodes, edges)
+        if not report.valid:
+            raise RunFailed("; ".join(issue.message for issue in report.errors[:5]))
+        self.nodes = {node["id"]: node for node in nodes}
+        self.out_edges: dict[str, list[dict[str, Any]]] = {node_id: [] for node_id in self.nodes}
+        for edge in edges:
+            self.out_edges[edge["source"]].append(edge)
+        self.join_for = {pair.fork: pair.joins[0] for pair in report.fork_joins}
+        self.cycle_of = {node_id: set(cycle.nodes) for cycle in report.cycles for node_id in cycle.nodes}
+        self.start_nodes = report.start_nodes
+        self.client = client
+        self.max_steps = max_steps or settings.RUN_MAX_STEPS
+        self.loop_concurrency = loop_concurrency or settings.RUN_LOOP_CONCURRENCY
+        self.steps: list[dict[str, Any]] = []
+        # Counted when a step is dispatched, not when it is recorded, so concurrent branches can't overshoot.
+        self.dispatched = 0
+        self.outputs: dict[str, Any] = {}
+
+    async def run(self, payload: Any = None, start_node_id: str | None = None) -> dict[str, Any]:
+        if start_node_id is None:
+            starts = [node_id for node_id in self.start_nodes if self.nodes[node_id]["type"] == "start"]
+            start_node_id = (starts or self.start_nodes)[0]
+        elif self.nodes.get(start_node_id, {}).get("type") not in START_TYPES:
+            raise RunFailed(f"Node {start_node_id!r} is not a start or trigger node")
+        scope = {"input": payload if payload is not None else {}, "nodes": self.outputs}
+        await self._walk(start_node_id, scope, None)
+        return self.outputs
+
+    async def _walk(self, node_id: str | None, scope: dict[str, Any], stop: str | None) -> None:
+        while node_id is not None and node_id != stop:
+            node = self.nodes[node_id]
+            kind = node["type"]
+            if kind == "parallel_fork":
+                await self._step(node, scope)
+                join = self.join_for[node_id]
+                await _gather([self._walk(edge["target"], scope, join) for edge in self.out_edges[node_id]])
+                node_id = join
+                continue
+            if kind == "loop_foreach":
+                next_edges = await self._loop(node, scope)
+            else:
+                output = await self._step(node, scope)
+                if kind in ("end", "end_fail"):
+                    return
+                next_edges = self._route(node, output)
+            if len(next_edges) == 1:
+                node_id = next_edges[0]["target"]
+                continue
+            await _gather([self._walk(edge["target"], scope, stop) for edge in next_edges])
+            return
+
+    def _route(self, node: dict[str, Any], output: Any) -> list[dict[str, Any]]:
+        edges = self.out_edges[node["id"]]
+        if node["type"] == "decision":
+            handle = "true" if output else "false"
+            chosen = [edge for edge in edges if edge.get("sourceHandle") == handle]
+            if chosen or any(edge.get("sourceHandle") for edge in edges):
+                return chosen
+            # Unlabelled decision edges: first is the true branch, second the false branch.
+            index = 0 if output else 1
+            return edges[index : index + 1]
+        if node["type"] == "switch_router":
+            chosen = [edge for edge in edges if edge.get("sourceHandle") == str(output)]
+            return chosen or [edge for edge in edges if edge.get("sourceHandle") in ("default", None)]
+        return edges
+
+    async def _loop(self, node: dict[str, Any], scope: dict[str, Any]) -> list[dict[str, Any]]:
+        node_id = node["id"]
+        cycle = self.cycle_of.get(node_id, set())
+        body = [edge for edge in self.out_edges[node_id] if edge["target"] in cycle]
+        done = [edge for edge in self.out_edges[node_id] if edge["target"] not in cycle]
+        config = node.get("data", {})
+        items = render(config.get("items", "{{ input.items }}"), scope)
+        if items is None:
+            items = []
+        if not isinstance(items, list):
+            raise RunFailed(f"loop_foreach {node_id!r} items is not a list")
+        limit = asyncio.Semaphore(int(config.get("concurrency") or self.loop_concurrency))
+
+        async def iteration(index: int, item: Any) -> dict[str, Any]:
+            async with limit:
+                child = {**scope, "item": item, "index": index, "nodes": ChainMap({}, scope["nodes"])}
+                await _gather([self._walk(edge["target"], child, node_id) for edge in body])
+                return child["nodes"].maps[0]
+
+        started = time.perf_counter()
+        self._count_step()
+        results = await _gather([iteration(index, item) for index, item in enumerate(items)])
+        scope["nodes"][node_id] = {"count": len(items), "items": results}
+        self._record(node, started)
+        return done
+
+    def _count_step(self) -> None:
+        if self.dispatched >= self.max_steps:
+            raise RunFailed(f"Run exceeded {self.max_steps} steps")
+        self.dispatched += 1
+
+    def _record(self, node: dict[str, Any], started: float, error: str | None = None) -> None:
+        step = {
+            "node_id": node["id"],
+            "type": node["type"],
+            "status": "failed" if error else "succeeded",
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+        if error:
+            step["error"] = error
+        self.steps.append(step)
+
+    async def _step(self, node: dict[str, Any], scope: dict[str, Any]) -> Any:
+        self._count_step()
+        started = time.perf_counter()
+        try:
+            output = await self._execute(node, scope)
+        except RunFailed as exc:
+            self._record(node, started, error=str(exc))
+            raise
+        except (httpx.HTTPError, ValueError, TypeError) as exc:
+            self._record(node, started, error=str(exc) or exc.__class__.__name__)
+            raise RunFailed(f"{node['type']} {node['id']!r} failed: {exc}") from exc
+        scope["nodes"][node["id"]] = output
+        self._record(node, started)
+        return output
+
+    async def _execute(self, node: dict[str, Any], scope: dict[str, Any]) -> Any:
+        kind = node["type"]
+        config = node.get("data", {})
+        if kind == "http_request":
+            return await self._http_request(config, scope)
+        if kind in ("delay", "delay_wait"):
+            seconds = float(render(config.get("seconds", 0), scope) or 0)
+            seconds += float(render(config.get("ms", 0), scope) or 0) / 1000
+            await asyncio.sleep(seconds)
+            return {"waited": seconds}
+        if kind == "transform_mapper":
+            return render(config.get("mapping", {}), scope)
+        if kind == "validator":
+            missing = [path for path in config.get("required", []) if resolve_path(scope, path) is None]
+            if missing:
+                raise RunFailed(f"Missing required values: {', '.join(missing)}")
+            return {"ok": True}
+        if kind == "decision":
+            left = resolve_path(scope, config["path"]) if config.get("path") else None
+            return _compare(left, config.get("operator", "truthy"), render(config.get("value"), scope))
+        if kind == "switch_router":
+            return resolve_path(scope, config["path"]) if config.get("path") else None
+        if kind in ("log_event", "notify_alert"):
+            message = render(config.get("message", config.get("label", "")), scope)
+            logger.info("workflow %s: %s", kind, message)
+            return {"message": message}
+        if kind == "end_fail":
+            raise RunFailed(render(config.get("message") or config.get("label") or "Workflow ended in failure", scope))
+        if kind == "join_merge":
+            return {"joined": True}
+        return None
+
+    async def _http_request(self, config: dict[str, Any], scope: dict[str, Any]) -> dict[str, Any]:
+        url = render(config.get("url"), scope)
+        if not url:
+            raise RunFailed("http_request node has no url")
+        client = self.client or get_http_client()
+        request: dict[str, Any] = {"headers": render(config.get("headers") or {}, scope)}
+        if config.get("body") is not None:
+            request["json"] = render(config["body"], scope)
+        if config.get("timeout"):
+            request["timeout"] = float(config["timeout"])
+        response = await client.request(str(config.get("method", "GET")).upper(), url, **request)
+        if response.headers.get("content-type", "").startswith("application/json"):
+            body: Any = response.json()
+        else:
+            body = response.text
+        if response.status_code >= 400 and not config.get("allowFailure"):
+            raise RunFailed(f"HTTP {response.status_code} from {url}")
+        return {"status": response.status_code, "body": body}
@@ -1,11 +1,57 @@
 import json
+import logging
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator
+
+import openai
+from pydantic import ValidationError
 
 from app.core.config import settings
 from app.schemas.workflow import GenerateRequest, WorkflowData
+from app.services.generation_cache import generation_cache
+from app.services.generation_limits import GenerationBusy, generation_flights, generation_limiter
+from app.services.generation_schema import FRAGMENT_FORMAT, WORKFLOW_FORMAT, clean_node_data
+from app.services.graph_merge import graph_digest, merge_fragment
+from app.services.json_stream import ArrayItemParser
+from app.services.layout import apply_layout
 from app.services.openai_client import get_openai_client
 
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 20
+
+
+class InvalidGeneration(Exception):
+    """The model output still wasn't a valid workflow after the repair turns."""
+
+
+class RepairStats:
+    """Validation outcome per attempt: attempt 1 is the original completion, later ones are repair turns."""
+
+    def __init__(self) -> None:
+        self._attempts: dict[int, list[int]] = {}
+        self.exhausted = 0
+
+    def record(self, attempt: int, valid: bool) -> None:
+        counts = self._attempts.setdefault(attempt, [0, 0])
+        counts[0 if valid else 1] += 1
+
+    def stats(self) -> dict:
+        return {
+            "attempts": {
+                str(attempt): {
+                    "valid": valid,
+                    "invalid": invalid,
+                    "success_rate": round(valid / (valid + invalid), 3),
+                }
+                for attempt, (valid, invalid) in sorted(self._attempts.items())
+            },
+            "exhausted": self.exhausted,
+        }
+
+
+repair_stats = RepairStats()
+
 
 def _extract_text(response: Any) -> str:
     if hasattr(response, "output_text") and response.output_text:
@@ -22,49 +68,221 @@ def _extract_text(response: Any) -> str:
     raise ValueError("Unable to extract text from OpenAI response")
 
 
-def generate_workflow(payload: GenerateRequest) -> WorkflowData:
+def generation_error(exc: Exception) -> tuple[int, str]:
+    """HTTP status and client-facing message for a failed generation."""
+    if isinstance(exc, GenerationBusy):
+        return 429, str(exc)
+    if isinstance(exc, InvalidGeneration):
+        logger.warning("Generated workflow failed validation: %s", exc)
+        return 502, "Generation returned an invalid workflow"
+    if isinstance(exc, ValueError):
+        return 400, str(exc)
+    if isinstance(exc, openai.APITimeoutError):
+        return 504, "Generation timed out"
+    if isinstance(exc, openai.APIError):
+        logger.warning("OpenAI request failed: %s", exc)
+        return 502, "Generation service unavailable"
+    logger.exception("Workflow generation failed", exc_info=exc)
+    return 500, "Generation failed"
+
+
+def appending(payload: GenerateRequest) -> bool:
+    """Append mode against a non-empty graph: the model only writes the new fragment (see graph_merge)."""
+    return payload.mode == "append" and payload.existing_workflow is not None and bool(payload.existing_workflow.nodes)
+
+
+NODE_TYPES = (
+    "start, webhook_trigger, schedule_trigger, task, http_request, transform_mapper, "
+    "validator, delay, delay_wait, decision, switch_router, parallel_fork, join_merge, loop_foreach, manual_review, "
+    "log_event, notify_alert, end, end_fail"
+)
+NODE_SETTINGS = (
+    "Node settings also go in data: http_request url, method, headers, body, timeout, allowFailure; "
+    "delay/delay_wait seconds or ms; transform_mapper mapping; validator required (list of paths); decision path, "
+    "operator, value; switch_router path; loop_foreach items, concurrency; log_event/notify_alert/end_fail message; "
+    "schedule_trigger cron or intervalSeconds, enabled; webhook_trigger startRun. Strings may reference "
+    "{{ input.<field> }} or {{ nodes.<node_id>.<field> }}. Write headers, body and mapping as lists of {key, value} "
+    "and set settings a node does not use to null."
+)
+
+
+def build_messages(payload: GenerateRequest) -> list[dict[str, str]]:
+    if appending(payload):
+        system_prompt = (
+            "Return ONLY a JSON object with keys: nodes, edges.\n"
+            "They describe steps to append to an existing workflow. Do not include start or trigger nodes; the first "
+            "new node is connected to the existing workflow's open ends by the caller.\n"
+            f"Use valid node types only: {NODE_TYPES}.\n"
+            "Each node must be: { id, type, data: {label, description?, status, color?, ...} }.\n"
+            f"{NODE_SETTINGS}\n"
+            "Each edge must be: { id, source, target, sourceHandle? } and only reference new nodes.\n"
+            "Always include at least one end-type node."
+        )
+        user_prompt = (
+            f"Description: {payload.description}\n"
+            "Use status 'Ready' for node data status field.\n"
+            "Provide ids like new_1, new_2 and new_edge_1, new_edge_2.\n"
+            f"Existing workflow open ends: {json.dumps(graph_digest(payload.existing_workflow.model_dump()))}"
+        )
+    else:
+        system_prompt = (
+            "Return ONLY a JSON object with keys: id, name, updatedAt, nodes, edges.\n"
+            f"Use valid node types only: {NODE_TYPES}.\n"
+            "Each node must be: { id, type, position: {x,y}, data: {label, description?, status, color?, ...} }.\n"
+            f"{NODE_SETTINGS}\n"
+            "Each edge must be: { id, source, target, sourceHandle? }.\n"
+            "Always include at least one start-type node and one end-type node."
+        )
+        user_prompt = (
+            f"Description: {payload.description}\n"
+            f"Mode: {payload.mode}.\n"
+            "Use status 'Ready' for node data status field.\n"
+            "Provide ids like node_1, node_2 and edge_1, edge_2."
+        )
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def response_format(payload: GenerateRequest) -> dict[str, Any]:
+    if settings.GENERATION_RESPONSE_FORMAT != "json_schema":
+        return {"type": "json_object"}
+    return FRAGMENT_FORMAT if appending(payload) else WORKFLOW_FORMAT
+
+
+def _validate(raw: str, payload: GenerateRequest) -> tuple[WorkflowData | None, str | None]:
+    """The finalized workflow, or a compact description of what is wrong with ``raw``."""
+    try:
+        return finalize_workflow(json.loads(raw), payload), None
+    except json.JSONDecodeError as exc:
+        return None, f"Invalid JSON: {exc}"
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False)[:MAX_REPORTED_ERRORS]
+        return None, "\n".join(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']} (got {repr(error['input'])[:80]})" for error in errors
+        )
+    except (AttributeError, KeyError, TypeError, ValueError) as exc:
+        return None, f"Invalid structure: {exc!r}"
+
+
+async def _complete(payload: GenerateRequest, messages: list[dict[str, str]]) -> str:
     if not settings.OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY is not configured")
-
     client = get_openai_client()
+    response = await client.chat.completions.create(
+        model=settings.OPENAI_MODEL,
+        messages=messages,
+        response_format=response_format(payload),
+    )
+    return _extract_text(response)
 
-    schema = WorkflowData.model_json_schema()
 
-    system_prompt = (
-        "Return ONLY a JSON object with keys: id, name, updatedAt, nodes, edges.\n"
-        "Use valid node types only: start, webhook_trigger, schedule_trigger, task, http_request, transform_mapper, "
-        "validator, delay, delay_wait, decision, switch_router, parallel_fork, join_merge, loop_foreach, manual_review, "
-        "log_event, notify_alert, end, end_fail.\n"
-        "Each node must be: { id, type, position: {x,y}, data: {label, description?, status, color?, ...} }.\n"
-        "Each edge must be: { id, source, target, sourceHandle? }.\n"
-        "Always include at least one start-type node and one end-type node."
-    )
+async def _repaired(
+    payload: GenerateRequest, messages: list[dict[str, str]], raw: str
+) -> tuple[str, WorkflowData]:
+    """Validate ``raw``; while it is invalid, send just the errors back for up to GENERATION_REPAIR_ATTEMPTS
+    fix-up turns. Returns the valid raw output and its workflow."""
+    attempt = 1
+    while True:
+        workflow, errors = _validate(raw, payload)
+        repair_stats.record(attempt, workflow is not None)
+        if workflow is not None:
+            return raw, workflow
+        if attempt > settings.GENERATION_REPAIR_ATTEMPTS:
+            repair_stats.exhausted += 1
+            raise InvalidGeneration(errors)
+        messages = [
+            *messages,
+            {"role": "assistant", "content": raw},
+            {"role": "user", "content": f"That output is invalid:\n{errors}\nReturn the corrected JSON object only."},
+        ]
+        raw = await _complete(payload, messages)
+        attempt += 1
 
-    mode = payload.mode
-    user_prompt = (
-        f"Description: {payload.description}\n"
-        f"Mode: {mode}.\n"
-        "Use status 'Ready' for node data status field.\n"
-        "Provide ids like node_1, node_2 and edge_1, edge_2."
-    )
-    if payload.existing_workflow and mode == "append":
-        user_prompt += (
-            "\nExisting workflow JSON follows. Append new nodes to the right (offset x by +400). "
-            "Preserve existing nodes/edges and connect the last reachable end to the new start when possible.\n"
-            f"Existing: {payload.existing_workflow.model_dump()}"
+
+async def _fresh_completion(payload: GenerateRequest, cache_key: str, user_id: str, bounded: bool) -> str:
+    async with await generation_limiter.acquire(user_id, bounded):
+        messages = build_messages(payload)
+        raw, _ = await _repaired(payload, messages, await _complete(payload, messages))
+    await generation_cache.put(cache_key, raw)
+    return raw
+
+
+async def generate_workflow(
+    payload: GenerateRequest, cache_key: str, user_id: str, cached: str | None = None, bounded: bool = True
+) -> WorkflowData:
+    """Generate a workflow, or rebuild it from ``cached`` raw model output. Concurrent requests with the same
+    ``cache_key`` share one upstream call, which counts against the first caller's concurrency limit. If that
+    caller is turned away by its own limit, the others try again under theirs rather than sharing its 429."""
+    raw = cached
+    if raw is None:
+        raw = await generation_flights.do(
+            cache_key, lambda: _fresh_completion(payload, cache_key, user_id, bounded), private=(GenerationBusy,)
         )
+    return finalize_workflow(json.loads(raw), payload)
+
+
+def _preview(key: str, item: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    """A streamed node or edge event; node data is cleaned the way finalize_workflow cleans it."""
+    if key != "nodes":
+        return "edge", item
+    if isinstance(item.get("data"), dict):
+        try:
+            item = {**item, "data": clean_node_data(item["data"])}
+        except ValueError:
+            pass  # left as generated; the final workflow event reports the problem
+    return "node", item
+
+
+async def stream_workflow(
+    payload: GenerateRequest, cache_key: str, cached: str | None = None
+) -> AsyncIterator[tuple[str, Any]]:
+    """Yield ("node", node) and ("edge", edge) as soon as each is complete in the streamed completion, then
+    ("workflow", WorkflowData) with the repaired result. Cached output is replayed without calling the model."""
+    if cached is not None:
+        data = json.loads(cached)
+        for key in ("nodes", "edges"):
+            for item in data.get(key, []):
+                if isinstance(item, dict):
+                    yield _preview(key, item)
+        yield "workflow", finalize_workflow(json.loads(cached), payload)
+        return
 
-    response = client.chat.completions.create(
+    if not settings.OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY is not configured")
+
+    client = get_openai_client()
+    messages = build_messages(payload)
+    stream = await client.chat.completions.create(
         model=settings.OPENAI_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format={"type": "json_object"},
+        messages=messages,
+        response_format=response_format(payload),
+        stream=True,
     )
+    parser = ArrayItemParser(("nodes", "edges"))
+    async with stream:
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for key, item in parser.feed(chunk.choices[0].delta.content):
+                if isinstance(item, dict):
+                    yield _preview(key, item)
+    # Repair turns, if any, are not streamed; the final workflow event carries the result.
+    raw, workflow = await _repaired(payload, messages, parser.text)
+    await generation_cache.put(cache_key, raw)
+    yield "workflow", workflow
+
 
-    raw = _extract_text(response)
-    data = json.loads(raw)
+def finalize_workflow(data: dict[str, Any], payload: GenerateRequest) -> WorkflowData:
+    """Fill in missing ids/positions, ensure start and end nodes and a connected path, then lay the graph out.
+    In append mode ``data`` is only the new fragment and is merged into the existing workflow instead."""
+    for node in data.get("nodes", []):
+        if isinstance(node, dict) and isinstance(node.get("data"), dict):
+            node["data"] = clean_node_data(node["data"])
+    if appending(payload):
+        return WorkflowData.model_validate(merge_fragment(payload.existing_workflow.model_dump(), data))
     if "id" not in data:
         data["id"] = "wf_generated"
     if "name" not in data:
@@ -131,10 +349,7 @@ def generate_workflow(payload: GenerateRequest) -> WorkflowData:
                 )
                 incoming[node_id] = 1
 
-    # Normalize positions to a tidy horizontal flow
-    for idx, node in enumerate(nodes):
-        node["position"] = {"x": idx * 260, "y": 0}
-
     data["nodes"] = nodes
     data["edges"] = edges
+    apply_layout(data)
     return WorkflowData.model_validate(data)
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import time
+import unicodedata
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.generation_cache import GenerationCacheEntry
+from app.schemas.workflow import GenerateRequest
+from app.services.cache import LRUCache
+from app.services.graph_merge import graph_digest
+
+# Raw model output keyed by what actually shapes the prompt, so near-identical requests share one completion.
+# An in-memory LRU (sized in bytes) sits in front of the generation_cache table; both honour the TTL. Callers
+# re-run finalize_workflow on hits, so per-request fields such as the fallback name still apply.
+
+PRUNE_EVERY_WRITES = 64
+
+
+def normalize_description(description: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", description).casefold().split())
+
+
+def cache_key(payload: GenerateRequest) -> str:
+    existing = None
+    # Only append mode puts the existing graph in the prompt, and then only its open ends (see graph_merge).
+    if payload.mode == "append" and payload.existing_workflow is not None and payload.existing_workflow.nodes:
+        digest = json.dumps(graph_digest(payload.existing_workflow.model_dump()), sort_keys=True)
+        existing = hashlib.sha256(digest.encode("utf-8")).hexdigest()
+    parts = [normalize_description(payload.description), payload.mode, settings.OPENAI_MODEL, existing]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def cache_status(payload: GenerateRequest, cached: str | None) -> str:
+    if cached is not None:
+        return "hit"
+    return "bypass" if payload.cache == "bypass" else "miss"
+
+
+def _load(key: str) -> tuple[str, float] | None:
+    db = SessionLocal()
+    try:
+        entry = (
+            db.query(GenerationCacheEntry.response_json, GenerationCacheEntry.expires_at)
+            .filter(GenerationCacheEntry.key == key, GenerationCacheEntry.expires_at > datetime.utcnow())
+            .first()
+        )
+        if entry is None:
+            return None
+        return entry.response_json, time.time() + (entry.expires_at - datetime.utcnow()).total_seconds()
+    finally:
+        db.close()
+
+
+def _store(key: str, raw: str, prune: bool) -> None:
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        db.merge(
+            GenerationCacheEntry(
+                key=key,
+                model=settings.OPENAI_MODEL,
+                response_json=raw,
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.GENERATION_CACHE_TTL_SECONDS),
+            )
+        )
+        if prune:
+            db.flush()
+            db.query(GenerationCacheEntry).filter(GenerationCacheEntry.expires_at <= now).delete(
+                synchronize_session=False
+            )
+            excess = db.query(func.count(GenerationCacheEntry.key)).scalar() - settings.GENERATION_CACHE_MAX_ROWS
+            if excess > 0:
+                oldest = select(GenerationCacheEntry.key).order_by(GenerationCacheEntry.created_at).limit(excess)
+                db.query(GenerationCacheEntry).filter(GenerationCacheEntry.key.in_(oldest)).delete(
+                    synchronize_session=False
+                )
+        db.commit()
+    finally:
+        db.close()
+
+
+class GenerationCache:
+    def __init__(self) -> None:
+        self._memory = LRUCache(max_size=settings.GENERATION_CACHE_MEMORY_BYTES)
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.writes = 0
+
+    async def lookup(self, payload: GenerateRequest) -> tuple[str, str | None]:
+        """Return the request's cache key and the cached raw completion, if any."""
+        key = cache_key(payload)
+        if payload.cache == "bypass":
+            self.bypassed += 1
+            return key, None
+        return key, await self.get(key)
+
+    async def get(self, key: str) -> str | None:
+        if not settings.GENERATION_CACHE_ENABLED:
+            return None
+        entry = self._memory.get(key)
+        if entry is not None:
+            raw, expires = entry
+            if expires > time.time():
+                self.memory_hits += 1
+                return raw
+            self._memory.pop(key)
+        stored = await run_in_threadpool(_load, key)
+        if stored is None:
+            self.misses += 1
+            return None
+        self.db_hits += 1
+        self._memory.set(key, stored, size=len(stored[0]))
+        return stored[0]
+
+    async def put(self, key: str, raw: str) -> None:
+        if not settings.GENERATION_CACHE_ENABLED:
+            return
+        self._memory.set(key, (raw, time.time() + settings.GENERATION_CACHE_TTL_SECONDS), size=len(raw))
+        self.writes += 1
+        await run_in_threadpool(_store, key, raw, self.writes % PRUNE_EVERY_WRITES == 1)
+
+    def stats(self) -> dict:
+        memory = self._memory.stats()
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "entries": memory["entries"],
+            "size": memory["size"],
+            "max_size": memory["max_size"],
+            "evictions": memory["evictions"],
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "writes": self.writes,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+generation_cache = GenerationCache()
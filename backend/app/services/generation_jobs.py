@@ -0,0 +1,186 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.generation_job import GenerationJob
+from app.schemas.workflow import GenerateRequest, WorkflowData
+from app.services.audit import log_event
+from app.services.generate import generate_workflow, generation_error
+from app.services.generation_cache import cache_status, generation_cache
+
+logger = logging.getLogger(__name__)
+
+# Generation jobs are rows in generation_jobs worked off by GENERATION_JOB_WORKERS asyncio tasks, so queued and
+# running jobs hold neither HTTP connections nor threadpool threads. Completion is signalled in-process for
+# long-polling clients; the row is always the source of truth.
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def recover_jobs() -> list[str]:
+    """Fail jobs that were running when the previous process died; return queued ids, oldest first."""
+    db = SessionLocal()
+    try:
+        db.query(GenerationJob).filter(GenerationJob.status == "running").update(
+            {
+                "status": "failed",
+                "error": "Interrupted by restart",
+                "error_status": 500,
+                "finished_at": datetime.utcnow(),
+            }
+        )
+        db.commit()
+        rows = (
+            db.query(GenerationJob.id)
+            .filter(GenerationJob.status == "queued")
+            .order_by(GenerationJob.created_at)
+            .all()
+        )
+        return [row[0] for row in rows]
+    finally:
+        db.close()
+
+
+def _claim(job_id: str) -> tuple[str, GenerateRequest] | None:
+    db = SessionLocal()
+    try:
+        job = db.query(GenerationJob).filter(GenerationJob.id == job_id, GenerationJob.status == "queued").first()
+        if job is None:
+            return None
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+        return job.actor_id, GenerateRequest.model_validate_json(job.request_json)
+    finally:
+        db.close()
+
+
+def _finish(
+    job_id: str,
+    actor_id: str,
+    workflow: WorkflowData | None,
+    cache: str | None,
+    error: str | None = None,
+    error_status: int | None = None,
+) -> None:
+    db = SessionLocal()
+    try:
+        db.query(GenerationJob).filter(GenerationJob.id == job_id).update(
+            {
+                "status": "succeeded" if workflow is not None else "failed",
+                "result_json": workflow.model_dump_json() if workflow is not None else None,
+                "cache": cache,
+                "error": error,
+                "error_status": error_status,
+                "finished_at": datetime.utcnow(),
+            }
+        )
+        if workflow is None:
+            db.commit()
+            return
+        log_event(db, action="workflow.generate", actor_id=actor_id, target_type="workflow", target_id=workflow.id)
+    finally:
+        db.close()
+
+
+def fail_job(job_id: str, error: str, error_status: int) -> None:
+    _finish(job_id, "", None, None, error, error_status)
+
+
+class GenerationJobs:
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._done: dict[str, asyncio.Event] = {}
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=settings.GENERATION_JOB_QUEUE_SIZE)
+        self._done = {}
+        for job_id in await run_in_threadpool(recover_jobs):
+            try:
+                self.submit(job_id)
+            except JobQueueFull:
+                await run_in_threadpool(fail_job, job_id, "Job queue full after restart", 503)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(settings.GENERATION_JOB_WORKERS)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def full(self) -> bool:
+        return self._queue is None or self._queue.full()
+
+    def submit(self, job_id: str) -> None:
+        if self._queue is None:
+            raise JobQueueFull()
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull as exc:
+            raise JobQueueFull() from exc
+        self._done[job_id] = asyncio.Event()
+
+    async def wait(self, job_id: str, timeout: float) -> None:
+        """Return when the job finishes (or ``timeout`` passes); immediately if it isn't pending here."""
+        event = self._done.get(job_id)
+        if event is None:
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self.running += 1
+            try:
+                await self._execute(job_id)
+            except Exception:  # noqa: BLE001
+                logger.exception("Generation job %s crashed", job_id)
+            finally:
+                self.running -= 1
+                event = self._done.pop(job_id, None)
+                if event is not None:
+                    event.set()
+                self._queue.task_done()
+
+    async def _execute(self, job_id: str) -> None:
+        claimed = await run_in_threadpool(_claim, job_id)
+        if claimed is None:
+            return
+        actor_id, payload = claimed
+        key, cached = await generation_cache.lookup(payload)
+        cache = cache_status(payload, cached)
+        try:
+            workflow = await generate_workflow(payload, key, actor_id, cached, bounded=False)
+        except Exception as exc:  # noqa: BLE001
+            status_code, detail = generation_error(exc)
+            self.failed += 1
+            await run_in_threadpool(_finish, job_id, actor_id, None, cache, detail, status_code)
+            return
+        self.succeeded += 1
+        await run_in_threadpool(_finish, job_id, actor_id, workflow, cache)
+
+
+generation_jobs = GenerationJobs()
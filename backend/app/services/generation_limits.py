@@ -0,0 +1,202 @@
+import asyncio
+import functools
+import time
+import weakref
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from app.core.config import settings
+
+# Identical in-flight generations share one upstream call (Singleflight). Calls that do reach the model go through
+# FairLimiter: at most GENERATION_MAX_CONCURRENT at once and GENERATION_MAX_PER_USER per user. Waiters queue per
+# user and freed slots go round-robin across users, so one user's burst can't starve everyone else; a full queue
+# is rejected immediately.
+
+
+class GenerationBusy(Exception):
+    pass
+
+
+class Singleflight:
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.retried = 0
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]], private: tuple[type[BaseException], ...] = ()
+    ) -> Any:
+        """Run ``fn`` or join the call already in flight for ``key``. Exceptions of a ``private`` type belong to
+        the leader (e.g. its own rate limit); followers run ``fn`` themselves instead of sharing them."""
+        while True:
+            task = self._calls.get(key)
+            leader = task is None
+            if leader:
+                self.leaders += 1
+                task = asyncio.ensure_future(fn())
+                self._calls[key] = task
+                task.add_done_callback(functools.partial(self._forget, key))
+            else:
+                self.coalesced += 1
+            try:
+                # Shielded so a caller that goes away doesn't cancel the call for the others.
+                return await asyncio.shield(task)
+            except private:
+                if leader:
+                    raise
+                self.retried += 1
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "retried": self.retried,
+        }
+
+
+class Slot:
+    def __init__(self, limiter: "FairLimiter", user_id: str) -> None:
+        self._limiter = limiter
+        self._user_id = user_id
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._limiter._release(self._user_id)
+
+    def release_with(self, owner: Any) -> None:
+        """Also release when ``owner`` is garbage collected, e.g. a response body that is never iterated."""
+        weakref.finalize(owner, self.release)
+
+    async def __aenter__(self) -> "Slot":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class FairLimiter:
+    def __init__(self) -> None:
+        self._active: dict[str, int] = {}
+        self._running = 0
+        self._waiters: dict[str, deque[asyncio.Future]] = {}
+        self._rotation: deque[str] = deque()
+        self._queued = 0
+        self._waits: deque[float] = deque(maxlen=1024)
+        self.granted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_queued = 0
+
+    def _has_room(self, user_id: str) -> bool:
+        return (
+            self._running < settings.GENERATION_MAX_CONCURRENT
+            and self._active.get(user_id, 0) < settings.GENERATION_MAX_PER_USER
+        )
+
+    def _grant(self, user_id: str) -> None:
+        self._running += 1
+        self._active[user_id] = self._active.get(user_id, 0) + 1
+        self.granted += 1
+
+    async def acquire(self, user_id: str, bounded: bool = True) -> Slot:
+        """Wait for a slot. ``bounded=False`` (background jobs) skips the queue limits and the wait timeout."""
+        if self._has_room(user_id) and not self._waiters.get(user_id):
+            self._grant(user_id)
+            return Slot(self, user_id)
+        waiters = self._waiters.get(user_id)
+        if bounded and (
+            self._queued >= settings.GENERATION_QUEUE_SIZE
+            or (waiters and len(waiters) >= settings.GENERATION_QUEUE_PER_USER)
+        ):
+            self.rejected += 1
+            raise GenerationBusy("Too many generation requests queued")
+        future = asyncio.get_running_loop().create_future()
+        if waiters is None:
+            waiters = self._waiters[user_id] = deque()
+            self._rotation.append(user_id)
+        waiters.append(future)
+        self._queued += 1
+        self.max_queued = max(self.max_queued, self._queued)
+        started = time.monotonic()
+        try:
+            timeout = settings.GENERATION_QUEUE_TIMEOUT_SECONDS if bounded else None
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if future.done() and not future.cancelled():
+                # Granted just as we gave up: hand the slot on.
+                self._release(user_id)
+            else:
+                future.cancel()
+                self._drop_waiter(user_id, future)
+            if isinstance(exc, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise GenerationBusy("Timed out waiting for a generation slot") from exc
+            raise
+        self._waits.append(time.monotonic() - started)
+        return Slot(self, user_id)
+
+    def _drop_waiter(self, user_id: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(user_id)
+        if waiters is not None and future in waiters:
+            waiters.remove(future)
+            self._queued -= 1
+            if not waiters:
+                self._waiters.pop(user_id, None)
+                self._rotation.remove(user_id)
+
+    def _release(self, user_id: str) -> None:
+        self._running -= 1
+        self._active[user_id] -= 1
+        if not self._active[user_id]:
+            del self._active[user_id]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        # Round-robin over users with waiters, skipping those at their own limit.
+        skipped = 0
+        while self._rotation and self._running < settings.GENERATION_MAX_CONCURRENT and skipped < len(self._rotation):
+            user_id = self._rotation.popleft()
+            waiters = self._waiters[user_id]
+            if self._active.get(user_id, 0) >= settings.GENERATION_MAX_PER_USER:
+                self._rotation.append(user_id)
+                skipped += 1
+                continue
+            skipped = 0
+            future = waiters.popleft()
+            self._queued -= 1
+            if waiters:
+                self._rotation.append(user_id)
+            else:
+                del self._waiters[user_id]
+            self._grant(user_id)
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "running": self._running,
+            "queued": self._queued,
+            "max_queued": self.max_queued,
+            "users_waiting": len(self._rotation),
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+            "wait_p95_ms": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+            "wait_max_ms": round(waits[-1] * 1000, 1) if waits else 0.0,
+        }
+
+
+generation_flights = Singleflight()
+generation_limiter = FairLimiter()
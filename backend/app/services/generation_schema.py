@@ -0,0 +1,112 @@
+from typing import Any, get_args
+
+from app.schemas.workflow import NodeType
+
+# Response formats for OpenAI structured outputs, built once at import. Strict mode needs every property listed
+# as required and no additional properties, so these are written out by hand rather than taken from
+# WorkflowData.model_json_schema(): optional fields are nullable instead. finalize_workflow still validates the
+# result against WorkflowData.
+
+
+def _object(properties: dict[str, Any]) -> dict[str, Any]:
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+def _nullable(schema: dict[str, Any]) -> dict[str, Any]:
+    return {"anyOf": [schema, {"type": "null"}]}
+
+
+_STRING = {"type": "string"}
+_OPTIONAL_STRING = {"type": ["string", "null"]}
+_OPTIONAL_NUMBER = {"type": ["number", "null"]}
+_OPTIONAL_BOOLEAN = {"type": ["boolean", "null"]}
+_SCALAR = {"type": ["string", "number", "boolean", "null"]}
+
+# Free-form objects can't be described under strict mode, so headers, body and mapping are written as lists of
+# {key, value} entries and turned back into objects by clean_node_data.
+_ENTRY_FIELDS = ("headers", "body", "mapping")
+_ENTRIES = _nullable({"type": "array", "items": _object({"key": _STRING, "value": _SCALAR})})
+
+# The settings the run engine and the trigger services read from node data (see the README's node settings).
+# Strict mode makes every node carry all of them; the ones a node type doesn't use come back null.
+_NODE_CONFIG = {
+    "url": _OPTIONAL_STRING,
+    "method": {"type": ["string", "null"], "enum": ["GET", "POST", "PUT", "PATCH", "DELETE", None]},
+    "headers": _ENTRIES,
+    "body": _ENTRIES,
+    "timeout": _OPTIONAL_NUMBER,
+    "allowFailure": _OPTIONAL_BOOLEAN,
+    "seconds": _OPTIONAL_NUMBER,
+    "ms": _OPTIONAL_NUMBER,
+    "mapping": _ENTRIES,
+    "required": _nullable({"type": "array", "items": _STRING}),
+    "path": _OPTIONAL_STRING,
+    "operator": {
+        "type": ["string", "null"],
+        "enum": ["eq", "ne", "gt", "gte", "lt", "lte", "in", "exists", "truthy", None],
+    },
+    "value": {"anyOf": [_SCALAR, {"type": "array", "items": {"type": ["string", "number", "boolean"]}}]},
+    "items": _OPTIONAL_STRING,
+    "concurrency": {"type": ["integer", "null"]},
+    "message": _OPTIONAL_STRING,
+    "cron": _OPTIONAL_STRING,
+    "intervalSeconds": _OPTIONAL_NUMBER,
+    "enabled": _OPTIONAL_BOOLEAN,
+    "startRun": _OPTIONAL_BOOLEAN,
+}
+
+_NODE_DATA = _object(
+    {
+        "label": _STRING,
+        "description": _OPTIONAL_STRING,
+        "status": _STRING,
+        "color": _OPTIONAL_STRING,
+        **_NODE_CONFIG,
+    }
+)
+_NODE_FIELDS = {"id": _STRING, "type": {"type": "string", "enum": list(get_args(NodeType))}}
+_POSITION = _object({"x": {"type": "number"}, "y": {"type": "number"}})
+_EDGE = _object({"id": _STRING, "source": _STRING, "target": _STRING, "sourceHandle": _OPTIONAL_STRING})
+
+
+def _response_format(name: str, schema: dict[str, Any]) -> dict[str, Any]:
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+
+WORKFLOW_FORMAT = _response_format(
+    "workflow",
+    _object(
+        {
+            "id": _STRING,
+            "name": _STRING,
+            "updatedAt": _STRING,
+            "nodes": {"type": "array", "items": _object({**_NODE_FIELDS, "position": _POSITION, "data": _NODE_DATA})},
+            "edges": {"type": "array", "items": _EDGE},
+        }
+    ),
+)
+
+# Append mode: the server positions the fragment, so nodes carry no position.
+FRAGMENT_FORMAT = _response_format(
+    "workflow_fragment",
+    _object(
+        {
+            "nodes": {"type": "array", "items": _object({**_NODE_FIELDS, "data": _NODE_DATA})},
+            "edges": {"type": "array", "items": _EDGE},
+        }
+    ),
+)
+
+
+def clean_node_data(data: dict[str, Any]) -> dict[str, Any]:
+    """Drop the settings the model left null and turn {key, value} entry lists back into objects."""
+    cleaned = {}
+    for key, value in data.items():
+        if key in _NODE_CONFIG and value is None:
+            continue
+        if key in _ENTRY_FIELDS and isinstance(value, list):
+            if not all(isinstance(entry, dict) and "key" in entry for entry in value):
+                raise ValueError(f"data.{key} must be a list of {{key, value}} entries")
+            value = {str(entry["key"]): entry.get("value") for entry in value}
+        cleaned[key] = value
+    return cleaned
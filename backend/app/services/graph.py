@@ -0,0 +1,258 @@
+import hashlib
+import json
+from collections import deque
+from typing import Any
+
+from app.core.config import settings
+from app.schemas.workflow import ForkJoinPair, GraphCycle, GraphIssue, GraphReport
+from app.services.cache import LRUCache
+
+START_TYPES = frozenset({"start", "webhook_trigger", "schedule_trigger"})
+END_TYPES = frozenset({"end", "end_fail"})
+
+_report_cache = LRUCache(max_size=settings.GRAPH_REPORT_CACHE_SIZE)
+
+
+class GraphIndex:
+    """Nodes numbered 0..n-1 with CSR (offsets + flat target array) forward and reverse adjacency."""
+
+    def __init__(self, nodes: list[dict[str, Any]], edges: list[dict[str, Any]]) -> None:
+        self.ids: list[str] = []
+        self.types: list[str] = []
+        self.position: dict[str, int] = {}
+        self.duplicate_nodes: list[str] = []
+        for node in nodes:
+            node_id = node["id"]
+            if node_id in self.position:
+                self.duplicate_nodes.append(node_id)
+                continue
+            self.position[node_id] = len(self.ids)
+            self.ids.append(node_id)
+            self.types.append(node.get("type", ""))
+
+        self.dangling_edges: list[dict[str, Any]] = []
+        self.edge_ids: list[str] = []
+        sources: list[int] = []
+        targets: list[int] = []
+        for edge in edges:
+            source = self.position.get(edge.get("source"))
+            target = self.position.get(edge.get("target"))
+            if source is None or target is None:
+                self.dangling_edges.append(edge)
+                continue
+            sources.append(source)
+            targets.append(target)
+            self.edge_ids.append(edge.get("id", ""))
+
+        self.out_offsets, self.out_targets = _csr(len(self.ids), sources, targets)
+        self.in_offsets, self.in_sources = _csr(len(self.ids), targets, sources)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def successors(self, node: int) -> list[int]:
+        return self.out_targets[self.out_offsets[node] : self.out_offsets[node + 1]]
+
+    def predecessors(self, node: int) -> list[int]:
+        return self.in_sources[self.in_offsets[node] : self.in_offsets[node + 1]]
+
+
+def _csr(count: int, sources: list[int], targets: list[int]) -> tuple[list[int], list[int]]:
+    offsets = [0] * (count + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for idx in range(count):
+        offsets[idx + 1] += offsets[idx]
+    cursor = offsets[:-1]
+    flat = [0] * len(sources)
+    for source, target in zip(sources, targets):
+        flat[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, flat
+
+
+def reachable_from(graph: GraphIndex, roots: list[int]) -> list[bool]:
+    seen = [False] * len(graph)
+    queue = deque(roots)
+    for root in roots:
+        seen[root] = True
+    while queue:
+        node = queue.popleft()
+        for target in graph.successors(node):
+            if not seen[target]:
+                seen[target] = True
+                queue.append(target)
+    return seen
+
+
+def strongly_connected_components(graph: GraphIndex) -> list[list[int]]:
+    """Iterative Tarjan. Components come out in reverse topological order, each with its DFS root last."""
+    count = len(graph)
+    index = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack: list[int] = []
+    components: list[list[int]] = []
+    counter = 0
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        work = [(root, graph.out_offsets[root])]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            node, edge_pos = work[-1]
+            if edge_pos < graph.out_offsets[node + 1]:
+                work[-1] = (node, edge_pos + 1)
+                target = graph.out_targets[edge_pos]
+                if index[target] == -1:
+                    index[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = True
+                    work.append((target, graph.out_offsets[target]))
+                elif on_stack[target]:
+                    low[node] = min(low[node], index[target])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def _pair_forks(graph: GraphIndex, order: list[int], report: GraphReport) -> None:
+    """Match each parallel_fork with its join_merge by propagating a stack of open forks in topological order.
+
+    Stacks are immutable (fork, parent) chains, so pushing and popping are O(1) and two branches carry the
+    same open forks exactly when their stacks are the same object.
+    """
+    stacks: list[Any] = [None] * len(graph)
+    done = [False] * len(graph)
+    joins_by_fork: dict[int, list[int]] = {}
+    for node in order:
+        incoming = [stacks[pred] for pred in graph.predecessors(node) if done[pred]]
+        stack = incoming[0] if incoming else None
+        node_type = graph.types[node]
+        node_id = graph.ids[node]
+        if any(other is not stack for other in incoming[1:]):
+            code, message = (
+                ("mismatched_join", "join_merge combines branches from different parallel_fork nodes")
+                if node_type == "join_merge"
+                else ("unjoined_merge", "parallel branches merge without a join_merge")
+            )
+            report.errors.append(GraphIssue(code=code, message=message, node_id=node_id))
+        if node_type == "join_merge":
+            if stack is None:
+                report.errors.append(
+                    GraphIssue(code="unmatched_join", message="join_merge has no open parallel_fork", node_id=node_id)
+                )
+            else:
+                fork, stack = stack
+                joins_by_fork.setdefault(fork, []).append(node)
+        elif node_type == "parallel_fork":
+            stack = (node, stack)
+        stacks[node] = stack
+        done[node] = True
+
+    for node in order:
+        if graph.types[node] != "parallel_fork":
+            continue
+        joins = joins_by_fork.get(node, [])
+        fork_id = graph.ids[node]
+        if not joins:
+            report.errors.append(
+                GraphIssue(code="unmatched_fork", message="parallel_fork has no matching join_merge", node_id=fork_id)
+            )
+        elif len(joins) > 1:
+            report.errors.append(
+                GraphIssue(
+                    code="ambiguous_join",
+                    message="parallel_fork branches end in several join_merge nodes",
+                    node_id=fork_id,
+                )
+            )
+        report.fork_joins.append(ForkJoinPair(fork=fork_id, joins=[graph.ids[join] for join in joins]))
+
+
+def analyze_graph(nodes: list[dict[str, Any]], edges: list[dict[str, Any]]) -> GraphReport:
+    graph = GraphIndex(nodes, edges)
+    report = GraphReport(valid=True, node_count=len(graph), edge_count=len(edges))
+
+    for node_id in graph.duplicate_nodes:
+        report.errors.append(
+            GraphIssue(code="duplicate_node", message="Node id is used more than once", node_id=node_id)
+        )
+    for edge in graph.dangling_edges:
+        report.errors.append(
+            GraphIssue(
+                code="dangling_edge",
+                message=f"Edge points at a missing node ({edge.get('source')} -> {edge.get('target')})",
+                edge_id=edge.get("id"),
+            )
+        )
+
+    starts = [idx for idx, node_type in enumerate(graph.types) if node_type in START_TYPES]
+    report.start_nodes = [graph.ids[idx] for idx in starts]
+    if not starts:
+        report.errors.append(GraphIssue(code="no_start", message="Workflow has no start or trigger node"))
+    else:
+        seen = reachable_from(graph, starts)
+        report.unreachable = [graph.ids[idx] for idx in range(len(graph)) if not seen[idx]]
+        for node_id in report.unreachable:
+            report.warnings.append(
+                GraphIssue(code="unreachable", message="Node is not reachable from a start node", node_id=node_id)
+            )
+    if not any(node_type in END_TYPES for node_type in graph.types):
+        report.warnings.append(GraphIssue(code="no_end", message="Workflow has no end node"))
+
+    components = strongly_connected_components(graph)
+    order: list[int] = []
+    for component in reversed(components):
+        members = component[::-1]
+        order.extend(members)
+        if len(members) == 1 and members[0] not in graph.successors(members[0]):
+            continue
+        allowed = any(graph.types[member] == "loop_foreach" for member in members)
+        member_ids = [graph.ids[member] for member in members]
+        report.cycles.append(GraphCycle(nodes=member_ids, allowed=allowed))
+        if not allowed:
+            report.errors.append(
+                GraphIssue(
+                    code="cycle", message="Cycle does not pass through a loop_foreach node", node_id=member_ids[0]
+                )
+            )
+    report.topological_order = [graph.ids[idx] for idx in order]
+
+    _pair_forks(graph, order, report)
+    report.valid = not report.errors
+    return report
+
+
+def graph_content_hash(nodes: list[dict[str, Any]], edges: list[dict[str, Any]]) -> str:
+    payload = json.dumps({"nodes": nodes, "edges": edges}, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def analyze_graph_cached(nodes: list[dict[str, Any]], edges: list[dict[str, Any]]) -> GraphReport:
+    key = graph_content_hash(nodes, edges)
+    report = _report_cache.get(key)
+    if report is None:
+        report = analyze_graph(nodes, edges)
+        _report_cache.set(key, report)
+    return report
+
+
+def report_cache_stats() -> dict:
+    return _report_cache.stats()
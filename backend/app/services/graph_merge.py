@@ -0,0 +1,119 @@
+from typing import Any
+
+from app.services.graph import END_TYPES, START_TYPES, GraphIndex, reachable_from
+from app.services.layout import LAYER_SPACING, layered_layout
+
+# Append-mode generation only sends the model the existing graph's open ends and asks for the new steps; the
+# fragment is merged here. Open ends are reachable nodes without outgoing edges (failure ends excluded). Open
+# "end" nodes are replaced by the fragment (their incoming edges are re-pointed at its entry), other open ends
+# get an edge to it. Colliding fragment ids are renamed, and the fragment is laid out on its own and placed to
+# the right of the existing graph, which keeps its positions.
+
+
+def open_ends(nodes: list[dict[str, Any]], edges: list[dict[str, Any]]) -> list[tuple[str, str]]:
+    graph = GraphIndex(nodes, edges)
+    starts = [idx for idx, node_type in enumerate(graph.types) if node_type in START_TYPES]
+    seen = reachable_from(graph, starts) if starts else [True] * len(graph)
+    return [
+        (graph.ids[idx], graph.types[idx])
+        for idx in range(len(graph))
+        if seen[idx] and not graph.successors(idx) and graph.types[idx] != "end_fail"
+    ]
+
+
+def graph_digest(data: dict[str, Any]) -> dict[str, Any]:
+    """What the model sees of an existing graph in append mode: its open ends' ids and types."""
+    ends = open_ends(data.get("nodes", []), data.get("edges", []))
+    return {"openEnds": [{"id": node_id, "type": node_type} for node_id, node_type in ends]}
+
+
+def _fresh_id(prefix: str, taken: set[str], counter: list[int]) -> str:
+    while f"{prefix}_{counter[0]}" in taken:
+        counter[0] += 1
+    return f"{prefix}_{counter[0]}"
+
+
+def merge_fragment(existing: dict[str, Any], fragment: dict[str, Any]) -> dict[str, Any]:
+    """Return ``existing`` with the generated ``fragment`` attached to its open ends."""
+    nodes = [dict(node) for node in existing.get("nodes", [])]
+    edges = [dict(edge) for edge in existing.get("edges", [])]
+    ends = open_ends(nodes, edges)
+
+    node_ids = {node["id"] for node in nodes}
+    edge_ids = {edge["id"] for edge in edges}
+    node_counter, edge_counter = [len(node_ids) + 1], [len(edge_ids) + 1]
+    renamed: dict[str, str] = {}
+    skipped: set[str] = set()
+    new_nodes: list[dict[str, Any]] = []
+    for node in fragment.get("nodes", []):
+        if not isinstance(node, dict):
+            continue
+        original = str(node.get("id") or "")
+        # The fragment continues an existing flow, so any start or trigger it brings is dropped.
+        if node.get("type") in START_TYPES:
+            skipped.add(original)
+            continue
+        node_id = original if original and original not in node_ids else _fresh_id("node", node_ids, node_counter)
+        node_ids.add(node_id)
+        renamed[original] = node_id
+        node_type = node.get("type") or "task"
+        data = dict(node["data"]) if isinstance(node.get("data"), dict) else {}
+        data.setdefault("label", node_type)
+        data.setdefault("status", "Ready")
+        new_nodes.append({**node, "id": node_id, "type": node_type, "data": data})
+
+    new_edges: list[dict[str, Any]] = []
+    entry_candidates: list[str] = []
+    for edge in fragment.get("edges", []):
+        if not isinstance(edge, dict):
+            continue
+        source, target = str(edge.get("source")), str(edge.get("target"))
+        if source in skipped and target in renamed:
+            entry_candidates.append(renamed[target])
+            continue
+        if source not in renamed or target not in renamed:
+            continue
+        original = str(edge.get("id") or "")
+        edge_id = original if original and original not in edge_ids else _fresh_id("edge", edge_ids, edge_counter)
+        edge_ids.add(edge_id)
+        new_edges.append({**edge, "id": edge_id, "source": renamed[source], "target": renamed[target]})
+
+    if not new_nodes:
+        return {**existing, "nodes": nodes, "edges": edges}
+
+    if not any(node["type"] in END_TYPES for node in new_nodes):
+        fragment_ends = {node["id"] for node in new_nodes} - {edge["source"] for edge in new_edges}
+        end_id = _fresh_id("node", node_ids, node_counter)
+        node_ids.add(end_id)
+        new_nodes.append({"id": end_id, "type": "end", "data": {"label": "End", "status": "Ready"}})
+        for source in sorted(fragment_ends) or [new_nodes[-2]["id"]]:
+            edge_id = _fresh_id("edge", edge_ids, edge_counter)
+            edge_ids.add(edge_id)
+            new_edges.append({"id": edge_id, "source": source, "target": end_id})
+
+    targeted = {edge["target"] for edge in new_edges}
+    roots = [node["id"] for node in new_nodes if node["id"] not in targeted]
+    entry = (entry_candidates or roots or [new_nodes[0]["id"]])[0]
+
+    positions = {node["id"]: node.get("position") or {"x": 0, "y": 0} for node in nodes}
+    replaced = {node_id for node_id, node_type in ends if node_type == "end"}
+    anchors = [positions[node_id] for node_id, _ in ends]
+    nodes = [node for node in nodes if node["id"] not in replaced]
+    for edge in edges:
+        if edge["target"] in replaced:
+            edge["target"] = entry
+    edges = [edge for edge in edges if edge["source"] not in replaced]
+    for node_id, node_type in ends:
+        if node_type != "end":
+            edge_id = _fresh_id("edge", edge_ids, edge_counter)
+            edge_ids.add(edge_id)
+            edges.append({"id": edge_id, "source": node_id, "target": entry})
+
+    layout = layered_layout(new_nodes, new_edges)
+    left = max((positions[node["id"]]["x"] for node in nodes), default=-LAYER_SPACING) + LAYER_SPACING
+    height = max((y for _, y in layout.values()), default=0.0)
+    middle = sum(anchor["y"] for anchor in anchors) / len(anchors) if anchors else 0.0
+    for node in new_nodes:
+        x, y = layout.get(node["id"], (0.0, 0.0))
+        node["position"] = {"x": left + x, "y": middle - height / 2 + y}
+    return {**existing, "nodes": nodes + new_nodes, "edges": edges + new_edges}
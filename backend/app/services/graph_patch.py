@@ -0,0 +1,61 @@
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.workflow import WorkflowEdge, WorkflowNode
+from app.services.json_patch import JsonPatchError, apply_patch, parse_pointer
+
+_MODELS: dict[str, type[BaseModel]] = {"nodes": WorkflowNode, "edges": WorkflowEdge}
+
+
+class GraphPatchValidationError(ValueError):
+    def __init__(self, errors: list[dict[str, Any]]) -> None:
+        super().__init__("Patched graph failed validation")
+        self.errors = errors
+
+
+def _check_pointer(pointer: str) -> None:
+    tokens = parse_pointer(pointer)
+    if not tokens or tokens[0] not in _MODELS:
+        raise JsonPatchError(f"Only /nodes and /edges can be patched, got {pointer!r}")
+
+
+def apply_graph_patch(
+    document: dict[str, Any], ops: list[dict[str, Any]]
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Apply ``ops`` to a stored workflow document and validate only the nodes and edges they touched.
+
+    Returns the patched document and the ops to record as the version delta: the input minus ``test`` ops,
+    plus a ``replace`` for every touched item that validation normalized (e.g. filled-in defaults).
+    """
+    for op in ops:
+        _check_pointer(op["path"])
+        if "from" in op:
+            _check_pointer(op["from"])
+    patched = apply_patch(document, ops)
+    recorded = [op for op in ops if op["op"] != "test"]
+
+    errors: list[dict[str, Any]] = []
+    for key, model in _MODELS.items():
+        items = patched.get(key)
+        if not isinstance(items, list):
+            raise JsonPatchError(f"/{key} must remain a list")
+        # apply_patch is copy-on-write, so anything still identical to an original item was not touched.
+        original = {id(item) for item in document.get(key, [])}
+        items = patched[key] = list(items)
+        for idx, item in enumerate(items):
+            if id(item) in original:
+                continue
+            try:
+                normalized = model.model_validate(item).model_dump()
+            except ValidationError as exc:
+                errors.extend(
+                    {"loc": [key, idx, *err["loc"]], "msg": err["msg"], "type": err["type"]} for err in exc.errors()
+                )
+                continue
+            if normalized != item:
+                items[idx] = normalized
+                recorded.append({"op": "replace", "path": f"/{key}/{idx}", "value": normalized})
+    if errors:
+        raise GraphPatchValidationError(errors)
+    return patched, recorded
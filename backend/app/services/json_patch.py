@@ -0,0 +1,191 @@
+import copy
+from typing import Any
+
+# Minimal RFC 6902 (JSON Patch) support: a structural diff that produces add/remove/replace ops and an
+# applier for the full op set. Patches are applied copy-on-write, so the input document is never mutated
+# and untouched subtrees are shared with the result.
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    pass
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [_unescape(token) for token in pointer[1:].split("/")]
+
+
+def json_equal(a: Any, b: Any) -> bool:
+    # Plain == treats True == 1 and 1 == 1.0, which JSON distinguishes.
+    if type(a) is not type(b) or a != b:
+        return False
+    if isinstance(a, dict):
+        return all(json_equal(value, b[key]) for key, value in a.items())
+    if isinstance(a, list):
+        return all(map(json_equal, a, b))
+    return True
+
+
+def make_patch(src: Any, dst: Any, path: str = "") -> list[dict[str, Any]]:
+    ops: list[dict[str, Any]] = []
+    _diff(src, dst, path, ops)
+    return ops
+
+
+def _diff(src: Any, dst: Any, path: str, ops: list[dict[str, Any]]) -> None:
+    if json_equal(src, dst):
+        return
+    if isinstance(src, dict) and isinstance(dst, dict):
+        for key in src:
+            if key not in dst:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in dst.items():
+            child = f"{path}/{_escape(key)}"
+            if key in src:
+                _diff(src[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+        return
+    if isinstance(src, list) and isinstance(dst, list):
+        start = 0
+        while start < len(src) and start < len(dst) and json_equal(src[start], dst[start]):
+            start += 1
+        end_src, end_dst = len(src), len(dst)
+        while end_src > start and end_dst > start and json_equal(src[end_src - 1], dst[end_dst - 1]):
+            end_src -= 1
+            end_dst -= 1
+        common = min(end_src, end_dst) - start
+        for offset in range(common):
+            idx = start + offset
+            _diff(src[idx], dst[idx], f"{path}/{idx}", ops)
+        # Remove surplus items back to front so earlier indices stay valid, then append the new ones.
+        for idx in range(end_src - 1, start + common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{idx}"})
+        for idx in range(start + common, end_dst):
+            ops.append({"op": "add", "path": f"{path}/{idx}", "value": dst[idx]})
+        return
+    ops.append({"op": "replace", "path": path, "value": dst})
+
+
+def apply_patch(doc: Any, ops: list[dict[str, Any]]) -> Any:
+    patcher = _Patcher(doc)
+    for op in ops:
+        patcher.apply(op)
+    return patcher.doc
+
+
+class _Patcher:
+    def __init__(self, doc: Any) -> None:
+        self.doc = doc
+        # Containers copied during this patch, keyed by id(); holding them keeps the ids stable.
+        self._owned: dict[int, Any] = {}
+
+    def _writable(self, container: Any) -> Any:
+        if id(container) in self._owned:
+            return container
+        clone = list(container) if isinstance(container, list) else dict(container)
+        self._owned[id(clone)] = clone
+        return clone
+
+    def _parent(self, tokens: list[str]) -> Any:
+        if not isinstance(self.doc, (dict, list)):
+            raise JsonPatchError("Cannot traverse a scalar document")
+        self.doc = self._writable(self.doc)
+        node = self.doc
+        for token in tokens[:-1]:
+            key = self._key(node, token)
+            child = node[key]
+            if not isinstance(child, (dict, list)):
+                raise JsonPatchError(f"Cannot traverse into scalar at {token!r}")
+            child = self._writable(child)
+            node[key] = child
+            node = child
+        return node
+
+    @staticmethod
+    def _key(node: Any, token: str, allow_end: bool = False) -> Any:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"Path member {token!r} not found")
+            return token
+        if allow_end and token == "-":
+            return len(node)
+        if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+            raise JsonPatchError(f"Invalid array index {token!r}")
+        idx = int(token)
+        if idx > len(node) or (idx == len(node) and not allow_end):
+            raise JsonPatchError(f"Array index {idx} out of range")
+        return idx
+
+    def _get(self, tokens: list[str]) -> Any:
+        node = self.doc
+        for token in tokens:
+            if not isinstance(node, (dict, list)):
+                raise JsonPatchError(f"Cannot traverse into scalar at {token!r}")
+            node = node[self._key(node, token)]
+        return node
+
+    def _add(self, tokens: list[str], value: Any) -> None:
+        if not tokens:
+            self.doc = value
+            return
+        parent = self._parent(tokens)
+        if isinstance(parent, dict):
+            parent[tokens[-1]] = value
+        else:
+            parent.insert(self._key(parent, tokens[-1], allow_end=True), value)
+
+    def _remove(self, tokens: list[str]) -> Any:
+        if not tokens:
+            raise JsonPatchError("Cannot remove the document root")
+        parent = self._parent(tokens)
+        return parent.pop(self._key(parent, tokens[-1]))
+
+    def apply(self, op: dict[str, Any]) -> None:
+        name = op.get("op")
+        if "path" not in op:
+            raise JsonPatchError("Patch operation is missing 'path'")
+        tokens = parse_pointer(op["path"])
+        if name in ("add", "replace", "test") and "value" not in op:
+            raise JsonPatchError(f"'{name}' operation is missing 'value'")
+        if name == "add":
+            self._add(tokens, op["value"])
+        elif name == "remove":
+            self._remove(tokens)
+        elif name == "replace":
+            if not tokens:
+                self.doc = op["value"]
+                return
+            parent = self._parent(tokens)
+            parent[self._key(parent, tokens[-1])] = op["value"]
+        elif name in ("move", "copy"):
+            if "from" not in op:
+                raise JsonPatchError(f"'{name}' operation is missing 'from'")
+            source = parse_pointer(op["from"])
+            if name == "move":
+                if tokens[: len(source)] == source and len(tokens) > len(source):
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                value = self._remove(source)
+            else:
+                value = copy.deepcopy(self._get(source))
+            self._add(tokens, value)
+        elif name == "test":
+            if not json_equal(self._get(tokens), op["value"]):
+                raise JsonPatchTestFailed(f"Test failed at {op['path']!r}")
+        else:
+            raise JsonPatchError(f"Unsupported patch operation {name!r}")
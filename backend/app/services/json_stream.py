@@ -0,0 +1,95 @@
+import json
+import re
+from typing import Any
+
+# Scans a JSON object as it streams in and hands back each element of selected top-level arrays as soon as the
+# element's closing brace arrives. Only the structure is tracked (container stack, strings, the current top-level
+# key); complete elements are decoded with json.loads. Regex jumps skip over runs of uninteresting characters.
+# Model output can be malformed (a bad escape, a bare word); the first element that fails to decode stops the
+# emitting for good, and the full text is left to the caller's final parse and repair.
+
+_STRUCTURE = re.compile(r'["{}\[\]:]')
+_STRING_END = re.compile(r'["\\]')
+
+
+class ArrayItemParser:
+    def __init__(self, keys: tuple[str, ...] = ("nodes", "edges")) -> None:
+        self.keys = frozenset(keys)
+        self.text = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._string_start = 0
+        self._last_key: str | None = None
+        self._last_string: str | None = None
+        self._array_key: str | None = None
+        self._item_start: int | None = None
+        self.failed = False
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Append ``chunk``; returns (array key, element) for every element completed by it."""
+        self.text += chunk
+        items: list[tuple[str, Any]] = []
+        if self.failed:
+            return items
+        text = self.text
+        pos = self._pos
+        end = len(text)
+        while pos < end:
+            if self._in_string:
+                match = _STRING_END.search(text, pos)
+                if match is None:
+                    pos = end
+                    break
+                if match.group() == "\\":
+                    if match.end() >= end:
+                        # Escape split across chunks; resume at the backslash once more text arrives.
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                if len(self._stack) == 1:
+                    try:
+                        self._last_string = json.loads(text[self._string_start : pos])
+                    except ValueError:
+                        self._last_string = None
+                continue
+            match = _STRUCTURE.search(text, pos)
+            if match is None:
+                pos = end
+                break
+            char = match.group()
+            at = match.start()
+            pos = match.end()
+            depth = len(self._stack)
+            if char == '"':
+                self._in_string = True
+                self._string_start = at
+            elif char == ":":
+                if depth == 1:
+                    self._last_key = self._last_string
+            elif char in "{[":
+                if depth == 1 and char == "[":
+                    self._array_key = self._last_key
+                elif depth == 2 and char == "{" and self._stack[1] == "[" and self._array_key in self.keys:
+                    self._item_start = at
+                self._stack.append(char)
+            else:
+                if self._stack:
+                    self._stack.pop()
+                if len(self._stack) == 2 and self._item_start is not None:
+                    try:
+                        items.append((self._array_key, json.loads(text[self._item_start : pos])))
+                    except ValueError:
+                        self.failed = True
+                        break
+                    self._item_start = None
+                elif len(self._stack) == 1:
+                    self._array_key = None
+        self._pos = pos
+        return items
+
+    def result(self) -> Any:
+        return json.loads(self.text)
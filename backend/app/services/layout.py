@@ -0,0 +1,143 @@
+from typing import Any
+
+from app.services.graph import GraphIndex, strongly_connected_components
+
+# Layered (Sugiyama-style) layout flowing left to right: break cycles by reversing edges that point backwards in
+# a topological order of the SCC condensation, assign layers by longest path, split long edges with dummy
+# nodes, reduce crossings with barycenter sweeps, then place each layer next to the mean of its predecessors.
+
+LAYER_SPACING = 260
+NODE_SPACING = 140
+SWEEPS = 4
+# Dummy nodes per real node. Edges beyond the budget (the longest ones) link their endpoints directly, which keeps
+# graphs with many long back-references linear at a small cost in crossing quality.
+DUMMY_BUDGET = 2
+
+
+def _mean_position(neighbours: list[int], pos: list[int], fallback: float) -> float:
+    # Most nodes (and every dummy) have a single neighbour in the adjacent layer.
+    if len(neighbours) == 1:
+        return pos[neighbours[0]]
+    if not neighbours:
+        return fallback
+    return sum(map(pos.__getitem__, neighbours)) / len(neighbours)
+
+
+def _assign_layers(graph: GraphIndex) -> tuple[list[int], list[list[int]], list[int]]:
+    """Return (order, successors, layer): a topological order of the acyclic graph left after reversing back
+    edges, its adjacency, and each node's longest-path layer."""
+    count = len(graph)
+    order = [node for component in reversed(strongly_connected_components(graph)) for node in reversed(component)]
+    rank = [0] * count
+    for idx, node in enumerate(order):
+        rank[node] = idx
+
+    successors: list[list[int]] = [[] for _ in range(count)]
+    seen_pairs: set[tuple[int, int]] = set()
+    for source in range(count):
+        for target in graph.successors(source):
+            if source == target:
+                continue
+            pair = (source, target) if rank[source] < rank[target] else (target, source)
+            if pair not in seen_pairs:
+                seen_pairs.add(pair)
+                successors[pair[0]].append(pair[1])
+
+    layer = [0] * count
+    for source in order:
+        next_layer = layer[source] + 1
+        for target in successors[source]:
+            if layer[target] < next_layer:
+                layer[target] = next_layer
+    return order, successors, layer
+
+
+def _insert_dummies(
+    order: list[int], successors: list[list[int]], layer: list[int]
+) -> tuple[list[list[int]], list[list[int]], list[list[int]]]:
+    """Split edges spanning several layers, appending dummy nodes to ``layer``; returns (layers, up, down)."""
+    count = len(layer)
+    # Real nodes keep their index; dummies are appended. up/down hold neighbours in the adjacent layers.
+    up: list[list[int]] = [[] for _ in range(count)]
+    down: list[list[int]] = [[] for _ in range(count)]
+    layers: list[list[int]] = [[] for _ in range(max(layer) + 1)]
+    for node in order:
+        layers[layer[node]].append(node)
+    dag_edges = [(layer[target] - layer[source], source, target) for source in order for target in successors[source]]
+    budget = DUMMY_BUDGET * count
+    if sum(span - 1 for span, _, _ in dag_edges) > budget:
+        dag_edges.sort(key=lambda item: item[0])
+    for span, source, target in dag_edges:
+        previous = source
+        if span - 1 <= budget:
+            budget -= span - 1
+            for dummy_layer in range(layer[source] + 1, layer[target]):
+                dummy = len(layer)
+                layer.append(dummy_layer)
+                up.append([previous])
+                down.append([])
+                layers[dummy_layer].append(dummy)
+                down[previous].append(dummy)
+                previous = dummy
+        down[previous].append(target)
+        up[target].append(previous)
+    return layers, up, down
+
+
+def layered_layout(nodes: list[dict[str, Any]], edges: list[dict[str, Any]]) -> dict[str, tuple[float, float]]:
+    graph = GraphIndex(nodes, edges)
+    count = len(graph)
+    if not count:
+        return {}
+
+    order, successors, layer = _assign_layers(graph)
+    layers, up, down = _insert_dummies(order, successors, layer)
+
+    pos = [0] * len(layer)
+    for members in layers:
+        for idx, node in enumerate(members):
+            pos[node] = idx
+
+    for sweep in range(SWEEPS):
+        downward = sweep % 2 == 0
+        sequence = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+        neighbours = up if downward else down
+        for layer_idx in sequence:
+            members = layers[layer_idx]
+            if len(members) < 2:
+                continue
+            keys = [_mean_position(neighbours[node], pos, pos[node]) for node in members]
+            # sorted() is stable, so ties keep their current order.
+            members = [members[idx] for idx in sorted(range(len(members)), key=keys.__getitem__)]
+            layers[layer_idx] = members
+            for idx, node in enumerate(members):
+                pos[node] = idx
+
+    ys = [0.0] * len(layer)
+    for members in layers:
+        desired = [_mean_position(up[node], ys, None) if up[node] else None for node in members]
+        placed = []
+        previous = None
+        for want in desired:
+            y = want if want is not None else (previous + NODE_SPACING if previous is not None else 0.0)
+            if previous is not None and y < previous + NODE_SPACING:
+                y = previous + NODE_SPACING
+            placed.append(y)
+            previous = y
+        # Pushing nodes apart only moves them down; shift the layer back so it centres on what was wanted.
+        offsets = [want - y for want, y in zip(desired, placed) if want is not None]
+        shift = sum(offsets) / len(offsets) if offsets else 0.0
+        for node, y in zip(members, placed):
+            ys[node] = y + shift
+
+    top = min(ys[node] for node in range(count))
+    return {graph.ids[node]: (float(layer[node] * LAYER_SPACING), ys[node] - top) for node in range(count)}
+
+
+def apply_layout(data: dict[str, Any]) -> dict[str, Any]:
+    """Overwrite node positions in ``data`` with a layered layout; returns ``data``."""
+    positions = layered_layout(data.get("nodes", []), data.get("edges", []))
+    for node in data.get("nodes", []):
+        x, y = positions.get(node["id"], (0.0, 0.0))
+        node["position"] = {"x": x, "y": y}
+    return data
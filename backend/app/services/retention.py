@@ -0,0 +1,339 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, update
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.generation_job import GenerationJob
+from app.models.webhook_event import WebhookEvent
+from app.models.workflow import Workflow
+from app.models.workflow_run import WorkflowRun
+from app.models.workflow_version import WorkflowVersion
+from app.services.diff import invalidate_diffs
+from app.services.json_patch import apply_patch
+from app.services.triggers import TriggerUpdates, add_trigger_listener, remove_trigger_listener
+from app.services.versions import DELTA, SNAPSHOT, graph_delta
+
+logger = logging.getLogger(__name__)
+
+# Version history is thinned on a timer: the newest RETENTION_KEEP_LAST versions and everything younger than
+# RETENTION_HOURLY_AFTER_HOURS are kept, older versions are kept one per hour, and past RETENTION_DAILY_AFTER_DAYS
+# one per day (the newest in each bucket). Kept deltas whose base is removed are re-based onto the previous kept
+# version first, so every history stays replayable at each commit. Soft-deleted workflows are purged as soon as
+# their deletion is published. All writes happen in transactions of at most RETENTION_BATCH_SIZE rows.
+
+VACUUM_STEP_PAGES = 1000
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def versions_to_keep(versions: list[tuple[int, datetime]], now: datetime) -> set[int]:
+    """Versions retained by the policy; ``versions`` is (version, created_at) ordered newest first."""
+    hourly_after = now - timedelta(hours=settings.RETENTION_HOURLY_AFTER_HOURS)
+    daily_after = now - timedelta(days=settings.RETENTION_DAILY_AFTER_DAYS)
+    keep: set[int] = set()
+    buckets: set[tuple[str, Any]] = set()
+    for idx, (version, created_at) in enumerate(versions):
+        if idx < max(settings.RETENTION_KEEP_LAST, 1) or created_at >= hourly_after:
+            keep.add(version)
+            continue
+        if created_at < daily_after:
+            bucket = ("day", created_at.date())
+        else:
+            bucket = ("hour", created_at.replace(minute=0, second=0, microsecond=0))
+        if bucket not in buckets:
+            buckets.add(bucket)
+            keep.add(version)
+    return keep
+
+
+def _chunks(items: list[Any], size: int) -> list[list[Any]]:
+    size = max(size, 1)
+    return [items[idx : idx + size] for idx in range(0, len(items), size)]
+
+
+def plan_thinning(workflow_id: str, now: datetime) -> tuple[list[dict[str, Any]], list[str]]:
+    """Row rewrites (re-based kept versions) and row ids to delete for one workflow's history."""
+    db = SessionLocal()
+    try:
+        history = (
+            db.query(WorkflowVersion.version, WorkflowVersion.created_at)
+            .filter(WorkflowVersion.workflow_id == workflow_id)
+            .order_by(WorkflowVersion.version.desc())
+            .all()
+        )
+        keep = versions_to_keep([tuple(row) for row in history], now)
+        if len(keep) == len(history):
+            return [], []
+        rows = (
+            db.query(
+                WorkflowVersion.id,
+                WorkflowVersion.version,
+                WorkflowVersion.kind,
+                WorkflowVersion.base_version,
+                WorkflowVersion.data_json,
+            )
+            .filter(WorkflowVersion.workflow_id == workflow_id)
+            .order_by(WorkflowVersion.version)
+            .yield_per(200)
+        )
+        rewrites: list[dict[str, Any]] = []
+        deletes: list[str] = []
+        # Only the previous row and the previous kept row are ever needed as a delta base.
+        last: tuple[int, Any] | None = None
+        kept: tuple[int, Any] | None = None
+        chain = 0
+        for row in rows:
+            stored = json.loads(row.data_json)
+            if row.kind == SNAPSHOT:
+                document = stored
+            else:
+                bases = [item[1] for item in (last, kept) if item is not None and item[0] == row.base_version]
+                if not bases:
+                    raise ValueError(f"Version history of workflow {workflow_id} is broken at version {row.version}")
+                document = apply_patch(bases[0], stored)
+            last = (row.version, document)
+            if row.version not in keep:
+                deletes.append(row.id)
+                continue
+            if row.kind == SNAPSHOT:
+                chain = 0
+            elif kept is not None and row.base_version == kept[0]:
+                chain += 1
+            else:
+                entry = {"id": row.id, "kind": SNAPSHOT, "base_version": None, "data_json": json.dumps(document)}
+                if kept is not None and chain + 1 < max(settings.WORKFLOW_VERSION_SNAPSHOT_INTERVAL, 1):
+                    delta_json = json.dumps(graph_delta(kept[1], document))
+                    if len(delta_json) < len(entry["data_json"]):
+                        entry.update(kind=DELTA, base_version=kept[0], data_json=delta_json)
+                chain = chain + 1 if entry["kind"] == DELTA else 0
+                rewrites.append(entry)
+            kept = (row.version, document)
+        return rewrites, deletes
+    finally:
+        db.close()
+
+
+def thin_workflow(workflow_id: str, now: datetime) -> tuple[int, int]:
+    """Apply the retention policy to one workflow; returns (rewritten, deleted) row counts."""
+    rewrites, deletes = plan_thinning(workflow_id, now)
+    db = SessionLocal()
+    try:
+        # Re-based rows only reference versions that are kept, so they are committed before any base disappears.
+        for chunk in _chunks(rewrites, settings.RETENTION_BATCH_SIZE):
+            db.execute(update(WorkflowVersion), chunk)
+            db.commit()
+        for chunk in _chunks(deletes, settings.RETENTION_BATCH_SIZE):
+            db.query(WorkflowVersion).filter(WorkflowVersion.id.in_(chunk)).delete(synchronize_session=False)
+            db.commit()
+    finally:
+        db.close()
+    if deletes:
+        invalidate_diffs(workflow_id)
+    return len(rewrites), len(deletes)
+
+
+def thinning_candidates(now: datetime) -> list[str]:
+    """Workflows with more versions than always kept and at least one old enough to be thinned."""
+    db = SessionLocal()
+    try:
+        cutoff = now - timedelta(hours=settings.RETENTION_HOURLY_AFTER_HOURS)
+        rows = (
+            db.query(WorkflowVersion.workflow_id)
+            .group_by(WorkflowVersion.workflow_id)
+            .having(func.count() > max(settings.RETENTION_KEEP_LAST, 1))
+            .having(func.min(WorkflowVersion.created_at) < cutoff)
+            .all()
+        )
+        return [row[0] for row in rows]
+    finally:
+        db.close()
+
+
+def purge_deleted_workflow() -> tuple[str, int] | None:
+    """Remove the oldest soft-deleted workflow and its dependent rows; returns (id, rows removed)."""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(Workflow.id)
+            .filter(Workflow.deleted_at.is_not(None))
+            .order_by(Workflow.deleted_at)
+            .first()
+        )
+        if row is None:
+            return None
+        workflow_id = row[0]
+        removed = 0
+        for model in (WorkflowVersion, WorkflowRun, WebhookEvent):
+            while True:
+                ids = [
+                    item[0]
+                    for item in db.query(model.id)
+                    .filter(model.workflow_id == workflow_id)
+                    .limit(max(settings.RETENTION_BATCH_SIZE, 1))
+                ]
+                if not ids:
+                    break
+                db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                removed += len(ids)
+        db.query(Workflow).filter(Workflow.id == workflow_id, Workflow.deleted_at.is_not(None)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        invalidate_diffs(workflow_id)
+        return workflow_id, removed
+    finally:
+        db.close()
+
+
+def purge_generation_jobs(now: datetime) -> int:
+    """Delete finished generation jobs older than GENERATION_JOB_RETENTION_DAYS, one batch per transaction."""
+    cutoff = now - timedelta(days=settings.GENERATION_JOB_RETENTION_DAYS)
+    db = SessionLocal()
+    try:
+        removed = 0
+        while True:
+            ids = [
+                row[0]
+                for row in db.query(GenerationJob.id)
+                .filter(GenerationJob.finished_at.is_not(None), GenerationJob.finished_at < cutoff)
+                .limit(max(settings.RETENTION_BATCH_SIZE, 1))
+            ]
+            if not ids:
+                return removed
+            db.query(GenerationJob).filter(GenerationJob.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            removed += len(ids)
+    finally:
+        db.close()
+
+
+def reclaim_space() -> str | None:
+    """Return free pages to the filesystem: incremental_vacuum when enabled, otherwise a one-off full VACUUM
+    (which also switches the database to incremental auto-vacuum) once enough of the file is free."""
+    if engine.dialect.name != "sqlite":
+        return None
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        free = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if not free:
+            return None
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == SQLITE_AUTO_VACUUM_INCREMENTAL:
+            # Small steps, each its own write transaction, so other writers get the lock in between.
+            while free:
+                conn.exec_driver_sql(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})")
+                remaining = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                if remaining >= free:
+                    break
+                free = remaining
+            return "incremental"
+        pages = conn.exec_driver_sql("PRAGMA page_count").scalar()
+        if free / max(pages, 1) < settings.RETENTION_FULL_VACUUM_FREE_RATIO:
+            return None
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+        return "full"
+
+
+class RetentionWorker:
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._next_thinning = 0.0
+        self.passes = 0
+        self.purged_workflows = 0
+        self.purged_rows = 0
+        self.rebased_versions = 0
+        self.deleted_versions = 0
+        self.purged_jobs = 0
+        self.vacuums = 0
+        self.last_pass_seconds: float | None = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._next_thinning = 0.0
+        add_trigger_listener(self.on_triggers_changed)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        remove_trigger_listener(self.on_triggers_changed)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "passes": self.passes,
+            "purged_workflows": self.purged_workflows,
+            "purged_rows": self.purged_rows,
+            "rebased_versions": self.rebased_versions,
+            "deleted_versions": self.deleted_versions,
+            "purged_jobs": self.purged_jobs,
+            "vacuums": self.vacuums,
+            "last_pass_seconds": self.last_pass_seconds,
+        }
+
+    def on_triggers_changed(self, updates: TriggerUpdates) -> None:
+        # Deleted workflows are published with None; wake up to purge them.
+        loop = self._loop
+        if loop is not None and not loop.is_closed() and any(nodes is None for nodes in updates.values()):
+            loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.run_once(thin=time.monotonic() >= self._next_thinning)
+            except Exception:  # noqa: BLE001
+                logger.exception("Retention pass failed")
+            timeout = max(self._next_thinning - time.monotonic(), 0.0)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self, thin: bool = True) -> None:
+        started = time.monotonic()
+        removed = 0
+        while True:
+            purged = await run_in_threadpool(purge_deleted_workflow)
+            if purged is None:
+                break
+            self.purged_workflows += 1
+            self.purged_rows += purged[1]
+            removed += purged[1] + 1
+        if thin:
+            self._next_thinning = started + settings.RETENTION_INTERVAL_SECONDS
+            now = datetime.utcnow()
+            for workflow_id in await run_in_threadpool(thinning_candidates, now):
+                try:
+                    rebased, deleted = await run_in_threadpool(thin_workflow, workflow_id, now)
+                except ValueError as exc:
+                    logger.warning("Skipping retention for workflow %s: %s", workflow_id, exc)
+                    continue
+                self.rebased_versions += rebased
+                self.deleted_versions += deleted
+                removed += deleted
+            jobs = await run_in_threadpool(purge_generation_jobs, now)
+            self.purged_jobs += jobs
+            removed += jobs
+        if removed and settings.RETENTION_VACUUM:
+            try:
+                if await run_in_threadpool(reclaim_space):
+                    self.vacuums += 1
+            except Exception:  # noqa: BLE001
+                logger.exception("Vacuum after retention pass failed")
+        self.passes += 1
+        self.last_pass_seconds = round(time.monotonic() - started, 3)
+
+
+retention = RetentionWorker()
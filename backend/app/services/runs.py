@@ -0,0 +1,145 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.workflow import Workflow
+from app.models.workflow_run import WorkflowRun
+from app.services.engine import RunFailed, WorkflowEngine
+from app.services.versions import materialize_version
+
+logger = logging.getLogger(__name__)
+
+_tasks: set[asyncio.Task] = set()
+_slots: asyncio.Semaphore | None = None
+
+
+def add_run(
+    db: Session,
+    workflow: Workflow,
+    actor_id: str | None = None,
+    trigger: str = "manual",
+    trigger_node_id: str | None = None,
+    payload: Any = None,
+) -> WorkflowRun:
+    run = WorkflowRun(
+        workflow_id=workflow.id,
+        workflow_version=workflow.version,
+        actor_id=actor_id,
+        trigger=trigger,
+        trigger_node_id=trigger_node_id,
+        status="queued",
+        input_json=json.dumps(payload) if payload is not None else None,
+        created_at=datetime.utcnow(),
+    )
+    db.add(run)
+    return run
+
+
+def start_runner() -> None:
+    global _slots
+    _slots = asyncio.Semaphore(settings.RUN_MAX_CONCURRENT)
+
+
+async def stop_runner() -> None:
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+
+
+def start_run(run_id: str) -> asyncio.Task:
+    task = asyncio.create_task(execute_run(run_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+def runner_stats() -> dict:
+    return {"active": len(_tasks), "max_concurrent": settings.RUN_MAX_CONCURRENT}
+
+
+def recover_runs(db: Session) -> int:
+    """Fail runs left queued or running by a previous process; their tasks died with it."""
+    count = (
+        db.query(WorkflowRun)
+        .filter(WorkflowRun.status.in_(("queued", "running")))
+        .update({"status": "failed", "error": "Interrupted by restart", "finished_at": datetime.utcnow()})
+    )
+    db.commit()
+    return count
+
+
+def _claim(run_id: str) -> tuple[dict[str, Any], Any, str | None] | None:
+    db = SessionLocal()
+    try:
+        run = db.query(WorkflowRun).filter(WorkflowRun.id == run_id).first()
+        workflow = None
+        if run is not None:
+            workflow = (
+                db.query(Workflow).filter(Workflow.id == run.workflow_id, Workflow.deleted_at.is_(None)).first()
+            )
+        if workflow is None:
+            return None
+        # Run the graph as it was when the run was queued, not whatever the workflow has been edited to since.
+        if workflow.version == run.workflow_version:
+            data = json.loads(workflow.data_json)
+        else:
+            data = materialize_version(db, workflow.id, run.workflow_version)
+        now = datetime.utcnow()
+        if data is None:
+            run.status = "failed"
+            run.error = f"Workflow version {run.workflow_version} no longer exists"
+            run.started_at = run.finished_at = now
+            db.commit()
+            return None
+        run.status = "running"
+        run.started_at = now
+        db.commit()
+        payload = json.loads(run.input_json) if run.input_json else None
+        return data, payload, run.trigger_node_id
+    finally:
+        db.close()
+
+
+def _finish(run_id: str, status: str, output: Any, steps: list[dict[str, Any]], error: str | None) -> None:
+    db = SessionLocal()
+    try:
+        db.query(WorkflowRun).filter(WorkflowRun.id == run_id).update(
+            {
+                "status": status,
+                "output_json": json.dumps(output, default=str),
+                "steps_json": json.dumps(steps),
+                "error": error,
+                "finished_at": datetime.utcnow(),
+            }
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def execute_run(run_id: str) -> None:
+    async with _slots:
+        claimed = await run_in_threadpool(_claim, run_id)
+        if claimed is None:
+            return
+        data, payload, start_node_id = claimed
+        engine = None
+        status, error = "succeeded", None
+        try:
+            engine = WorkflowEngine(data)
+            await engine.run(payload, start_node_id)
+        except RunFailed as exc:
+            status, error = "failed", str(exc)
+        except Exception:  # noqa: BLE001
+            logger.exception("Workflow run %s crashed", run_id)
+            status, error = "failed", "Internal error"
+        outputs = engine.outputs if engine else None
+        steps = engine.steps if engine else []
+        await run_in_threadpool(_finish, run_id, status, outputs, steps, error)
@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.workflow import Workflow
+from app.services.cron import CronSpec, parse_cron
+from app.services.runs import add_run, execute_run
+from app.services.triggers import TriggerUpdates, add_trigger_listener, iter_stored_triggers, remove_trigger_listener
+
+logger = logging.getLogger(__name__)
+
+# schedule_trigger node data: {"cron": "*/5 * * * *"} or {"intervalSeconds": 300}, optional "enabled": false.
+# Schedules live in a min-heap keyed by next fire time; the loop sleeps until the head is due or an update
+# arrives. Replaced schedules leave stale heap items behind, which are skipped on pop (tokens don't match).
+
+MIN_INTERVAL_SECONDS = 1.0
+
+
+@dataclass
+class _Schedule:
+    workflow_id: str
+    node_id: str
+    config: tuple
+    cron: CronSpec | None
+    interval: float | None
+    due: float
+    token: int
+
+
+def _schedule_config(node: dict[str, Any]) -> tuple | None:
+    data = node.get("data") or {}
+    if data.get("enabled") is False:
+        return None
+    if data.get("cron"):
+        return ("cron", str(data["cron"]))
+    interval = data.get("intervalSeconds")
+    if interval is not None:
+        return ("interval", float(interval))
+    return None
+
+
+def _next_cron(spec: CronSpec, after: float) -> float | None:
+    moment = datetime.fromtimestamp(after, tz=timezone.utc).replace(tzinfo=None)
+    upcoming = spec.next_after(moment)
+    return upcoming.replace(tzinfo=timezone.utc).timestamp() if upcoming else None
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, tuple[str, str]]] = []
+        self._schedules: dict[tuple[str, str], _Schedule] = {}
+        self._by_workflow: dict[str, set[str]] = {}
+        self._tokens = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._live_updates: set[str] | None = None
+        self.fired = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        self._heap, self._schedules, self._by_workflow = [], {}, {}
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._queue = asyncio.Queue(maxsize=settings.SCHEDULER_QUEUE_SIZE)
+        add_trigger_listener(self.on_triggers_changed)
+        self._tasks = [asyncio.create_task(self._load()), asyncio.create_task(self._run())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(settings.SCHEDULER_MAX_CONCURRENT_FIRES)]
+
+    async def stop(self) -> None:
+        remove_trigger_listener(self.on_triggers_changed)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "schedules": len(self._schedules),
+            "heap": len(self._heap),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "fired": self.fired,
+            "dropped": self.dropped,
+        }
+
+    def on_triggers_changed(self, updates: TriggerUpdates) -> None:
+        # Called from whichever thread committed; the heap is only touched on the event loop.
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._apply, updates, True)
+
+    async def _load(self) -> None:
+        self._live_updates = set()
+        batch: TriggerUpdates = {}
+        stored = iter_stored_triggers("schedule_trigger")
+        sentinel = object()
+        while True:
+            item = await run_in_threadpool(next, stored, sentinel)
+            if item is sentinel:
+                break
+            batch[item[0]] = item[1]
+            if len(batch) >= 500:
+                self._apply(batch, False)
+                batch = {}
+        self._apply(batch, False)
+        self._live_updates = None
+        logger.info("Scheduler loaded %s schedules", len(self._schedules))
+
+    def _apply(self, updates: TriggerUpdates, live: bool) -> None:
+        now = time.time()
+        first_due: dict[tuple, float | None] = {}
+        changed = False
+        for workflow_id, nodes in updates.items():
+            if live and self._live_updates is not None:
+                self._live_updates.add(workflow_id)
+            elif not live and self._live_updates is not None and workflow_id in self._live_updates:
+                continue
+            wanted: dict[str, tuple] = {}
+            for node in nodes or []:
+                if node.get("type") != "schedule_trigger":
+                    continue
+                try:
+                    config = _schedule_config(node)
+                except (TypeError, ValueError):
+                    config = None
+                if config is not None:
+                    wanted[node["id"]] = config
+            for node_id in self._by_workflow.get(workflow_id, set()) - set(wanted):
+                self._schedules.pop((workflow_id, node_id), None)
+            for node_id, config in wanted.items():
+                current = self._schedules.get((workflow_id, node_id))
+                if current is not None and current.config == config:
+                    continue
+                schedule = self._build(workflow_id, node_id, config, now, first_due)
+                if schedule is None:
+                    self._schedules.pop((workflow_id, node_id), None)
+                    continue
+                self._schedules[(workflow_id, node_id)] = schedule
+                self._push(schedule)
+                changed = True
+            if wanted:
+                self._by_workflow[workflow_id] = set(wanted)
+            else:
+                self._by_workflow.pop(workflow_id, None)
+        if len(self._heap) > 2 * len(self._schedules) + 64:
+            self._heap = [(s.due, s.token, key) for key, s in self._schedules.items()]
+            heapq.heapify(self._heap)
+        if changed and self._wake is not None:
+            self._wake.set()
+
+    def _build(
+        self, workflow_id: str, node_id: str, config: tuple, now: float, first_due: dict[tuple, float | None]
+    ) -> _Schedule | None:
+        kind, value = config
+        try:
+            cron = parse_cron(value) if kind == "cron" else None
+        except ValueError as exc:
+            logger.warning("Ignoring schedule %s/%s: %s", workflow_id, node_id, exc)
+            return None
+        interval = max(value, MIN_INTERVAL_SECONDS) if kind == "interval" else None
+        if config not in first_due:
+            first_due[config] = _next_cron(cron, now) if cron else now + interval
+        due = first_due[config]
+        if due is None:
+            return None
+        return _Schedule(workflow_id, node_id, config, cron, interval, due, 0)
+
+    def _push(self, schedule: _Schedule) -> None:
+        schedule.token = next(self._tokens)
+        heapq.heappush(self._heap, (schedule.due, schedule.token, (schedule.workflow_id, schedule.node_id)))
+
+    async def _run(self) -> None:
+        while True:
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                due, token, key = heapq.heappop(self._heap)
+                schedule = self._schedules.get(key)
+                if schedule is None or schedule.token != token:
+                    continue
+                self._enqueue(schedule, due)
+                if schedule.cron:
+                    upcoming = _next_cron(schedule.cron, max(now, due))
+                    if upcoming is None:
+                        self._schedules.pop(key, None)
+                        continue
+                    schedule.due = upcoming
+                else:
+                    # Skip intervals missed while the loop was busy instead of firing them in a burst.
+                    schedule.due = due + schedule.interval * (math.floor((now - due) / schedule.interval) + 1)
+                self._push(schedule)
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _enqueue(self, schedule: _Schedule, due: float) -> None:
+        try:
+            self._queue.put_nowait((schedule.workflow_id, schedule.node_id, due))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("Scheduler queue full; dropped fire for %s/%s", schedule.workflow_id, schedule.node_id)
+
+    async def _worker(self) -> None:
+        while True:
+            workflow_id, node_id, due = await self._queue.get()
+            try:
+                run_id = await run_in_threadpool(_create_scheduled_run, workflow_id, node_id, due)
+                if run_id:
+                    self.fired += 1
+                    await execute_run(run_id)
+            except Exception:  # noqa: BLE001
+                logger.exception("Scheduled run for %s/%s failed to start", workflow_id, node_id)
+            finally:
+                self._queue.task_done()
+
+
+def _create_scheduled_run(workflow_id: str, node_id: str, due: float) -> str | None:
+    db = SessionLocal()
+    try:
+        workflow = db.query(Workflow).filter(Workflow.id == workflow_id, Workflow.deleted_at.is_(None)).first()
+        if workflow is None:
+            return None
+        scheduled_for = datetime.fromtimestamp(due, tz=timezone.utc).replace(tzinfo=None).isoformat()
+        payload = {"scheduledFor": scheduled_for}
+        run = add_run(db, workflow, trigger="schedule", trigger_node_id=node_id, payload=payload)
+        db.commit()
+        return run.id
+    finally:
+        db.close()
+
+
+scheduler = Scheduler()
@@ -0,0 +1,108 @@
+import json
+import re
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.workflow import Workflow
+
+# workflow_search is an FTS5 table whose rowids come from workflow_search_ids, so a workflow's entry can be
+# replaced or deleted by rowid instead of scanning the index for its (unindexed) workflow_id.
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_enabled(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def document_fields(name: str, description: str | None, data: dict[str, Any]) -> dict[str, str]:
+    labels = []
+    descriptions = []
+    for node in data.get("nodes", []):
+        node_data = node.get("data") or {}
+        if node_data.get("label"):
+            labels.append(str(node_data["label"]))
+        if node_data.get("description"):
+            descriptions.append(str(node_data["description"]))
+    return {
+        "name": name,
+        "description": description or "",
+        "node_labels": "\n".join(labels),
+        "node_descriptions": "\n".join(descriptions),
+    }
+
+
+def index_workflow(db: Session, workflow: Workflow, data: dict[str, Any] | None = None) -> None:
+    if not search_enabled(db):
+        return
+    if data is None:
+        data = json.loads(workflow.data_json)
+    db.execute(
+        text("INSERT OR IGNORE INTO workflow_search_ids (workflow_id) VALUES (:workflow_id)"),
+        {"workflow_id": workflow.id},
+    )
+    db.execute(
+        text(
+            "INSERT OR REPLACE INTO workflow_search "
+            "(rowid, workflow_id, name, description, node_labels, node_descriptions) "
+            "SELECT id, :workflow_id, :name, :description, :node_labels, :node_descriptions "
+            "FROM workflow_search_ids WHERE workflow_id = :workflow_id"
+        ),
+        {"workflow_id": workflow.id, **document_fields(workflow.name, workflow.description, data)},
+    )
+
+
+def remove_from_index(db: Session, workflow_ids: list[str]) -> None:
+    if not workflow_ids or not search_enabled(db):
+        return
+    params = {f"id_{idx}": workflow_id for idx, workflow_id in enumerate(workflow_ids)}
+    placeholders = ", ".join(f":{key}" for key in params)
+    db.execute(
+        text(
+            "DELETE FROM workflow_search WHERE rowid IN "
+            f"(SELECT id FROM workflow_search_ids WHERE workflow_id IN ({placeholders}))"
+        ),
+        params,
+    )
+    db.execute(text(f"DELETE FROM workflow_search_ids WHERE workflow_id IN ({placeholders})"), params)
+
+
+def build_match_query(query: str) -> str | None:
+    """Turn free text into an FTS5 query: every word must match as a prefix; operators are not exposed."""
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens[:16])
+
+
+def search_workflows(
+    db: Session,
+    query: str,
+    owner_id: str | None,
+    templates: str | None,
+    limit: int,
+    offset: int,
+) -> list[Any]:
+    match = build_match_query(query)
+    if match is None or not search_enabled(db):
+        return []
+    filters = ["workflow_search MATCH :match", "w.deleted_at IS NULL"]
+    params: dict[str, Any] = {"match": match, "limit": limit, "offset": offset}
+    if owner_id is not None:
+        filters.append("w.owner_id = :owner_id")
+        params["owner_id"] = owner_id
+    if templates == "only":
+        filters.append("w.is_template = 1")
+    elif templates == "exclude":
+        filters.append("w.is_template = 0")
+    sql = (
+        "SELECT w.id, w.owner_id, w.name, w.description, w.is_template, w.version, w.created_at, w.updated_at, "
+        "bm25(workflow_search, 0.0, 10.0, 4.0, 2.0, 1.0) AS rank, "
+        "snippet(workflow_search, -1, '[', ']', '…', 12) AS match "
+        "FROM workflow_search JOIN workflows AS w ON w.id = workflow_search.workflow_id "
+        f"WHERE {' AND '.join(filters)} "
+        "ORDER BY rank, w.id LIMIT :limit OFFSET :offset"
+    )
+    return db.execute(text(sql), params).all()
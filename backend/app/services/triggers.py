@@ -0,0 +1,90 @@
+import json
+import logging
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.workflow import Workflow
+
+logger = logging.getLogger(__name__)
+
+# Write paths stage each workflow's trigger nodes on the session; after the commit succeeds they are handed to
+# the in-memory trigger indexes (scheduler, webhook routes), so those never read uncommitted or rolled-back graphs.
+
+TRIGGER_TYPES = ("schedule_trigger", "webhook_trigger")
+LOAD_BATCH_SIZE = 500
+
+TriggerUpdates = dict[str, list[dict[str, Any]] | None]
+
+_listeners: list[Callable[[TriggerUpdates], None]] = []
+
+
+def trigger_nodes(data: dict[str, Any]) -> list[dict[str, Any]]:
+    return [node for node in data.get("nodes", []) if node.get("type") in TRIGGER_TYPES]
+
+
+def stage_triggers(db: Session, workflow_id: str, data: dict[str, Any] | None) -> None:
+    """Queue the workflow's trigger nodes for publishing on commit; ``None`` means the workflow was deleted."""
+    pending = db.info.setdefault("pending_triggers", {})
+    pending[workflow_id] = trigger_nodes(data) if data is not None else None
+
+
+def add_trigger_listener(listener: Callable[[TriggerUpdates], None]) -> None:
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_trigger_listener(listener: Callable[[TriggerUpdates], None]) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session) -> None:
+    pending = session.info.pop("pending_triggers", None)
+    if not pending:
+        return
+    for listener in list(_listeners):
+        try:
+            listener(pending)
+        except Exception:  # noqa: BLE001
+            logger.exception("Trigger listener failed")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop("pending_triggers", None)
+
+
+def iter_stored_triggers(node_type: str) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+    """Yield (workflow_id, trigger nodes) for every stored workflow that has a node of ``node_type``."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Workflow.id, Workflow.data_json)
+            .filter(Workflow.deleted_at.is_(None))
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        for workflow_id, data_json in rows:
+            # Cheap substring check first; most workflows have no triggers and are never parsed.
+            if node_type not in data_json:
+                continue
+            nodes = [node for node in trigger_nodes(json.loads(data_json)) if node.get("type") == node_type]
+            if nodes:
+                yield workflow_id, nodes
+    finally:
+        db.close()
+
+
+def stored_trigger_nodes(workflow_id: str, node_type: str) -> list[dict[str, Any]] | None:
+    """Trigger nodes of one stored workflow, or ``None`` if it does not exist."""
+    db = SessionLocal()
+    try:
+        row = db.query(Workflow.data_json).filter(Workflow.id == workflow_id, Workflow.deleted_at.is_(None)).first()
+        if row is None:
+            return None
+        return [node for node in trigger_nodes(json.loads(row[0])) if node.get("type") == node_type]
+    finally:
+        db.close()
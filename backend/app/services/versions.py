@@ -0,0 +1,120 @@
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.workflow import Workflow
+from app.models.workflow_version import WorkflowVersion
+from app.services.json_patch import apply_patch, make_patch
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+_HEADER_KEYS = ("id", "name", "updatedAt")
+_GRAPH_KEYS = ("nodes", "edges")
+
+
+def header_ops(current: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"op": "replace", "path": f"/{key}", "value": current[key]} for key in _HEADER_KEYS]
+
+
+def graph_delta(previous: dict[str, Any], current: dict[str, Any]) -> list[dict[str, Any]]:
+    """JSON Patch turning the previous version into ``current``.
+
+    Name-only updates rewrite the head's header fields without recording a version, so those are always
+    replaced outright; nodes and edges only change alongside a new version and can be diffed against the head.
+    """
+    ops = header_ops(current)
+    ops.extend(
+        make_patch(
+            {key: previous.get(key) for key in _GRAPH_KEYS},
+            {key: current.get(key) for key in _GRAPH_KEYS},
+        )
+    )
+    return ops
+
+
+def is_snapshot_due(version: int) -> bool:
+    return (version - 1) % max(settings.WORKFLOW_VERSION_SNAPSHOT_INTERVAL, 1) == 0
+
+
+def record_version(
+    db: Session,
+    workflow: Workflow,
+    current: dict[str, Any] | None = None,
+    previous: dict[str, Any] | None = None,
+    delta: list[dict[str, Any]] | None = None,
+) -> WorkflowVersion:
+    """Add a version row for the workflow's current data.
+
+    ``current`` is the parsed ``workflow.data_json`` if the caller already has it. Stores a delta against
+    ``workflow.version - 1`` when ``previous`` (or a ready-made ``delta``) is given,
+    unless a periodic snapshot is due or the delta would not be smaller than the full document.
+    """
+    if current is None:
+        current = json.loads(workflow.data_json)
+    entry = WorkflowVersion(
+        workflow_id=workflow.id,
+        version=workflow.version,
+        kind=SNAPSHOT,
+        data_json=workflow.data_json,
+        size=len(workflow.data_json),
+        node_count=len(current.get("nodes", [])),
+        created_at=datetime.utcnow(),
+    )
+    if (previous is not None or delta is not None) and not is_snapshot_due(workflow.version):
+        if delta is None:
+            delta = graph_delta(previous, current)
+        delta_json = json.dumps(delta)
+        if len(delta_json) < len(workflow.data_json):
+            entry.kind = DELTA
+            entry.base_version = workflow.version - 1
+            entry.data_json = delta_json
+    db.add(entry)
+    return entry
+
+
+def materialize_version(db: Session, workflow_id: str, version: int) -> dict[str, Any] | None:
+    """Rebuild one version's document by replaying deltas from its snapshot. Returns None if it doesn't exist."""
+    snapshot_version = (
+        db.query(func.max(WorkflowVersion.version))
+        .filter(
+            WorkflowVersion.workflow_id == workflow_id,
+            WorkflowVersion.kind == SNAPSHOT,
+            WorkflowVersion.version <= version,
+        )
+        .scalar()
+    )
+    if snapshot_version is None:
+        return None
+    rows = (
+        db.query(
+            WorkflowVersion.version,
+            WorkflowVersion.kind,
+            WorkflowVersion.base_version,
+            WorkflowVersion.data_json,
+        )
+        .filter(
+            WorkflowVersion.workflow_id == workflow_id,
+            WorkflowVersion.version >= snapshot_version,
+            WorkflowVersion.version <= version,
+        )
+        .all()
+    )
+    by_version = {row.version: row for row in rows}
+    row = by_version.get(version)
+    if row is None:
+        return None
+    chain = []
+    while row.kind != SNAPSHOT:
+        chain.append(row)
+        row = by_version.get(row.base_version)
+        if row is None:
+            raise ValueError(f"Version history of workflow {workflow_id} is broken at version {chain[-1].version}")
+    data = json.loads(row.data_json)
+    for row in reversed(chain):
+        data = apply_patch(data, json.loads(row.data_json))
+    return data
@@ -0,0 +1,255 @@
+import asyncio
+import hmac
+import json
+import logging
+from datetime import datetime
+from typing import Any
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.webhook_event import WebhookEvent
+from app.models.workflow import Workflow
+from app.services.runs import add_run, execute_run
+from app.services.triggers import (
+    TriggerUpdates,
+    add_trigger_listener,
+    iter_stored_triggers,
+    remove_trigger_listener,
+    stored_trigger_nodes,
+)
+
+logger = logging.getLogger(__name__)
+
+# webhook_trigger node data: optional "secret" (sent as X-Webhook-Secret) and "startRun" (run the workflow for
+# each event). Hits are resolved against an in-memory route index, queued, and written by a single writer task
+# that drains whatever has accumulated into one multi-row insert per batch. Runs for startRun events are handed to
+# a fixed pool of dispatchers, so a burst of events never holds more than RUN_MAX_CONCURRENT run tasks.
+
+WRITE_ATTEMPTS = 6
+WRITE_BACKOFF_SECONDS = 0.5
+WRITE_BACKOFF_MAX_SECONDS = 10.0
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _route_config(node: dict[str, Any]) -> dict[str, Any]:
+    data = node.get("data") or {}
+    return {"secret": data.get("secret") or None, "start_run": bool(data.get("startRun"))}
+
+
+class WebhookIngest:
+    def __init__(self) -> None:
+        self._routes: dict[str, dict[str, dict[str, Any]]] = {}
+        self._live_updates: set[str] | None = None
+        self._loaded = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._runs: asyncio.Queue | None = None
+        self._retrying: list[dict[str, Any]] = []
+        self._tasks: list[asyncio.Task] = []
+        self.accepted = 0
+        self.rejected = 0
+        self.persisted = 0
+        self.batches = 0
+        self.write_failures = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        self._routes = {}
+        self._loaded = False
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=settings.WEBHOOK_QUEUE_SIZE)
+        self._runs = asyncio.Queue()
+        self._retrying = []
+        add_trigger_listener(self.on_triggers_changed)
+        self._tasks = [asyncio.create_task(self._load()), asyncio.create_task(self._writer())]
+        self._tasks += [asyncio.create_task(self._dispatcher()) for _ in range(settings.RUN_MAX_CONCURRENT)]
+
+    async def stop(self) -> None:
+        remove_trigger_listener(self.on_triggers_changed)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        # Runs still waiting for a dispatcher stay queued and are failed by recover_runs on the next start.
+        batch, self._retrying = self._retrying, []
+        if self._queue is not None:
+            batch += [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+        if batch:
+            await run_in_threadpool(_persist, batch)
+        self._queue = None
+        self._runs = None
+
+    def stats(self) -> dict:
+        return {
+            "routes": sum(len(nodes) for nodes in self._routes.values()),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "persisted": self.persisted,
+            "batches": self.batches,
+            "write_failures": self.write_failures,
+            "dropped": self.dropped,
+            "runs_queued": self._runs.qsize() if self._runs else 0,
+        }
+
+    def on_triggers_changed(self, updates: TriggerUpdates) -> None:
+        # Called from whichever thread committed; the route index is only touched on the event loop.
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._apply, updates)
+
+    def _apply(self, updates: TriggerUpdates) -> None:
+        for workflow_id, nodes in updates.items():
+            if self._live_updates is not None:
+                self._live_updates.add(workflow_id)
+            self._set_routes(workflow_id, nodes)
+
+    def _set_routes(self, workflow_id: str, nodes: list[dict[str, Any]] | None) -> None:
+        routes = {node["id"]: _route_config(node) for node in nodes or [] if node.get("type") == "webhook_trigger"}
+        if routes:
+            self._routes[workflow_id] = routes
+        else:
+            self._routes.pop(workflow_id, None)
+
+    async def _load(self) -> None:
+        self._live_updates = set()
+        stored = iter_stored_triggers("webhook_trigger")
+        sentinel = object()
+        while True:
+            item = await run_in_threadpool(next, stored, sentinel)
+            if item is sentinel:
+                break
+            if item[0] not in self._live_updates:
+                self._set_routes(*item)
+        self._live_updates = None
+        self._loaded = True
+
+    async def resolve(self, workflow_id: str, node_id: str) -> dict[str, Any] | None:
+        routes = self._routes.get(workflow_id)
+        if routes is None and not self._loaded:
+            nodes = await run_in_threadpool(stored_trigger_nodes, workflow_id, "webhook_trigger")
+            if nodes is not None:
+                self._set_routes(workflow_id, nodes)
+                routes = self._routes.get(workflow_id)
+        return (routes or {}).get(node_id)
+
+    @staticmethod
+    def check_secret(route: dict[str, Any], provided: str | None) -> bool:
+        if not route["secret"]:
+            return True
+        return provided is not None and hmac.compare_digest(route["secret"].encode(), provided.encode())
+
+    def submit(
+        self, workflow_id: str, node_id: str, route: dict[str, Any], content_type: str | None, payload: str
+    ) -> str:
+        event_id = str(uuid4())
+        event = {
+            "id": event_id,
+            "workflow_id": workflow_id,
+            "node_id": node_id,
+            "content_type": content_type,
+            "payload_json": payload,
+            "received_at": datetime.utcnow(),
+            "start_run": route["start_run"],
+        }
+        if self._queue is None:
+            raise QueueFull()
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull as exc:
+            self.rejected += 1
+            raise QueueFull() from exc
+        self.accepted += 1
+        return event_id
+
+    async def _writer(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < settings.WEBHOOK_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            for run_id in await self._write(batch):
+                self._runs.put_nowait(run_id)
+
+    async def _write(self, batch: list[dict[str, Any]]) -> list[str]:
+        # These events were already answered 202, so a failed write (a locked database, say) is retried with
+        # backoff; the queue fills up meanwhile and new events get 429. Only a batch that keeps failing is dropped.
+        delay = WRITE_BACKOFF_SECONDS
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                run_ids = await run_in_threadpool(_persist, batch)
+            except Exception:  # noqa: BLE001
+                self.write_failures += 1
+                if attempt == WRITE_ATTEMPTS:
+                    self.dropped += len(batch)
+                    logger.exception("Dropped %s webhook events after %s failed writes", len(batch), attempt)
+                    return []
+                logger.warning("Writing %s webhook events failed; retrying in %.1fs", len(batch), delay, exc_info=True)
+                self._retrying = batch
+                await asyncio.sleep(delay)
+                self._retrying = []
+                delay = min(delay * 2, WRITE_BACKOFF_MAX_SECONDS)
+                continue
+            self.persisted += len(batch)
+            self.batches += 1
+            return run_ids
+        return []
+
+    async def _dispatcher(self) -> None:
+        while True:
+            run_id = await self._runs.get()
+            try:
+                await execute_run(run_id)
+            except Exception:  # noqa: BLE001
+                logger.exception("Webhook run %s failed to start", run_id)
+
+
+def _persist(batch: list[dict[str, Any]]) -> list[str]:
+    db = SessionLocal()
+    try:
+        runs = []
+        wanted = {event["workflow_id"] for event in batch if event["start_run"]}
+        workflows = {}
+        if wanted:
+            query = db.query(Workflow).filter(Workflow.id.in_(wanted), Workflow.deleted_at.is_(None))
+            workflows = {workflow.id: workflow for workflow in query}
+        # Events for workflows deleted since they were accepted are dropped with the workflow.
+        existing = set(workflows)
+        missing = {event["workflow_id"] for event in batch} - existing
+        if missing:
+            query = db.query(Workflow.id).filter(Workflow.id.in_(missing), Workflow.deleted_at.is_(None))
+            existing |= {row[0] for row in query}
+        rows = []
+        for event in batch:
+            if event["workflow_id"] not in existing:
+                continue
+            row = {key: value for key, value in event.items() if key != "start_run"}
+            workflow = workflows.get(event["workflow_id"])
+            if event["start_run"] and workflow is not None:
+                run = add_run(
+                    db,
+                    workflow,
+                    trigger="webhook",
+                    trigger_node_id=event["node_id"],
+                    payload={"eventId": event["id"], "body": json.loads(event["payload_json"])},
+                )
+                run.id = str(uuid4())
+                row["run_id"] = run.id
+                runs.append(run.id)
+            rows.append(row)
+        if rows:
+            db.execute(insert(WebhookEvent).values(rows))
+        db.commit()
+        return runs
+    finally:
+        db.close()
+
+
+webhooks = WebhookIngest()
@@ -0,0 +1,26 @@
+from app.core.config import settings
+from app.models.workflow import Workflow
+from app.schemas.workflow import WorkflowData
+from app.services.cache import LRUCache
+
+
+# Sized by the length of the stored JSON, which tracks the parsed tree's footprint closely enough for eviction.
+_cache = LRUCache(max_size=settings.WORKFLOW_CACHE_MAX_BYTES)
+
+
+def get_workflow_data(workflow: Workflow) -> WorkflowData:
+    """Return the validated graph for ``workflow``. Callers must not mutate the result; it is shared."""
+    stamp = (workflow.version, workflow.updated_at)
+    data = _cache.get(workflow.id, tag=stamp)
+    if data is None:
+        data = WorkflowData.model_validate_json(workflow.data_json)
+        _cache.set(workflow.id, data, size=len(workflow.data_json), tag=stamp)
+    return data
+
+
+def invalidate_workflow(workflow_id: str) -> None:
+    _cache.pop(workflow_id)
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
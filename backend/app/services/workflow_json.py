@@ -0,0 +1,46 @@
+import json
+from collections.abc import Iterable
+
+from app.models.workflow import Workflow
+
+# Stored data_json was validated as WorkflowData on write, so these helpers splice it into the
+# response body verbatim instead of parsing and re-serializing it through pydantic.
+
+
+def _workflow_out_parts(workflow: Workflow) -> list[str]:
+    head = json.dumps(
+        {
+            "id": workflow.id,
+            "owner_id": workflow.owner_id,
+            "name": workflow.name,
+            "description": workflow.description,
+            "is_template": workflow.is_template,
+            "version": workflow.version,
+        }
+    )
+    tail = json.dumps(
+        {
+            "created_at": workflow.created_at.isoformat(),
+            "updated_at": workflow.updated_at.isoformat(),
+        }
+    )
+    return [head[:-1], ', "data": ', workflow.data_json, ", ", tail[1:]]
+
+
+def workflow_out_json(workflow: Workflow) -> bytes:
+    return "".join(_workflow_out_parts(workflow)).encode("utf-8")
+
+
+def workflow_list_json(workflows: Iterable[Workflow]) -> bytes:
+    parts = ["["]
+    for idx, workflow in enumerate(workflows):
+        if idx:
+            parts.append(", ")
+        parts.extend(_workflow_out_parts(workflow))
+    parts.append("]")
+    return "".join(parts).encode("utf-8")
+
+
+def envelope_json(data_json: str, exported_at: str, version: int = 1) -> bytes:
+    head = json.dumps({"version": version, "exportedAt": exported_at})
+    return "".join([head[:-1], ', "workflow": ', data_json, "}"]).encode("utf-8")
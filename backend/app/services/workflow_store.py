@@ -0,0 +1,147 @@
+import json
+from datetime import datetime
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.models.workflow import Workflow
+from app.schemas.workflow import WorkflowOut, WorkflowUpdate
+from app.services.diff import invalidate_diffs
+from app.services.layout import apply_layout
+from app.services.search import index_workflow, remove_from_index
+from app.services.triggers import stage_triggers
+from app.services.versions import header_ops, record_version
+from app.services.workflow_cache import get_workflow_data
+
+# Write helpers shared by the single-item routes, bulk import and batch operations. They only stage
+# changes on the session; callers commit once (usually via log_event/log_events).
+
+
+def workflow_to_out(workflow: Workflow) -> WorkflowOut:
+    return WorkflowOut(
+        id=workflow.id,
+        owner_id=workflow.owner_id,
+        name=workflow.name,
+        description=workflow.description,
+        is_template=workflow.is_template,
+        version=workflow.version,
+        data=get_workflow_data(workflow),
+        created_at=workflow.created_at,
+        updated_at=workflow.updated_at,
+    )
+
+
+def add_workflow(
+    db: Session,
+    owner_id: str,
+    name: str,
+    data: dict[str, Any],
+    description: str | None = None,
+    is_template: bool = False,
+) -> Workflow:
+    now = datetime.utcnow()
+    workflow = Workflow(
+        id=str(uuid4()),
+        owner_id=owner_id,
+        name=name,
+        description=description,
+        is_template=is_template,
+        version=1,
+        created_at=now,
+        updated_at=now,
+    )
+    data["id"] = workflow.id
+    data["name"] = workflow.name
+    data["updatedAt"] = now.isoformat()
+    workflow.data_json = json.dumps(data)
+    db.add(workflow)
+    record_version(db, workflow, data)
+    index_workflow(db, workflow, data)
+    stage_triggers(db, workflow.id, data)
+    return workflow
+
+
+def save_graph(
+    db: Session,
+    workflow: Workflow,
+    data: dict[str, Any],
+    previous: dict[str, Any] | None = None,
+    graph_ops: list[dict[str, Any]] | None = None,
+) -> None:
+    """Store ``data`` as the workflow's next version.
+
+    Pass either the ``previous`` document (the delta is computed) or the ``graph_ops`` that produced ``data``.
+    """
+    now = datetime.utcnow()
+    data["id"] = workflow.id
+    data["name"] = workflow.name
+    data["updatedAt"] = now.isoformat()
+    workflow.data_json = json.dumps(data)
+    workflow.version += 1
+    workflow.updated_at = now
+    delta = header_ops(data) + graph_ops if graph_ops is not None else None
+    record_version(db, workflow, data, previous=previous, delta=delta)
+    index_workflow(db, workflow, data)
+    stage_triggers(db, workflow.id, data)
+    db.add(workflow)
+
+
+def update_workflow_fields(db: Session, workflow: Workflow, payload: WorkflowUpdate, auto_layout: bool = False) -> None:
+    if payload.name is not None:
+        workflow.name = payload.name
+    if payload.description is not None:
+        workflow.description = payload.description
+    if payload.is_template is not None:
+        workflow.is_template = payload.is_template
+    if payload.data is None and payload.name is not None:
+        try:
+            data = json.loads(workflow.data_json)
+            data["name"] = workflow.name
+            data["id"] = workflow.id
+            data["updatedAt"] = datetime.utcnow().isoformat()
+            workflow.data_json = json.dumps(data)
+        except Exception:
+            pass
+    if payload.data is not None:
+        data = payload.data.model_dump()
+        if auto_layout:
+            apply_layout(data)
+        save_graph(db, workflow, data, previous=json.loads(workflow.data_json))
+    elif payload.name is not None or payload.description is not None:
+        index_workflow(db, workflow)
+    workflow.updated_at = datetime.utcnow()
+    db.add(workflow)
+
+
+def add_duplicate(db: Session, workflow: Workflow) -> Workflow:
+    now = datetime.utcnow()
+    new_workflow = Workflow(
+        id=str(uuid4()),
+        owner_id=workflow.owner_id,
+        name=f"{workflow.name} Copy",
+        description=workflow.description,
+        version=1,
+        data_json=workflow.data_json,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(new_workflow)
+    data = json.loads(workflow.data_json)
+    record_version(db, new_workflow, data)
+    index_workflow(db, new_workflow, data)
+    stage_triggers(db, new_workflow.id, data)
+    return new_workflow
+
+
+def delete_workflows(db: Session, workflows: list[Workflow]) -> None:
+    """Soft-delete: hide the workflows now; the retention worker purges their history in small batches."""
+    if not workflows:
+        return
+    now = datetime.utcnow()
+    remove_from_index(db, [workflow.id for workflow in workflows])
+    for workflow in workflows:
+        workflow.deleted_at = now
+        db.add(workflow)
+        stage_triggers(db, workflow.id, None)
+        invalidate_diffs(workflow.id)
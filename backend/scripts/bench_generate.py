@@ -0,0 +1,144 @@
+"""Load test for POST /api/workflows/generate against a running backend.
+
+Usage (from backend/, with the backend pointed at scripts/mock_openai.py via OPENAI_BASE_URL):
+    python scripts/bench_generate.py --requests 200 --concurrency 20
+    python scripts/bench_generate.py --user a@example.com:pw --user b@example.com:pw --concurrency 50 --cache
+
+Requests are spread round-robin over the --user logins (the per-user generation limit otherwise caps throughput)
+and use unique descriptions with "cache": "bypass" unless --cache is given. Reports latency percentiles, throughput
+and status codes, plus the thread pool and generation queue as sampled from /api/metrics (needs an admin login).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+async def login(client: httpx.AsyncClient, credentials: str) -> dict[str, str]:
+    email, _, password = credentials.partition(":")
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def sample_metrics(client: httpx.AsyncClient, headers: dict, interval: float, samples: list[dict]) -> None:
+    while True:
+        response = await client.get("/api/metrics", headers=headers)
+        if response.status_code != 200:
+            print(f"metrics unavailable ({response.status_code}); thread pool not sampled")
+            return
+        samples.append(response.json())
+        await asyncio.sleep(interval)
+
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency + 2, max_keepalive_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        users = [await login(client, credentials) for credentials in args.user]
+        admin = await login(client, args.admin) if args.admin else users[0]
+        run_id = uuid.uuid4().hex[:8]
+        pending: asyncio.Queue[int] = asyncio.Queue()
+        for idx in range(args.requests):
+            pending.put_nowait(idx)
+        latencies: list[float] = []
+        statuses: Counter = Counter()
+        cache_results: Counter = Counter()
+
+        async def worker() -> None:
+            while not pending.empty():
+                idx = pending.get_nowait()
+                payload = {"description": args.description, "mode": "replace"}
+                if not args.cache:
+                    payload.update(description=f"{args.description} ({run_id} #{idx})", cache="bypass")
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/api/workflows/generate", json=payload, headers=users[idx % len(users)]
+                    )
+                except httpx.HTTPError as exc:
+                    statuses[type(exc).__name__] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                statuses[response.status_code] += 1
+                if response.status_code == 200:
+                    latencies.append(elapsed * 1000)
+                    cache_results[response.headers.get("X-Generation-Cache", "-")] += 1
+
+        samples: list[dict] = []
+        sampler = asyncio.create_task(sample_metrics(client, admin, args.sample_interval, samples))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        await asyncio.gather(sampler, return_exceptions=True)
+        final = await client.get("/api/metrics", headers=admin)
+
+    print(f"requests     {args.requests} at concurrency {args.concurrency} in {elapsed:.2f}s")
+    print(f"throughput   {statuses[200] / elapsed:.2f} ok/s, {args.requests / elapsed:.2f} total/s")
+    print(f"status       {dict(statuses)}  cache {dict(cache_results)}")
+    if latencies:
+        print(
+            f"latency ms   p50 {percentile(latencies, 50):.0f}  p95 {percentile(latencies, 95):.0f}  "
+            f"p99 {percentile(latencies, 99):.0f}  max {max(latencies):.0f}"
+        )
+    if samples:
+        pools = [sample["threadpool"] for sample in samples]
+        size = pools[0]["size"]
+        in_use = [pool["in_use"] for pool in pools]
+        saturated = sum(1 for pool in pools if pool["in_use"] >= pool["size"] or pool["waiting"])
+        print(
+            f"threadpool   size {size}  in use mean {statistics.mean(in_use):.1f} peak {max(in_use)}  "
+            f"waiting peak {max(pool['waiting'] for pool in pools)}  "
+            f"saturated {saturated / len(pools):.0%} of {len(pools)} samples"
+        )
+        queued = [sample["generation"]["queued"] for sample in samples]
+        running = [sample["generation"]["running"] for sample in samples]
+        print(f"generation   running peak {max(running)}  queued peak {max(queued)}")
+    if final.status_code == 200:
+        generation = final.json()["generation"]
+        print(
+            f"slot wait ms p50 {generation['wait_p50_ms']}  p95 {generation['wait_p95_ms']}  "
+            f"max {generation['wait_max_ms']}"
+        )
+        for attempt, counts in generation["repair"]["attempts"].items():
+            print(
+                f"attempt {attempt}    valid {counts['valid']}  invalid {counts['invalid']}  "
+                f"rate {counts['success_rate']}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--user",
+        action="append",
+        metavar="EMAIL:PASSWORD",
+        help="login to generate as; repeat to spread load (default ADMIN_EMAIL:ADMIN_PASSWORD)",
+    )
+    parser.add_argument("--admin", metavar="EMAIL:PASSWORD", help="login for /api/metrics (default the first user)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--description", default="webhook intake, validate the payload, call the CRM, notify sales")
+    parser.add_argument("--cache", action="store_true", help="repeat one description and allow cache hits")
+    parser.add_argument("--sample-interval", type=float, default=0.25, help="seconds between /api/metrics samples")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    if not args.user:
+        args.user = [f"{os.environ.get('ADMIN_EMAIL', 'admin@example.com')}:{os.environ.get('ADMIN_PASSWORD', '')}"]
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compression ratio and latency of the workflow JSON column codecs.
+
+Usage (from backend/):
+    python scripts/bench_json_codec.py                 # synthetic workflows of 100/1000/5000 nodes
+    python scripts/bench_json_codec.py --from-db 50    # the 50 largest stored workflows
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from sqlalchemy import func  # noqa: E402
+
+from app.db.types import decode_json_text, encode_json_text, zstandard  # noqa: E402
+
+
+def synthetic_workflow(node_count: int) -> str:
+    nodes = [
+        {
+            "id": f"node_{idx}",
+            "type": "task" if idx % 5 else "http_request",
+            "position": {"x": float(idx * 260), "y": float((idx % 7) * 120)},
+            "data": {"label": f"Step {idx}", "description": None, "status": "Ready", "color": None},
+        }
+        for idx in range(1, node_count + 1)
+    ]
+    edges = [
+        {"id": f"edge_{idx}", "source": f"node_{idx}", "target": f"node_{idx + 1}", "sourceHandle": None, "type": None}
+        for idx in range(1, node_count)
+    ]
+    return json.dumps(
+        {"id": "wf_bench", "name": "Benchmark", "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": edges}
+    )
+
+
+def stored_workflows(limit: int) -> list[str]:
+    from app.db.session import SessionLocal
+    from app.models.workflow import Workflow
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Workflow.data_json).order_by(func.length(Workflow.data_json).desc()).limit(limit).all()
+        return [row.data_json for row in rows]
+    finally:
+        db.close()
+
+
+def measure(documents: list[str], codec: str, rounds: int) -> dict[str, float]:
+    raw_bytes = sum(len(doc.encode("utf-8")) for doc in documents)
+    encode_ms, decode_ms, stored_bytes = [], [], 0
+    for _ in range(rounds):
+        stored_bytes = 0
+        for doc in documents:
+            start = time.perf_counter()
+            encoded = encode_json_text(doc, codec=codec, min_bytes=0)
+            encode_ms.append((time.perf_counter() - start) * 1000)
+            stored_bytes += len(encoded) if isinstance(encoded, bytes) else len(encoded.encode("utf-8"))
+            start = time.perf_counter()
+            decode_json_text(encoded)
+            decode_ms.append((time.perf_counter() - start) * 1000)
+    return {
+        "ratio": raw_bytes / stored_bytes if stored_bytes else 0.0,
+        "encode_ms_p50": statistics.median(encode_ms),
+        "decode_ms_p50": statistics.median(decode_ms),
+        "encode_ms_max": max(encode_ms),
+        "decode_ms_max": max(decode_ms),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from-db", type=int, metavar="N", help="benchmark the N largest stored workflows")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.from_db:
+        groups = {"stored": stored_workflows(args.from_db)}
+    else:
+        groups = {f"{count} nodes": [synthetic_workflow(count)] for count in (100, 1000, 5000)}
+    codecs = ["none", "zlib"] + (["zstd"] if zstandard is not None else [])
+
+    print(f"{'input':<12} {'codec':<6} {'ratio':>7} {'enc p50':>9} {'dec p50':>9} {'enc max':>9} {'dec max':>9}")
+    for label, documents in groups.items():
+        if not documents:
+            print(f"{label:<12} (no rows)")
+            continue
+        for codec in codecs:
+            result = measure(documents, codec, args.rounds)
+            print(
+                f"{label:<12} {codec:<6} {result['ratio']:>6.2f}x "
+                f"{result['encode_ms_p50']:>7.2f}ms {result['decode_ms_p50']:>7.2f}ms "
+                f"{result['encode_ms_max']:>7.2f}ms {result['decode_ms_max']:>7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
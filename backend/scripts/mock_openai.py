@@ -0,0 +1,146 @@
+"""Local stand-in for the OpenAI chat completions API, for load-testing workflow generation offline.
+
+Usage (from backend/):
+    python scripts/mock_openai.py --port 9100 --latency-ms 400 --tokens-per-second 150 --malformed-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=mock uvicorn app.main:app
+
+Serves POST /v1/chat/completions, streaming and not. Replies are synthetic workflows (or append fragments when the
+request asks for the workflow_fragment schema). --latency-ms is the time to first token and --tokens-per-second the
+output rate (about four characters per token). A --malformed-rate share of replies is truncated JSON or has an
+invalid node type, and an --error-rate share is answered with 503.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CHARS_PER_TOKEN = 4
+STREAM_TICK_SECONDS = 0.02
+STEP_TYPES = ["task", "http_request", "transform_mapper", "validator", "log_event", "notify_alert"]
+
+
+def synthetic_reply(rng: random.Random, node_count: int, fragment: bool) -> dict:
+    prefix = "new" if fragment else "node"
+    types = [] if fragment else ["start"]
+    types += [rng.choice(STEP_TYPES) for _ in range(max(node_count - len(types) - 1, 1))] + ["end"]
+    nodes = []
+    for idx, node_type in enumerate(types, start=1):
+        node = {
+            "id": f"{prefix}_{idx}",
+            "type": node_type,
+            "data": {"label": f"Step {idx}", "description": None, "status": "Ready", "color": None},
+        }
+        if not fragment:
+            node["position"] = {"x": float((idx - 1) * 260), "y": 0.0}
+        nodes.append(node)
+    edges = [
+        {"id": f"{prefix}_edge_{idx}", "source": f"{prefix}_{idx}", "target": f"{prefix}_{idx + 1}"}
+        for idx in range(1, len(nodes))
+    ]
+    if fragment:
+        return {"nodes": nodes, "edges": edges}
+    header = {"id": "wf_mock", "name": "Mock Workflow", "updatedAt": "2026-01-01T00:00:00"}
+    return {**header, "nodes": nodes, "edges": edges}
+
+
+def reply_content(args: argparse.Namespace, rng: random.Random, body: dict) -> str:
+    schema = (body.get("response_format") or {}).get("json_schema") or {}
+    reply = synthetic_reply(rng, args.nodes, schema.get("name") == "workflow_fragment")
+    if rng.random() >= args.malformed_rate:
+        return json.dumps(reply)
+    if rng.random() < 0.5:
+        text = json.dumps(reply)
+        return text[: len(text) // 2]
+    reply["nodes"][-1]["type"] = "not_a_node_type"
+    return json.dumps(reply)
+
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(args.seed)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if rng.random() < args.error_rate:
+            return JSONResponse({"error": {"message": "Injected failure", "type": "server_error"}}, status_code=503)
+        content = reply_content(args, rng, body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get("model", "mock")
+        created = int(time.time())
+        chars_per_second = args.tokens_per_second * CHARS_PER_TOKEN
+        await asyncio.sleep(args.latency_ms / 1000)
+
+        if not body.get("stream"):
+            if chars_per_second:
+                await asyncio.sleep(len(content) / chars_per_second)
+            prompt_tokens = len(json.dumps(body.get("messages", []))) // CHARS_PER_TOKEN
+            completion_tokens = len(content) // CHARS_PER_TOKEN
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+
+        def chunk(delta: dict, finish_reason: str | None = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            started = time.monotonic()
+            sent = 0
+            while sent < len(content):
+                if chars_per_second:
+                    await asyncio.sleep(STREAM_TICK_SECONDS)
+                    due = min(len(content), int((time.monotonic() - started) * chars_per_second))
+                else:
+                    due = len(content)
+                if due > sent:
+                    yield chunk({"content": content[sent:due]})
+                    sent = due
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="output rate; 0 sends it all at once")
+    parser.add_argument("--nodes", type=int, default=8, help="nodes per generated workflow")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of replies that fail validation")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+# API tests run the app against a file database migrated to head; set before the app reads its settings.
+_DB_DIR = tempfile.mkdtemp(prefix="workflow-tests-")
+DB_PATH = os.path.join(_DB_DIR, "app.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+import app.models  # noqa: E402,F401
+from app.db.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+USERS = {
+    "admin": ("admin@example.com", "adminpass", "admin"),
+    "owner": ("u1@example.com", "u1pass", "user"),
+    "other": ("u2@example.com", "u2pass", "user"),
+}
+
+
+@pytest.fixture
+def session_factory():
+    """Sessions on a fresh in-memory database; patch it over a module's SessionLocal to test services."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="owner@example.com", password_hash="x", role="user")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture(scope="session")
+def migrated_template():
+    """A database file migrated to head with the USERS accounts, copied fresh for every API test."""
+    from alembic import command
+    from alembic.config import Config
+
+    from app.core.security import get_password_hash
+    from app.db.session import SessionLocal, engine
+
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+    db = SessionLocal()
+    try:
+        for email, password, role in USERS.values():
+            db.add(User(email=email, password_hash=get_password_hash(password), role=role, is_active=True))
+        db.commit()
+    finally:
+        db.close()
+    engine.dispose()
+    template = os.path.join(_DB_DIR, "template.db")
+    shutil.copy(DB_PATH, template)
+    return template
+
+
+@pytest.fixture
+def client(migrated_template):
+    from fastapi.testclient import TestClient
+
+    from app.db.session import engine
+    from app.main import app
+
+    engine.dispose()
+    shutil.copy(migrated_template, DB_PATH)
+    with TestClient(app) as test_client:
+        yield test_client
+    engine.dispose()
+
+
+def _login(client, name: str) -> dict[str, str]:
+    email, password, _ = USERS[name]
+    response = client.post("/api/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def auth(client):
+    return _login(client, "owner")
+
+
+@pytest.fixture
+def other_auth(client):
+    return _login(client, "other")
+
+
+@pytest.fixture
+def admin_auth(client):
+    return _login(client, "admin")
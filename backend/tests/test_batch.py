@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from app.db.session import SessionLocal
+from app.models.audit_log import AuditLog
+
+
+def _graph(name: str) -> dict:
+    nodes = [
+        {"id": "node_1", "type": "start", "position": {"x": 0, "y": 0}, "data": {"label": "Start"}},
+        {"id": "node_2", "type": "end", "position": {"x": 260, "y": 0}, "data": {"label": "End"}},
+    ]
+    edges = [{"id": "edge_1", "source": "node_1", "target": "node_2"}]
+    return {"id": "x", "name": name, "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": edges}
+
+
+def _create(client, headers, name: str) -> str:
+    return client.post("/api/workflows", json={"name": name, "data": _graph(name)}, headers=headers).json()["id"]
+
+
+def _batch(client, headers, ops: list[dict]) -> list[dict]:
+    response = client.post("/api/workflows:batch", json={"ops": ops}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+def _audit(action_prefix: str = "workflow.") -> list[AuditLog]:
+    db = SessionLocal()
+    try:
+        return db.query(AuditLog).filter(AuditLog.action.startswith(action_prefix)).all()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def existing(client, auth):
+    return [_create(client, auth, f"wf {idx}") for idx in range(3)]
+
+
+def test_mixed_batch(client, auth, existing):
+    graph = _graph("changed")
+    graph["nodes"][0]["data"]["label"] = "Begin"
+    results = _batch(
+        client,
+        auth,
+        [
+            {"op": "create", "workflow": {"name": "new", "data": _graph("new")}},
+            {"op": "update", "id": existing[0], "changes": {"name": "renamed", "data": graph}},
+            {"op": "duplicate", "id": existing[1]},
+            {"op": "delete", "id": existing[2]},
+        ],
+    )
+    assert [(result["op"], result["ok"], result["status"]) for result in results] == [
+        ("create", True, 200),
+        ("update", True, 200),
+        ("duplicate", True, 200),
+        ("delete", True, 200),
+    ]
+    # Versions are only known after the flush: new workflows start at 1, the edited one moved to 2.
+    assert [result["version"] for result in results] == [1, 2, 1, None]
+    created, duplicate = results[0]["id"], results[2]["id"]
+    assert duplicate not in existing and results[1]["id"] == existing[0] and results[3]["id"] == existing[2]
+
+    listed = {item["id"]: item for item in client.get("/api/workflows", headers=auth).json()}
+    assert set(listed) == {created, existing[0], existing[1], duplicate}
+    assert listed[existing[0]]["name"] == "renamed"
+    assert listed[existing[0]]["data"]["nodes"][0]["data"]["label"] == "Begin"
+    assert client.get(f"/api/workflows/{existing[2]}", headers=auth).status_code == 404
+
+
+def test_missing_and_foreign_ids_fail_alone(client, auth, other_auth, existing):
+    foreign = _create(client, other_auth, "theirs")
+    results = _batch(
+        client,
+        auth,
+        [
+            {"op": "update", "id": "missing", "changes": {"name": "x"}},
+            {"op": "duplicate", "id": foreign},
+            {"op": "delete", "id": foreign},
+            {"op": "update", "id": existing[0], "changes": {"name": "renamed"}},
+        ],
+    )
+    assert [(result["ok"], result["status"], result["error"]) for result in results[:3]] == [
+        (False, 404, "Workflow not found")
+    ] * 3
+    assert results[3]["ok"] and results[3]["status"] == 200
+    assert client.get(f"/api/workflows/{existing[0]}", headers=auth).json()["name"] == "renamed"
+    assert client.get(f"/api/workflows/{foreign}", headers=other_auth).status_code == 200
+
+
+def test_ops_after_a_delete_of_the_same_id_fail(client, auth, existing):
+    results = _batch(
+        client,
+        auth,
+        [
+            {"op": "delete", "id": existing[0]},
+            {"op": "update", "id": existing[0], "changes": {"name": "too late"}},
+            {"op": "delete", "id": existing[0]},
+            {"op": "duplicate", "id": existing[0]},
+        ],
+    )
+    assert [result["status"] for result in results] == [200, 404, 404, 404]
+    assert client.get(f"/api/workflows/{existing[0]}", headers=auth).status_code == 404
+    listed = client.get("/api/workflows", headers=auth).json()
+    assert sorted(item["name"] for item in listed) == ["wf 1", "wf 2"]
+
+
+def test_audit_rows_per_op_and_one_summary(client, auth, existing):
+    before = {row.id for row in _audit()}
+    results = _batch(
+        client,
+        auth,
+        [
+            {"op": "create", "workflow": {"name": "new", "data": _graph("new")}},
+            {"op": "update", "id": existing[0], "changes": {"name": "renamed"}},
+            {"op": "delete", "id": existing[1]},
+            {"op": "duplicate", "id": "missing"},
+        ],
+    )
+    rows = sorted((row for row in _audit() if row.id not in before), key=lambda row: row.action)
+    assert [(row.action, row.target_id) for row in rows] == [
+        ("workflow.batch", None),
+        ("workflow.create", results[0]["id"]),
+        ("workflow.delete", existing[1]),
+        ("workflow.update", existing[0]),
+    ]
+    assert json.loads(rows[0].meta_json) == {"ops": 4, "failed": 1}
+    # Written together in one multi-row insert.
+    assert len({row.created_at for row in rows}) == 1
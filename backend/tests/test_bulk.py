@@ -0,0 +1,40 @@
+import asyncio
+import gzip
+
+import pytest
+
+from app.core.config import settings
+from app.services.bulk import ImportTooLarge, iter_ndjson_lines
+
+
+def _lines(chunks: list[bytes], gzipped: bool | None = None) -> list[tuple[int, bytes]]:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [item async for item in iter_ndjson_lines(stream(), gzipped)]
+
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks_and_blank_lines_skipped():
+    assert _lines([b'{"a":', b' 1}\n\n{"b": 2}', b"\n{"]) == [(1, b'{"a": 1}'), (3, b'{"b": 2}'), (4, b"{")]
+
+
+def test_gzip_is_detected_from_magic_bytes():
+    body = gzip.compress(b"one\ntwo\n")
+    assert _lines([body[:5], body[5:]]) == [(1, b"one"), (2, b"two")]
+
+
+def test_decompressed_size_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_IMPORT_MAX_BYTES", 1024 * 1024)
+    bomb = gzip.compress(b"\n" * (16 * 1024 * 1024), 9)
+    with pytest.raises(ImportTooLarge):
+        _lines([bomb])
+
+
+def test_overlong_line_is_rejected(monkeypatch):
+    monkeypatch.setattr("app.services.bulk.MAX_LINE_BYTES", 10)
+    with pytest.raises(ValueError, match="exceeds"):
+        _lines([b"x" * 11])
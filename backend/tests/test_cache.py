@@ -0,0 +1,31 @@
+from app.services.cache import LRUCache
+
+
+def test_size_bound_evicts_least_recently_used():
+    cache = LRUCache(max_size=3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    cache.set("d", 4)
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [1, 3, 4]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_tag_mismatch_is_a_miss():
+    cache = LRUCache(max_size=10)
+    cache.set("a", 1, tag=1)
+    assert cache.get("a", tag=2) is None
+    assert cache.get("a", tag=1) == 1
+
+
+def test_pop_tagged_removes_only_that_tag():
+    cache = LRUCache(max_size=10)
+    cache.set(("wf1", 1, 2), "x", size=2, tag="wf1")
+    cache.set(("wf1", 2, 3), "y", size=2, tag="wf1")
+    cache.set(("wf2", 1, 2), "z", size=2, tag="wf2")
+    assert cache.pop_tagged("wf1") == 2
+    assert cache.get(("wf1", 1, 2), tag="wf1") is None
+    assert cache.get(("wf2", 1, 2), tag="wf2") == "z"
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.cron import CronSpec, parse_cron
+
+
+def _matches(spec: CronSpec, moment: datetime) -> bool:
+    return (
+        moment.minute in spec.minutes
+        and moment.hour in spec.hours
+        and moment.month in spec.months
+        and spec._day_matches(moment)
+    )
+
+
+def _brute_force(spec: CronSpec, moment: datetime, horizon: timedelta) -> datetime | None:
+    candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    end = moment + horizon
+    while candidate <= end:
+        if _matches(spec, candidate):
+            return candidate
+        candidate += timedelta(minutes=1)
+    return None
+
+
+@pytest.mark.parametrize(
+    "expression,after,expected",
+    [
+        ("*/15 * * * *", datetime(2026, 1, 1, 10, 7, 30), datetime(2026, 1, 1, 10, 15)),
+        ("0 9 * * mon-fri", datetime(2026, 1, 2, 9, 0), datetime(2026, 1, 5, 9, 0)),
+        ("30 2 29 feb *", datetime(2026, 3, 1), datetime(2028, 2, 29, 2, 30)),
+        ("0 0 1 * *", datetime(2026, 12, 15), datetime(2027, 1, 1)),
+        ("@hourly", datetime(2026, 1, 1, 23, 59, 59), datetime(2026, 1, 2)),
+        ("0 12 13 * fri", datetime(2026, 1, 1), datetime(2026, 1, 2, 12, 0)),  # day OR weekday
+        ("0 0 * * 7", datetime(2026, 1, 1), datetime(2026, 1, 4)),  # 7 is Sunday too
+        ("0 0 */2 * 1", datetime(2026, 1, 1), datetime(2026, 1, 5)),  # "*/2" day field: odd days AND Monday
+        ("0 0 13 * */2", datetime(2026, 1, 1), datetime(2026, 1, 13)),  # "*/2" weekday field: ANDed the same way
+    ],
+)
+def test_next_after(expression, after, expected):
+    assert CronSpec(expression).next_after(after) == expected
+
+
+def test_impossible_date_returns_none():
+    assert CronSpec("0 0 31 feb *").next_after(datetime(2026, 1, 1)) is None
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["* * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "*/0 * * * *", "5-1 * * * *", "* * * foo *"],
+)
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSpec(expression)
+
+
+def test_matches_brute_force_scan():
+    rng = random.Random(7)
+    fields = [
+        ["*", "*/7", "0", "5,35", "10-20/5"],
+        ["*", "*/5", "3", "22-23", "1,13"],
+        ["*", "1", "15-17", "*/10", "31", "*/2"],
+        ["*", "*", "*", "2,3,4"],
+        ["*", "1-5", "sun", "sat,sun", "*/2"],
+    ]
+    for _ in range(60):
+        spec = CronSpec(" ".join(rng.choice(options) for options in fields))
+        moment = datetime(2026, 1, 1) + timedelta(minutes=rng.randrange(366 * 24 * 60))
+        expected = _brute_force(spec, moment, timedelta(days=40))
+        actual = spec.next_after(moment)
+        if expected is not None:
+            assert actual == expected, spec.expression
+        else:
+            assert actual is None or actual > moment + timedelta(days=40), spec.expression
+
+
+def test_parse_cron_is_cached():
+    assert parse_cron("*/5 * * * *") is parse_cron("*/5 * * * *")
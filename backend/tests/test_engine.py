@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.services.engine import RunFailed, WorkflowEngine, render, resolve_path
+
+
+def _workflow(nodes: list[tuple[str, str, dict]], edges: list[tuple[str, str]]) -> dict:
+    return {
+        "nodes": [{"id": node_id, "type": node_type, "data": data} for node_id, node_type, data in nodes],
+        "edges": [{"id": f"e{idx}", "source": source, "target": target} for idx, (source, target) in enumerate(edges)],
+    }
+
+
+def _fan_out(width: int) -> dict:
+    branches = [(f"b{idx}", "delay", {"ms": 10}) for idx in range(width)]
+    edges = [("s", "f"), *(("f", node_id) for node_id, _, _ in branches)]
+    edges += [(node_id, "j") for node_id, _, _ in branches] + [("j", "e")]
+    nodes = [("s", "start", {}), ("f", "parallel_fork", {}), *branches, ("j", "join_merge", {}), ("e", "end", {})]
+    return _workflow(nodes, edges)
+
+
+def test_render_and_resolve_path():
+    scope = {"input": {"user": {"name": "Ada"}, "items": [1, 2]}}
+    assert resolve_path(scope, "input.user.name") == "Ada"
+    assert render("{{ input.items }}", scope) == [1, 2]
+    assert render({"greeting": "Hi {{ input.user.name }}"}, scope) == {"greeting": "Hi Ada"}
+
+
+def test_parallel_branches_run_to_the_join():
+    engine = WorkflowEngine(_fan_out(5))
+    asyncio.run(engine.run())
+    assert len(engine.steps) == 9
+    assert engine.outputs["j"] == {"joined": True}
+
+
+def test_step_limit_holds_across_parallel_branches():
+    # All five branches are dispatched before any of them records a step.
+    engine = WorkflowEngine(_fan_out(5), max_steps=4)
+    with pytest.raises(RunFailed, match="exceeded 4 steps"):
+        asyncio.run(engine.run())
+    assert engine.dispatched == 4
+
+
+def test_loop_runs_body_per_item():
+    nodes = [
+        ("s", "start", {}),
+        ("l", "loop_foreach", {"items": "{{ input.items }}"}),
+        ("m", "transform_mapper", {"mapping": {"double": "{{ item }}"}}),
+        ("e", "end", {}),
+    ]
+    data = _workflow(nodes, [("s", "l"), ("l", "m"), ("m", "l"), ("l", "e")])
+    engine = WorkflowEngine(data)
+    outputs = asyncio.run(engine.run({"items": [1, 2, 3]}))
+    assert outputs["l"]["count"] == 3
+    assert [item["m"] for item in outputs["l"]["items"]] == [{"double": 1}, {"double": 2}, {"double": 3}]
+
+
+def test_invalid_graph_is_rejected():
+    with pytest.raises(RunFailed):
+        WorkflowEngine(_workflow([("a", "task", {})], []))
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.generation_cache import GenerationCacheEntry
+from app.schemas.workflow import GenerateRequest
+from app.services.generation_cache import GenerationCache, cache_key, cache_status, normalize_description
+
+
+def _existing(end_label: str = "End", open_end: str = "node_2") -> dict:
+    nodes = [
+        {"id": "node_1", "type": "start", "position": {"x": 0, "y": 0}, "data": {"label": "Start"}},
+        {"id": open_end, "type": "end", "position": {"x": 260, "y": 40}, "data": {"label": end_label}},
+    ]
+    edges = [{"id": "edge_1", "source": "node_1", "target": open_end}]
+    return {"id": "x", "name": "wf", "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": edges}
+
+
+def _request(description: str = "Send an email", **fields) -> GenerateRequest:
+    return GenerateRequest(description=description, **fields)
+
+
+@pytest.fixture
+def cache(client):
+    # The client fixture provides a fresh migrated database for the generation_cache table.
+    return GenerationCache()
+
+
+def test_normalize_description():
+    assert normalize_description("  Send\tan\n EMAIL  ") == "send an email"
+    assert normalize_description("Straße ﬁle") == "strasse file"
+    assert normalize_description("Ｓｅｎｄ") == "send"
+
+
+def test_key_ignores_case_and_spacing():
+    assert cache_key(_request("Send an email")) == cache_key(_request("  send AN   email "))
+    assert cache_key(_request("Send an email")) != cache_key(_request("Send an SMS"))
+
+
+def test_mode_and_model_change_the_key(monkeypatch):
+    replace = cache_key(_request())
+    assert cache_key(_request(mode="append")) != replace
+    monkeypatch.setattr(settings, "OPENAI_MODEL", "another-model")
+    assert cache_key(_request()) != replace
+
+
+def test_append_key_uses_the_open_end_digest():
+    key = cache_key(_request(mode="append", existing_workflow=_existing()))
+    # Labels and positions are not sent to the model in append mode, so they do not split the cache.
+    assert cache_key(_request(mode="append", existing_workflow=_existing(end_label="Done"))) == key
+    assert cache_key(_request(mode="append", existing_workflow=_existing(open_end="node_9"))) != key
+    empty = {**_existing(), "nodes": [], "edges": []}
+    assert cache_key(_request(mode="append", existing_workflow=empty)) == cache_key(_request(mode="append"))
+    # Replace mode never looks at the existing graph.
+    assert cache_key(_request(existing_workflow=_existing())) == cache_key(_request())
+
+
+def test_hits_from_memory_then_database(cache):
+    key = cache_key(_request())
+    assert asyncio.run(cache.get(key)) is None
+    asyncio.run(cache.put(key, '{"nodes": []}'))
+    assert asyncio.run(cache.get(key)) == '{"nodes": []}'
+    # A fresh process has an empty memory layer and falls back to the table, then remembers the entry.
+    restarted = GenerationCache()
+    assert asyncio.run(restarted.get(key)) == '{"nodes": []}'
+    assert asyncio.run(restarted.get(key)) == '{"nodes": []}'
+    stats, restarted_stats = cache.stats(), restarted.stats()
+    assert (stats["memory_hits"], stats["db_hits"], stats["misses"], stats["writes"]) == (1, 0, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert (restarted_stats["memory_hits"], restarted_stats["db_hits"], restarted_stats["misses"]) == (1, 1, 0)
+
+
+def test_expired_entries_miss_in_both_layers(cache, monkeypatch):
+    key = cache_key(_request())
+    asyncio.run(cache.put(key, "{}"))
+    db = SessionLocal()
+    try:
+        expired = datetime.utcnow() - timedelta(seconds=1)
+        db.query(GenerationCacheEntry).filter_by(key=key).update({"expires_at": expired})
+        db.commit()
+    finally:
+        db.close()
+    assert asyncio.run(GenerationCache().get(key)) is None
+
+    monkeypatch.setattr(settings, "GENERATION_CACHE_TTL_SECONDS", 0)
+    asyncio.run(cache.put(key, "{}"))
+    assert asyncio.run(cache.get(key)) is None
+    assert cache.stats()["misses"] == 1 and cache.stats()["entries"] == 0
+
+
+def test_bypass_skips_the_lookup(cache):
+    payload = _request(cache="bypass")
+    key = cache_key(payload)
+    asyncio.run(cache.put(key, "{}"))
+    assert asyncio.run(cache.lookup(payload)) == (key, None)
+    assert cache_status(payload, None) == "bypass"
+    assert asyncio.run(cache.lookup(_request())) == (key, "{}")
+    assert cache_status(_request(), "{}") == "hit" and cache_status(_request(), None) == "miss"
+    stats = cache.stats()
+    assert (stats["bypassed"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_disabled_cache_neither_reads_nor_writes(cache, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_CACHE_ENABLED", False)
+    key = cache_key(_request())
+    asyncio.run(cache.put(key, "{}"))
+    assert asyncio.run(cache.get(key)) is None
+    assert cache.stats()["writes"] == 0
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.audit_log import AuditLog
+from app.models.generation_job import GenerationJob
+from app.models.user import User
+from app.services import openai_client
+from app.services.retention import purge_generation_jobs
+
+CONTENT = json.dumps({"nodes": [{"id": "n1", "type": "start"}, {"id": "n2", "type": "task"}], "edges": []})
+
+
+class Upstream:
+    """Stands in for the OpenAI API; completions block until ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.calls = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        while not self.release.is_set():
+            await asyncio.sleep(0.01)
+        if "explode" in request.content.decode():
+            return httpx.Response(500, json={"error": {"message": "boom"}})
+        message = {"role": "assistant", "content": CONTENT}
+        choice = {"index": 0, "finish_reason": "stop", "message": message}
+        body = {"id": "c", "object": "chat.completion", "created": 0, "model": "m", "choices": [choice]}
+        return httpx.Response(200, json=body)
+
+
+@pytest.fixture
+def upstream(client, monkeypatch):
+    stub = Upstream()
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(stub.handler))
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(openai_client, "_client", AsyncOpenAI(api_key="x", max_retries=0, http_client=http_client))
+    yield stub
+    stub.release.set()
+
+
+def _submit(client, headers, description: str) -> dict:
+    response = client.post("/api/workflows/generate/jobs", json={"description": description}, headers=headers)
+    assert response.status_code == 202, response.text
+    return response.json()
+
+
+def _get(client, headers, job_id: str, wait: float = 0) -> dict:
+    response = client.get(f"/api/workflows/generate/jobs/{job_id}", params={"wait": wait}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_job_runs_to_success(client, auth, upstream):
+    job = _submit(client, auth, "jobs lifecycle success")
+    assert job["status"] == "queued" and job["workflow"] is None
+    _wait_for(lambda: _get(client, auth, job["id"])["status"] == "running")
+
+    # The long poll gives up after ``wait`` seconds and returns the job as it stands.
+    started = time.monotonic()
+    assert _get(client, auth, job["id"], wait=0.3)["status"] == "running"
+    assert time.monotonic() - started >= 0.3
+
+    upstream.release.set()
+    done = _get(client, auth, job["id"], wait=5)
+    assert done["status"] == "succeeded" and done["cache"] == "miss" and done["error"] is None
+    assert [node["type"] for node in done["workflow"]["nodes"]][:2] == ["start", "task"]
+    assert done["queue_ms"] is not None and done["duration_ms"] is not None
+    assert upstream.calls == 1
+    db = SessionLocal()
+    try:
+        actions = [row.action for row in db.query(AuditLog).filter(AuditLog.target_id == done["workflow"]["id"])]
+    finally:
+        db.close()
+    assert actions == ["workflow.generate"]
+
+
+def test_failed_upstream_fails_the_job(client, auth, upstream):
+    upstream.release.set()
+    job = _submit(client, auth, "explode this job")
+    done = _get(client, auth, job["id"], wait=5)
+    assert done["status"] == "failed" and done["workflow"] is None
+    assert (done["error_status"], done["error"]) == (502, "Generation service unavailable")
+
+
+def test_long_poll_returns_at_once_for_finished_jobs(client, auth, upstream):
+    upstream.release.set()
+    job = _submit(client, auth, "jobs finished long poll")
+    assert _get(client, auth, job["id"], wait=5)["status"] == "succeeded"
+    started = time.monotonic()
+    assert _get(client, auth, job["id"], wait=5)["status"] == "succeeded"
+    assert time.monotonic() - started < 1
+
+
+def test_jobs_are_only_visible_to_their_owner_and_admins(client, auth, other_auth, admin_auth, upstream):
+    job = _submit(client, auth, "jobs ownership")
+    url = f"/api/workflows/generate/jobs/{job['id']}"
+    assert client.get(url, headers=other_auth).status_code == 404
+    assert client.get(url, params={"wait": 1}, headers=other_auth).status_code == 404
+    assert client.get(url, headers=admin_auth).json()["id"] == job["id"]
+    assert client.get("/api/workflows/generate/jobs/missing", headers=auth).status_code == 404
+
+
+def test_purge_generation_jobs(client, monkeypatch):
+    # A future "now" keeps the background retention pass (which uses the real clock) away from these rows.
+    now = datetime.utcnow() + timedelta(days=365)
+    old = now - timedelta(days=settings.GENERATION_JOB_RETENTION_DAYS + 1)
+    recent = now - timedelta(days=1)
+    db = SessionLocal()
+    try:
+        actor_id = db.query(User.id).filter(User.email == "u1@example.com").scalar()
+        rows = {
+            "old_done": ("succeeded", old),
+            "old_failed": ("failed", old),
+            "recent": ("succeeded", recent),
+            "unfinished": ("running", None),
+        }
+        for job_id, (status, finished_at) in rows.items():
+            db.add(
+                GenerationJob(
+                    id=job_id,
+                    actor_id=actor_id,
+                    status=status,
+                    request_json="{}",
+                    created_at=old,
+                    finished_at=finished_at,
+                )
+            )
+        db.commit()
+        monkeypatch.setattr(settings, "RETENTION_BATCH_SIZE", 1)
+        assert purge_generation_jobs(now) == 2
+        assert sorted(row[0] for row in db.query(GenerationJob.id).filter(GenerationJob.id.in_(rows))) == [
+            "recent",
+            "unfinished",
+        ]
+        assert purge_generation_jobs(now) == 0
+    finally:
+        db.close()
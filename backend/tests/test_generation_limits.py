@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.services.generation_limits import GenerationBusy, Singleflight
+
+
+def test_followers_share_the_leaders_result():
+    async def scenario():
+        flights = Singleflight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "raw"
+
+        results = await asyncio.gather(*(flights.do("key", fn) for _ in range(5)))
+        return results, calls, flights.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert results == ["raw"] * 5
+    assert len(calls) == 1
+    assert stats == {"in_flight": 0, "leaders": 1, "coalesced": 4, "retried": 0}
+
+
+def test_followers_share_ordinary_errors():
+    async def scenario():
+        flights = Singleflight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("bad output")
+
+        calls = [flights.do("key", fn, (GenerationBusy,)) for _ in range(3)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_private_errors_are_not_shared():
+    async def scenario():
+        flights = Singleflight()
+
+        def call(user: str):
+            async def fn():
+                await asyncio.sleep(0.01)
+                if user == "limited":
+                    raise GenerationBusy("Too many generation requests queued")
+                return f"raw for {user}"
+
+            return flights.do("key", fn, (GenerationBusy,))
+
+        leader = asyncio.ensure_future(call("limited"))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(call(f"user{idx}")) for idx in range(3)]
+        with pytest.raises(GenerationBusy):
+            await leader
+        return await asyncio.gather(*followers), flights.stats()
+
+    results, stats = asyncio.run(scenario())
+    # The first follower to retry leads a new call; the others join it.
+    assert results == ["raw for user0"] * 3
+    assert stats["leaders"] == 2 and stats["retried"] == 3
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.schemas.workflow import GenerateRequest
+from app.services.engine import WorkflowEngine
+from app.services.generate import finalize_workflow
+from app.services.generation_schema import FRAGMENT_FORMAT, WORKFLOW_FORMAT, clean_node_data
+
+NODE_DATA = WORKFLOW_FORMAT["json_schema"]["schema"]["properties"]["nodes"]["items"]["properties"]["data"]
+
+
+def _objects(schema):
+    if isinstance(schema, dict):
+        if schema.get("type") == "object":
+            yield schema
+        for value in schema.values():
+            yield from _objects(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            yield from _objects(value)
+
+
+@pytest.mark.parametrize("response_format", [WORKFLOW_FORMAT, FRAGMENT_FORMAT])
+def test_schemas_follow_strict_mode_rules(response_format):
+    objects = list(_objects(response_format["json_schema"]["schema"]))
+    assert objects
+    for schema in objects:
+        assert schema["required"] == list(schema["properties"])
+        assert schema["additionalProperties"] is False
+
+
+def test_node_data_carries_node_settings():
+    expected = {"url", "method", "headers", "body", "cron", "intervalSeconds", "items", "mapping", "path", "message"}
+    assert expected <= set(NODE_DATA["properties"])
+
+
+def _strict_data(**settings) -> dict:
+    """Node data the way strict mode returns it: every field present, unused ones null."""
+    data = {key: None for key in NODE_DATA["properties"]}
+    return {**data, "label": "Step", "status": "Ready", **settings}
+
+
+def test_clean_node_data():
+    mapping = [{"key": "name", "value": "{{ input.name }}"}, {"key": "count", "value": 2}]
+    cleaned = clean_node_data(_strict_data(mapping=mapping))
+    assert cleaned == {
+        "label": "Step",
+        "status": "Ready",
+        "description": None,
+        "color": None,
+        "mapping": {"name": "{{ input.name }}", "count": 2},
+    }
+    # JSON object mode may send plain objects, which are kept.
+    assert clean_node_data({"label": "x", "headers": {"X-Key": "1"}}) == {"label": "x", "headers": {"X-Key": "1"}}
+    with pytest.raises(ValueError, match="body"):
+        clean_node_data({"label": "x", "body": ["not an entry"]})
+
+
+def test_strict_output_runs_after_finalize():
+    reply = {
+        "id": "wf",
+        "name": "Generated",
+        "updatedAt": "2026-01-01",
+        "nodes": [
+            {"id": "n1", "type": "start", "position": {"x": 0, "y": 0}, "data": _strict_data()},
+            {
+                "id": "n2",
+                "type": "transform_mapper",
+                "position": {"x": 260, "y": 0},
+                "data": _strict_data(mapping=[{"key": "greeting", "value": "Hi {{ input.name }}"}]),
+            },
+            {
+                "id": "n3",
+                "type": "loop_foreach",
+                "position": {"x": 520, "y": 0},
+                "data": _strict_data(items="{{ input.names }}"),
+            },
+            {"id": "n4", "type": "end", "position": {"x": 780, "y": 0}, "data": _strict_data()},
+        ],
+        "edges": [
+            {"id": "e1", "source": "n1", "target": "n2", "sourceHandle": None},
+            {"id": "e2", "source": "n2", "target": "n3", "sourceHandle": None},
+            {"id": "e3", "source": "n3", "target": "n4", "sourceHandle": None},
+        ],
+    }
+    workflow = finalize_workflow(reply, GenerateRequest(description="greet everyone"))
+    data = workflow.model_dump()
+    assert "url" not in data["nodes"][0]["data"]
+    engine = WorkflowEngine(data)
+    asyncio.run(engine.run({"name": "Ada", "names": ["a", "b"]}))
+    assert engine.outputs["n2"] == {"greeting": "Hi Ada"}
+    assert engine.outputs["n3"]["count"] == 2
@@ -0,0 +1,88 @@
+from app.services.graph import GraphIndex, analyze_graph, reachable_from, strongly_connected_components
+
+
+def _graph(spec: str, edges: list[tuple[str, str]]) -> tuple[list[dict], list[dict]]:
+    """``spec`` is "id:type id:type ..."."""
+    nodes = [{"id": node_id, "type": node_type} for node_id, node_type in (item.split(":") for item in spec.split())]
+    return nodes, [{"id": f"e{idx}", "source": source, "target": target} for idx, (source, target) in enumerate(edges)]
+
+
+def _codes(issues) -> list[str]:
+    return sorted(issue.code for issue in issues)
+
+
+def test_linear_graph_is_valid_and_ordered():
+    report = analyze_graph(*_graph("s:start a:task e:end", [("s", "a"), ("a", "e")]))
+    assert report.valid
+    assert report.topological_order == ["s", "a", "e"]
+    assert report.start_nodes == ["s"]
+
+
+def test_strongly_connected_components():
+    nodes, edges = _graph("a:task b:task c:task d:task", [("a", "b"), ("b", "c"), ("c", "a"), ("c", "d")])
+    graph = GraphIndex(nodes, edges)
+    components = strongly_connected_components(graph)
+    assert sorted(sorted(graph.ids[idx] for idx in component) for component in components) == [["a", "b", "c"], ["d"]]
+
+
+def test_scc_handles_long_chains_without_recursion():
+    count = 20000
+    nodes, edges = _graph(
+        " ".join(f"n{idx}:task" for idx in range(count)), [(f"n{idx}", f"n{idx + 1}") for idx in range(count - 1)]
+    )
+    assert len(strongly_connected_components(GraphIndex(nodes, edges))) == count
+
+
+def test_cycle_needs_a_loop_node():
+    edges = [("s", "a"), ("a", "b"), ("b", "a"), ("b", "e")]
+    report = analyze_graph(*_graph("s:start a:task b:task e:end", edges))
+    assert _codes(report.errors) == ["cycle"]
+    assert report.cycles[0].allowed is False
+
+    report = analyze_graph(*_graph("s:start a:loop_foreach b:task e:end", edges))
+    assert report.valid
+    assert sorted(report.cycles[0].nodes) == ["a", "b"]
+
+
+def test_self_loop_is_a_cycle():
+    report = analyze_graph(*_graph("s:start a:task e:end", [("s", "a"), ("a", "a"), ("a", "e")]))
+    assert [cycle.nodes for cycle in report.cycles] == [["a"]]
+
+
+def test_reachability_and_missing_start_and_end():
+    nodes, edges = _graph("s:start a:task orphan:task", [("s", "a")])
+    graph = GraphIndex(nodes, edges)
+    assert reachable_from(graph, [0]) == [True, True, False]
+    report = analyze_graph(nodes, edges)
+    assert report.unreachable == ["orphan"]
+    assert _codes(report.warnings) == ["no_end", "unreachable"]
+    assert _codes(analyze_graph(*_graph("a:task", [])).errors) == ["no_start"]
+
+
+def test_duplicate_nodes_and_dangling_edges():
+    nodes, edges = _graph("s:start s:task e:end", [("s", "e"), ("s", "missing")])
+    assert _codes(analyze_graph(nodes, edges).errors) == ["dangling_edge", "duplicate_node"]
+
+
+def test_nested_fork_join_pairs():
+    spec = "s:start f1:parallel_fork a:task f2:parallel_fork b:task c:task j2:join_merge d:task j1:join_merge e:end"
+    edges = [
+        ("s", "f1"), ("f1", "a"), ("f1", "f2"), ("f2", "b"), ("f2", "c"), ("b", "j2"), ("c", "j2"),
+        ("a", "d"), ("j2", "j1"), ("d", "j1"), ("j1", "e"),
+    ]
+    report = analyze_graph(*_graph(spec, edges))
+    assert report.valid, report.errors
+    assert {pair.fork: pair.joins for pair in report.fork_joins} == {"f1": ["j1"], "f2": ["j2"]}
+
+
+def test_fork_join_mismatches():
+    spec = "s:start f:parallel_fork a:task b:task m:task e:end"
+    report = analyze_graph(*_graph(spec, [("s", "f"), ("f", "a"), ("f", "b"), ("a", "m"), ("b", "m"), ("m", "e")]))
+    assert _codes(report.errors) == ["unmatched_fork"]
+
+    report = analyze_graph(*_graph("s:start j:join_merge e:end", [("s", "j"), ("j", "e")]))
+    assert _codes(report.errors) == ["unmatched_join"]
+
+    spec = "s:start f:parallel_fork a:task b:task j1:join_merge j2:join_merge e:end"
+    edges = [("s", "f"), ("f", "a"), ("f", "b"), ("a", "j1"), ("b", "j2"), ("j1", "e"), ("j2", "e")]
+    assert "ambiguous_join" in _codes(analyze_graph(*_graph(spec, edges)).errors)
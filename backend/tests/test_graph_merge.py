@@ -0,0 +1,87 @@
+import copy
+
+from app.services.graph_merge import graph_digest, merge_fragment
+from app.services.layout import LAYER_SPACING
+
+
+def _node(node_id: str, node_type: str = "task", x: float = 0.0) -> dict:
+    return {"id": node_id, "type": node_type, "position": {"x": x, "y": 0.0}, "data": {"label": node_id}}
+
+
+def _edge(source: str, target: str) -> dict:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def _existing() -> dict:
+    nodes = [_node("start", "start"), _node("work", x=260), _node("fail", "end_fail", 520), _node("end", "end", 520)]
+    edges = [_edge("start", "work"), _edge("work", "end"), _edge("work", "fail")]
+    return {"id": "wf", "name": "wf", "nodes": nodes, "edges": edges}
+
+
+def _fragment() -> dict:
+    nodes = [{"id": "a", "type": "http_request", "data": {}}, {"id": "b", "type": "notify_alert", "data": {}}]
+    return {"nodes": nodes, "edges": [_edge("a", "b")]}
+
+
+def _pairs(data: dict) -> set[tuple[str, str]]:
+    return {(edge["source"], edge["target"]) for edge in data["edges"]}
+
+
+def test_graph_digest_lists_open_ends():
+    assert graph_digest(_existing()) == {"openEnds": [{"id": "end", "type": "end"}]}
+    dangling = {"nodes": [_node("start", "start"), _node("work"), _node("orphan")], "edges": [_edge("start", "work")]}
+    assert graph_digest(dangling) == {"openEnds": [{"id": "work", "type": "task"}]}
+
+
+def test_open_end_node_is_replaced_by_the_fragment():
+    merged = merge_fragment(_existing(), _fragment())
+    ids = [node["id"] for node in merged["nodes"]]
+    assert "end" not in ids and ids[:3] == ["start", "work", "fail"]
+    added = {node["id"]: node for node in merged["nodes"][3:]}
+    assert {node["type"] for node in added.values()} == {"http_request", "notify_alert", "end"}
+    (end_id,) = [node_id for node_id, node in added.items() if node["type"] == "end"]
+    assert _pairs(merged) == {("start", "work"), ("work", "fail"), ("work", "a"), ("a", "b"), ("b", end_id)}
+    assert len({edge["id"] for edge in merged["edges"]}) == len(merged["edges"])
+    assert all(node["data"]["status"] == "Ready" and node["data"]["label"] for node in added.values())
+    assert min(node["position"]["x"] for node in added.values()) == 520 + LAYER_SPACING
+
+
+def test_other_open_ends_get_an_edge_to_the_entry():
+    existing = {"nodes": [_node("start", "start"), _node("work", x=260)], "edges": [_edge("start", "work")]}
+    merged = merge_fragment(existing, _fragment())
+    assert [node["id"] for node in merged["nodes"][:2]] == ["start", "work"]
+    assert ("work", "a") in _pairs(merged)
+
+
+def test_colliding_ids_are_renamed():
+    fragment = {"nodes": [{"id": "work", "type": "task", "data": {}}, {"id": "end", "type": "end", "data": {}}]}
+    fragment["edges"] = [{"id": "start-work", "source": "work", "target": "end"}]
+    merged = merge_fragment(_existing(), fragment)
+    ids = [node["id"] for node in merged["nodes"]]
+    assert len(ids) == len(set(ids)) == 5
+    new_task, new_end = merged["nodes"][3]["id"], merged["nodes"][4]["id"]
+    assert "work" not in (new_task, new_end)
+    assert {("work", new_task), (new_task, new_end)} <= _pairs(merged)
+    assert len({edge["id"] for edge in merged["edges"]}) == len(merged["edges"])
+
+
+def test_fragment_start_nodes_are_dropped():
+    fragment = _fragment()
+    fragment["nodes"].insert(0, {"id": "trigger", "type": "webhook_trigger", "data": {}})
+    fragment["edges"].append(_edge("trigger", "b"))
+    merged = merge_fragment(_existing(), fragment)
+    assert "trigger" not in {node["id"] for node in merged["nodes"]}
+    assert ("work", "b") in _pairs(merged)
+
+
+def test_empty_fragment_leaves_the_graph_alone():
+    existing = _existing()
+    assert merge_fragment(existing, {"nodes": [], "edges": []}) == existing
+    assert merge_fragment(existing, {"nodes": ["junk"], "edges": [None]}) == existing
+
+
+def test_inputs_are_not_mutated():
+    existing, fragment = _existing(), _fragment()
+    before = copy.deepcopy((existing, fragment))
+    merge_fragment(existing, fragment)
+    assert (existing, fragment) == before
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from app.db.session import SessionLocal
+from app.models.workflow_version import WorkflowVersion
+from app.services.graph_patch import GraphPatchValidationError, apply_graph_patch
+from app.services.json_patch import JsonPatchError
+from app.services.versions import DELTA
+
+
+def _graph(count: int = 20) -> dict:
+    nodes = [
+        {
+            "id": f"node_{idx}",
+            "type": "start" if idx == 1 else "end" if idx == count else "task",
+            "position": {"x": idx * 260, "y": 0},
+            "data": {"label": f"Step {idx}", "status": "Ready"},
+        }
+        for idx in range(1, count + 1)
+    ]
+    edges = [{"id": f"edge_{idx}", "source": f"node_{idx}", "target": f"node_{idx + 1}"} for idx in range(1, count)]
+    return {"id": "x", "name": "wf", "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": edges}
+
+
+@pytest.fixture
+def workflow_id(client, auth):
+    return client.post("/api/workflows", json={"name": "wf", "data": _graph()}, headers=auth).json()["id"]
+
+
+def _patch(client, auth, workflow_id, ops, base_version=None):
+    payload = {"ops": ops, **({"base_version": base_version} if base_version is not None else {})}
+    return client.patch(f"/api/workflows/{workflow_id}/graph", json=payload, headers=auth)
+
+
+def test_patch_applies_and_bumps_version(client, auth, workflow_id):
+    op = {"op": "replace", "path": "/nodes/1/data/label", "value": "Edited"}
+    response = _patch(client, auth, workflow_id, [op], 1)
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.json()["data"]["nodes"][1]["data"]["label"] == "Edited"
+
+
+def test_stale_base_version_conflicts(client, auth, workflow_id):
+    op = {"op": "replace", "path": "/nodes/1/data/label", "value": "Edited"}
+    assert _patch(client, auth, workflow_id, [op], 1).status_code == 200
+    response = _patch(client, auth, workflow_id, [op], 1)
+    assert response.status_code == 409
+    assert "base_version" in response.json()["detail"]
+
+
+def test_failed_test_op_conflicts(client, auth, workflow_id):
+    ops = [
+        {"op": "test", "path": "/nodes/1/data/label", "value": "Someone else's label"},
+        {"op": "replace", "path": "/nodes/1/data/label", "value": "Edited"},
+    ]
+    assert _patch(client, auth, workflow_id, ops).status_code == 409
+    assert client.get(f"/api/workflows/{workflow_id}", headers=auth).json()["version"] == 1
+
+
+@pytest.mark.parametrize(
+    "op",
+    [
+        {"op": "replace", "path": "/name", "value": "renamed"},
+        {"op": "replace", "path": "/nodes/99/data/label", "value": "x"},
+        {"op": "remove", "path": "/edges/x"},
+        {"op": "move", "from": "/id", "path": "/nodes/0"},
+    ],
+)
+def test_bad_paths_are_rejected(client, auth, workflow_id, op):
+    assert _patch(client, auth, workflow_id, [op]).status_code == 400
+
+
+def test_validation_names_only_touched_items(client, auth, workflow_id):
+    ops = [
+        {"op": "replace", "path": "/nodes/3/type", "value": "not_a_type"},
+        {"op": "remove", "path": "/edges/5/target"},
+    ]
+    response = _patch(client, auth, workflow_id, ops)
+    assert response.status_code == 422
+    locations = {tuple(error["loc"][:2]) for error in response.json()["detail"]}
+    assert locations == {("nodes", 3), ("edges", 5)}
+
+
+def test_untouched_invalid_items_are_not_reported():
+    document = _graph(4)
+    document["nodes"][0]["type"] = "legacy_type"
+    ops = [{"op": "replace", "path": "/nodes/2/data/label", "value": "Edited"}]
+    patched, _ = apply_graph_patch(document, ops)
+    assert patched["nodes"][0]["type"] == "legacy_type"
+    with pytest.raises(GraphPatchValidationError) as exc:
+        apply_graph_patch(document, [{"op": "replace", "path": "/nodes/0/data/label", "value": "x"}])
+    assert [error["loc"][:2] for error in exc.value.errors] == [["nodes", 0]]
+    with pytest.raises(JsonPatchError):
+        apply_graph_patch(document, [{"op": "replace", "path": "/nodes", "value": {}}])
+
+
+def test_recorded_ops_are_stored_as_the_delta(client, auth, workflow_id):
+    ops = [
+        {"op": "test", "path": "/nodes/1/data/label", "value": "Step 2"},
+        {"op": "replace", "path": "/nodes/1/data/label", "value": "Edited"},
+        {"op": "add", "path": "/nodes/-", "value": {"id": "extra", "type": "task", "position": {"x": 0, "y": 0}}},
+    ]
+    ops[2]["value"]["data"] = {"label": "Extra"}
+    response = _patch(client, auth, workflow_id, ops, 1)
+    assert response.status_code == 200
+    db = SessionLocal()
+    try:
+        row = db.query(WorkflowVersion).filter_by(workflow_id=workflow_id, version=2).one()
+    finally:
+        db.close()
+    assert row.kind == DELTA and row.base_version == 1
+    delta = json.loads(row.data_json)
+    graph_ops = [op for op in delta if op["path"].startswith(("/nodes", "/edges"))]
+    # The test op is dropped; the added node is recorded once more in its validated (defaults filled in) form.
+    assert graph_ops[:2] == ops[1:]
+    assert graph_ops[2]["op"] == "replace" and graph_ops[2]["path"] == "/nodes/20"
+    assert graph_ops[2]["value"]["data"]["label"] == "Extra" and "description" in graph_ops[2]["value"]["data"]
+    version = client.get(f"/api/workflows/{workflow_id}/versions/2", headers=auth).json()
+    assert version["data"]["nodes"] == response.json()["data"]["nodes"]
@@ -0,0 +1,92 @@
+import json
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.types import ZLIB_MARKER, ZSTD_MARKER, decode_json_text, encode_json_text
+from app.models.user import User
+from app.models.workflow import Workflow
+from app.models.workflow_version import WorkflowVersion
+
+NODES = [{"id": f"node_{idx}", "data": {"label": "x" * 40}} for idx in range(20)]
+DOCUMENT = json.dumps({"name": "wf ✓", "nodes": NODES})
+
+
+@pytest.mark.parametrize("codec, marker", [("zlib", ZLIB_MARKER), ("zstd", ZSTD_MARKER)])
+def test_codecs_round_trip(codec, marker):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    encoded = encode_json_text(DOCUMENT, codec=codec, min_bytes=0)
+    assert isinstance(encoded, bytes) and encoded.startswith(marker)
+    assert len(encoded) < len(DOCUMENT.encode("utf-8"))
+    assert decode_json_text(encoded) == DOCUMENT
+    assert decode_json_text(memoryview(encoded)) == DOCUMENT
+
+
+def test_short_values_and_codec_none_stay_text():
+    assert encode_json_text("{}", codec="zlib", min_bytes=256) == "{}"
+    assert encode_json_text(DOCUMENT, codec="none", min_bytes=0) == DOCUMENT
+    with pytest.raises(ValueError):
+        encode_json_text(DOCUMENT, codec="lz4", min_bytes=0)
+
+
+def test_legacy_rows_read_unchanged():
+    assert decode_json_text(DOCUMENT) == DOCUMENT
+    assert decode_json_text(None) is None
+    assert decode_json_text(DOCUMENT.encode("utf-8")) == DOCUMENT
+
+
+def test_column_compresses_and_reads_legacy_rows(db, user, monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_JSON_CODEC", "zlib")
+    monkeypatch.setattr(settings, "WORKFLOW_JSON_COMPRESS_MIN_BYTES", 0)
+    workflow = Workflow(owner_id=user.id, name="wf", version=1, data_json=DOCUMENT)
+    db.add(workflow)
+    db.commit()
+    stored = db.execute(text("SELECT data_json FROM workflows")).scalar_one()
+    assert bytes(stored).startswith(ZLIB_MARKER)
+    db.execute(text("UPDATE workflows SET data_json = :plain"), {"plain": DOCUMENT.replace("wf", "legacy")})
+    db.commit()
+    db.expire_all()
+    assert db.get(Workflow, workflow.id).data_json == DOCUMENT.replace("wf", "legacy")
+
+
+def test_downgrade_0012_decompresses_rows(tmp_path, monkeypatch):
+    from alembic import command
+    from alembic.config import Config
+
+    path = tmp_path / "codec.db"
+    url = f"sqlite:///{path}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    monkeypatch.setattr(settings, "WORKFLOW_JSON_CODEC", "zlib")
+    monkeypatch.setattr(settings, "WORKFLOW_JSON_COMPRESS_MIN_BYTES", 0)
+    config = Config()
+    config.set_main_option("script_location", os.path.join(os.path.dirname(__file__), "..", "alembic"))
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    session = sessionmaker(bind=engine)()
+    owner = User(email="codec@example.com", password_hash="x", role="user")
+    session.add(owner)
+    session.flush()
+    workflow = Workflow(owner_id=owner.id, name="wf", version=1, data_json=DOCUMENT)
+    session.add(workflow)
+    session.flush()
+    session.add(WorkflowVersion(workflow_id=workflow.id, version=1, kind="snapshot", data_json=DOCUMENT, size=1))
+    session.commit()
+    session.close()
+    engine.dispose()
+
+    def stored() -> list[tuple[str, str]]:
+        with sqlite3.connect(path) as conn:
+            return conn.execute(
+                "SELECT typeof(data_json), data_json FROM workflows UNION ALL "
+                "SELECT typeof(data_json), data_json FROM workflow_versions"
+            ).fetchall()
+
+    assert [kind for kind, _ in stored()] == ["blob", "blob"]
+    command.downgrade(config, "0011_generation_jobs")
+    assert stored() == [("text", DOCUMENT), ("text", DOCUMENT)]
@@ -0,0 +1,74 @@
+import copy
+
+import pytest
+
+from app.services.json_patch import JsonPatchError, JsonPatchTestFailed, apply_patch, json_equal, make_patch
+
+DOCUMENTS = [
+    ({}, {"a": 1}),
+    ({"a": 1, "b": [1, 2, 3]}, {"a": 2, "b": [1, 3]}),
+    ({"nodes": [{"id": "n1"}, {"id": "n2"}]}, {"nodes": [{"id": "n0"}, {"id": "n1"}, {"id": "n2"}, {"id": "n3"}]}),
+    ({"a/b": {"c~d": 1}}, {"a/b": {"c~d": 2, "e": None}}),
+    ({"flag": 1}, {"flag": True}),
+    ([1, 2, 3], "scalar"),
+    ({"list": [1, 2, 3, 4, 5]}, {"list": [1, 9, 5]}),
+]
+
+
+@pytest.mark.parametrize("src,dst", DOCUMENTS)
+def test_make_patch_round_trips(src, dst):
+    before = copy.deepcopy(src)
+    result = apply_patch(src, make_patch(src, dst))
+    assert json_equal(result, dst)
+    assert src == before
+
+
+def test_make_patch_of_equal_documents_is_empty():
+    assert make_patch({"a": [1, {"b": 2}]}, {"a": [1, {"b": 2}]}) == []
+
+
+def test_json_equal_distinguishes_bool_and_int():
+    assert not json_equal(True, 1)
+    assert not json_equal(1, 1.0)
+    assert json_equal({"a": [1, True]}, {"a": [1, True]})
+
+
+def test_apply_patch_shares_untouched_subtrees():
+    doc = {"a": {"x": 1}, "b": {"y": 2}}
+    result = apply_patch(doc, [{"op": "replace", "path": "/a/x", "value": 3}])
+    assert result == {"a": {"x": 3}, "b": {"y": 2}}
+    assert result["b"] is doc["b"]
+    assert doc["a"]["x"] == 1
+
+
+def test_apply_patch_move_copy_and_test():
+    doc = {"a": [1, 2], "b": {}}
+    ops = [
+        {"op": "copy", "from": "/a", "path": "/b/copied"},
+        {"op": "move", "from": "/a/0", "path": "/a/-"},
+        {"op": "test", "path": "/a", "value": [2, 1]},
+    ]
+    assert apply_patch(doc, ops) == {"a": [2, 1], "b": {"copied": [1, 2]}}
+
+
+@pytest.mark.parametrize(
+    "ops",
+    [
+        [{"op": "remove", "path": "/missing"}],
+        [{"op": "add", "path": "/a/5", "value": 1}],
+        [{"op": "add", "path": "/a/01", "value": 1}],
+        [{"op": "remove", "path": ""}],
+        [{"op": "move", "from": "/b", "path": "/b/c"}],
+        [{"op": "replace", "path": "/a/0"}],
+        [{"op": "bogus", "path": "/a"}],
+        [{"op": "add", "path": "a", "value": 1}],
+    ],
+)
+def test_apply_patch_rejects_invalid_ops(ops):
+    with pytest.raises(JsonPatchError):
+        apply_patch({"a": [1], "b": {}}, ops)
+
+
+def test_failed_test_op_raises_test_failed():
+    with pytest.raises(JsonPatchTestFailed):
+        apply_patch({"a": 1}, [{"op": "test", "path": "/a", "value": True}])
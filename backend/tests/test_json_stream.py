@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from app.services.json_stream import ArrayItemParser
+
+DOCUMENT = {
+    "id": "wf",
+    "name": 'Quotes " and \\ braces } ] in strings',
+    "nodes": [
+        {"id": "a", "type": "start", "data": {"label": "Start {x}", "tags": ["[", "]"]}},
+        {"id": "b", "type": "task", "data": {"label": "Say \"hi\"", "nested": {"deep": [{"k": 1}]}}},
+    ],
+    "meta": {"nodes": [{"id": "not top-level"}]},
+    "edges": [{"id": "e1", "source": "a", "target": "b"}],
+    "other": [{"id": "ignored"}],
+}
+
+
+def _feed_all(parser: ArrayItemParser, chunks: list[str]) -> list[tuple[str, object]]:
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_items_are_emitted_for_any_chunking(size):
+    text = json.dumps(DOCUMENT)
+    parser = ArrayItemParser()
+    items = _feed_all(parser, [text[idx : idx + size] for idx in range(0, len(text), size)])
+    expected = [("nodes", node) for node in DOCUMENT["nodes"]] + [("edges", edge) for edge in DOCUMENT["edges"]]
+    assert items == expected
+    assert parser.result() == DOCUMENT
+
+
+def test_item_is_emitted_when_its_brace_arrives():
+    parser = ArrayItemParser()
+    assert parser.feed('{"nodes": [{"id": "a"') == []
+    assert parser.feed("}") == [("nodes", {"id": "a"})]
+    assert parser.feed(', {"id": "b"}') == [("nodes", {"id": "b"})]
+
+
+def test_escape_split_across_chunks():
+    parser = ArrayItemParser()
+    items = _feed_all(parser, ['{"nodes": [{"label": "a\\', '"}"}]}'])
+    assert items == [("nodes", {"label": 'a"}'})]
+
+
+def test_malformed_item_stops_emitting():
+    parser = ArrayItemParser()
+    items = parser.feed('{"nodes": [{"id": "a"}, {"id": b}, {"id": "c"}]')
+    assert items == [("nodes", {"id": "a"})]
+    assert parser.failed
+    assert parser.feed(', "edges": [{"id": "e1"}]}') == []
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_malformed_key_is_ignored():
+    parser = ArrayItemParser()
+    items = parser.feed('{"bad\\q": 1, "nodes": [{"id": "a"}]}')
+    assert items == [("nodes", {"id": "a"})]
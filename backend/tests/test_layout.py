@@ -0,0 +1,94 @@
+import random
+import time
+
+from app.services import layout
+from app.services.graph import GraphIndex
+from app.services.layout import LAYER_SPACING, NODE_SPACING, apply_layout, layered_layout
+
+
+def _graph(edges: list[tuple[str, str]], extra: tuple[str, ...] = ()) -> tuple[list[dict], list[dict]]:
+    ids = list(dict.fromkeys([node for edge in edges for node in edge] + list(extra)))
+    nodes = [{"id": node_id, "type": "task"} for node_id in ids]
+    return nodes, [{"id": f"e{idx}", "source": source, "target": target} for idx, (source, target) in enumerate(edges)]
+
+
+def _workflow_graph(count: int, seed: int = 14) -> tuple[list[dict], list[dict]]:
+    """Branching graph shaped like a large generated workflow: a tree of nearby parents, short skips, a few loops."""
+    rng = random.Random(seed)
+    edges = [(f"n{rng.randrange(max(0, idx - 20), idx)}", f"n{idx}") for idx in range(1, count)]
+    for _ in range(count // 5):
+        source = rng.randrange(count - 10)
+        edges.append((f"n{source}", f"n{source + rng.randrange(2, 10)}"))
+    for _ in range(count // 50):
+        target = rng.randrange(count - 100)
+        edges.append((f"n{target + rng.randrange(1, 100)}", f"n{target}"))
+    return _graph(edges, extra=tuple(f"n{idx}" for idx in range(count)))
+
+
+def _layers(positions: dict[str, tuple[float, float]]) -> dict[str, int]:
+    return {node_id: int(x // LAYER_SPACING) for node_id, (x, _) in positions.items()}
+
+
+def test_dag_layers_follow_longest_path():
+    nodes, edges = _graph([("a", "b"), ("a", "c"), ("b", "d"), ("c", "d"), ("a", "d"), ("d", "e"), ("a", "e")])
+    positions = layered_layout(nodes, edges)
+    assert _layers(positions) == {"a": 0, "b": 1, "c": 1, "d": 2, "e": 3}
+    assert abs(positions["b"][1] - positions["c"][1]) >= NODE_SPACING
+    assert min(y for _, y in positions.values()) == 0.0
+
+
+def test_isolated_nodes_and_empty_graph():
+    nodes, edges = _graph([("a", "b")], extra=("lonely",))
+    assert _layers(layered_layout(nodes, edges)) == {"a": 0, "b": 1, "lonely": 0}
+    assert layered_layout([], []) == {}
+
+
+def test_cycles_are_broken():
+    nodes, edges = _graph([("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "d"), ("b", "a")])
+    layers = _layers(layered_layout(nodes, edges))
+    assert sorted(layers[node] for node in "abc") == [0, 1, 2]
+    assert layers["d"] == layers["c"] + 1
+    order, successors, layer = layout._assign_layers(GraphIndex(nodes, edges))
+    # Every kept edge points forward, and each pair of nodes is linked at most once.
+    assert all(layer[target] > layer[source] for source in order for target in successors[source])
+    assert sum(len(targets) for targets in successors) == 4
+
+
+def test_dummy_budget_is_respected(monkeypatch):
+    # A chain plus an edge from the head to every node: sum of spans grows quadratically.
+    count = 60
+    chain = [(f"n{idx}", f"n{idx + 1}") for idx in range(count - 1)]
+    nodes, edges = _graph(chain + [("n0", f"n{idx}") for idx in range(2, count)])
+    graph = GraphIndex(nodes, edges)
+    order, successors, layer = layout._assign_layers(graph)
+    wanted = sum(layer[target] - layer[source] - 1 for source in order for target in successors[source])
+    assert wanted > layout.DUMMY_BUDGET * count
+
+    layers, up, down = layout._insert_dummies(order, successors, list(layer))
+    dummies = range(count, len(up))
+    assert 0 < len(dummies) <= layout.DUMMY_BUDGET * count
+    assert all(len(up[dummy]) == len(down[dummy]) == 1 for dummy in dummies)
+    assert sum(len(members) for members in layers) == len(up)
+
+    monkeypatch.setattr(layout, "DUMMY_BUDGET", 0)
+    layers, up, _ = layout._insert_dummies(order, successors, list(layer))
+    assert len(up) == count
+    assert len(layered_layout(nodes, edges)) == count
+
+
+def test_apply_layout_overwrites_positions():
+    nodes, edges = _graph([("a", "b")])
+    nodes[0]["position"] = {"x": 999, "y": 999}
+    data = apply_layout({"nodes": nodes, "edges": edges})
+    assert [node["position"] for node in data["nodes"]] == [{"x": 0.0, "y": 0.0}, {"x": float(LAYER_SPACING), "y": 0.0}]
+
+
+def test_5k_nodes_within_budget():
+    nodes, edges = _workflow_graph(5000)
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        positions = layered_layout(nodes, edges)
+        timings.append(time.perf_counter() - started)
+    assert len(positions) == 5000
+    assert min(timings) < 0.1, timings
@@ -0,0 +1,103 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.workflow import Workflow
+from app.models.workflow_version import WorkflowVersion
+from app.services import retention
+from app.services.versions import DELTA, SNAPSHOT, materialize_version, record_version
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+# version -> created_at: 10 and 9 are the newest two, 8/7 share an hour, 6 has its own, 5..3 and 2..1 share days
+# past the daily cutoff. The newest of each bucket is kept.
+CREATED = {
+    10: NOW - timedelta(minutes=5),
+    9: NOW - timedelta(days=3),
+    8: NOW - timedelta(days=2, hours=1, minutes=20),
+    7: NOW - timedelta(days=2, hours=1, minutes=40),
+    6: NOW - timedelta(days=2, hours=2, minutes=10),
+    5: datetime(2026, 4, 20, 18, 0),
+    4: datetime(2026, 4, 20, 12, 0),
+    3: datetime(2026, 4, 20, 6, 0),
+    2: datetime(2026, 4, 19, 22, 0),
+    1: datetime(2026, 4, 19, 8, 0),
+}
+KEPT = {10, 9, 8, 6, 5, 2}
+
+
+@pytest.fixture(autouse=True)
+def policy(monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_KEEP_LAST", 2)
+    monkeypatch.setattr(settings, "RETENTION_HOURLY_AFTER_HOURS", 24)
+    monkeypatch.setattr(settings, "RETENTION_DAILY_AFTER_DAYS", 30)
+    monkeypatch.setattr(settings, "WORKFLOW_VERSION_SNAPSHOT_INTERVAL", 4)
+
+
+def _document(version: int) -> dict:
+    nodes = [
+        {"id": f"node_{idx}", "type": "task", "position": {"x": idx * 260, "y": 0}, "data": {"label": f"Step {idx}"}}
+        for idx in range(1, 20)
+    ]
+    nodes[version % len(nodes)]["data"]["label"] = f"Edited in v{version}"
+    header = {"id": "wf", "name": f"Workflow v{version}", "updatedAt": f"2026-01-{version:02d}"}
+    return {**header, "nodes": nodes, "edges": []}
+
+
+@pytest.fixture
+def history(db, user, session_factory, monkeypatch):
+    monkeypatch.setattr(retention, "SessionLocal", session_factory)
+    workflow = Workflow(owner_id=user.id, name="wf", version=1, data_json=json.dumps(_document(1)))
+    db.add(workflow)
+    db.flush()
+    record_version(db, workflow, _document(1))
+    for version in range(2, 11):
+        workflow.version = version
+        workflow.data_json = json.dumps(_document(version))
+        record_version(db, workflow, _document(version), previous=_document(version - 1))
+    db.flush()
+    for row in db.query(WorkflowVersion).filter_by(workflow_id=workflow.id):
+        row.created_at = CREATED[row.version]
+    db.commit()
+    return workflow
+
+
+def test_versions_to_keep_buckets():
+    versions = sorted(CREATED.items(), reverse=True)
+    assert retention.versions_to_keep(versions, NOW) == KEPT
+
+
+def test_versions_to_keep_keeps_recent_and_last(monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_KEEP_LAST", 0)
+    old = NOW - timedelta(days=2, minutes=30)
+    versions = [(3, NOW - timedelta(hours=1)), (2, old), (1, old - timedelta(minutes=1))]
+    assert retention.versions_to_keep(versions, NOW) == {3, 2}
+    assert retention.versions_to_keep([(1, old)], NOW) == {1}
+
+
+def test_thin_workflow_rebases_kept_versions(db, history):
+    assert retention.thin_workflow(history.id, NOW) == (2, 4)
+    db.expire_all()
+    rows = {row.version: row for row in db.query(WorkflowVersion).filter_by(workflow_id=history.id)}
+    assert set(rows) == KEPT
+    # 2's base (1) is gone and nothing older is kept, so it becomes a snapshot; 8 is re-based onto 6.
+    assert (rows[2].kind, rows[2].base_version) == (SNAPSHOT, None)
+    assert (rows[8].kind, rows[8].base_version) == (DELTA, 6)
+    for version in range(1, 11):
+        expected = _document(version) if version in KEPT else None
+        assert materialize_version(db, history.id, version) == expected
+
+
+def test_thinning_is_idempotent(db, history):
+    retention.thin_workflow(history.id, NOW)
+    assert retention.plan_thinning(history.id, NOW) == ([], [])
+
+
+def test_plan_thinning_reports_broken_history(db, history):
+    db.query(WorkflowVersion).filter_by(workflow_id=history.id, version=2).delete()
+    db.commit()
+    with pytest.raises(ValueError, match="broken"):
+        retention.plan_thinning(history.id, NOW)
+
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from app.models.workflow import Workflow
+from app.models.workflow_run import WorkflowRun
+from app.services import runs
+from app.services.versions import record_version
+
+
+def _document(label: str) -> dict:
+    nodes = [{"id": "s", "type": "start", "data": {"label": label}}, {"id": "e", "type": "end", "data": {}}]
+    edges = [{"id": "e1", "source": "s", "target": "e"}]
+    return {"id": "wf", "name": "wf", "updatedAt": "x", "nodes": nodes, "edges": edges}
+
+
+@pytest.fixture
+def queued_run(db, user, session_factory, monkeypatch):
+    """A run queued at version 1 of a workflow that has since been edited to version 2."""
+    monkeypatch.setattr(runs, "SessionLocal", session_factory)
+    workflow = Workflow(owner_id=user.id, name="wf", version=1, data_json=json.dumps(_document("v1")))
+    db.add(workflow)
+    db.flush()
+    record_version(db, workflow, _document("v1"))
+    run = runs.add_run(db, workflow, payload={"x": 1})
+    workflow.version = 2
+    workflow.data_json = json.dumps(_document("v2"))
+    record_version(db, workflow, _document("v2"), previous=_document("v1"))
+    db.commit()
+    return run.id
+
+
+def test_claim_runs_the_queued_version(db, queued_run):
+    data, payload, start_node_id = runs._claim(queued_run)
+    assert data["nodes"][0]["data"]["label"] == "v1"
+    assert payload == {"x": 1}
+    assert db.get(WorkflowRun, queued_run).status == "running"
+
+
+def test_claim_fails_run_whose_version_is_gone(db, queued_run):
+    db.query(WorkflowRun).filter_by(id=queued_run).update({"workflow_version": 7})
+    db.commit()
+    assert runs._claim(queued_run) is None
+    db.expire_all()
+    run = db.get(WorkflowRun, queued_run)
+    assert run.status == "failed"
+    assert "no longer exists" in run.error
@@ -0,0 +1,88 @@
+import pytest
+
+from app.services.search import build_match_query
+
+
+def _graph(name: str, label: str = "Start") -> dict:
+    nodes = [
+        {"id": "node_1", "type": "start", "position": {"x": 0, "y": 0}, "data": {"label": label}},
+        {"id": "node_2", "type": "end", "position": {"x": 260, "y": 0}, "data": {"label": "End"}},
+    ]
+    edges = [{"id": "edge_1", "source": "node_1", "target": "node_2"}]
+    return {"id": "x", "name": name, "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": edges}
+
+
+def _create(client, headers, name: str, label: str = "Start", is_template: bool = False) -> str:
+    payload = {"name": name, "is_template": is_template, "data": _graph(name, label)}
+    return client.post("/api/workflows", json=payload, headers=headers).json()["id"]
+
+
+def _search(client, headers, q: str, **params) -> list[str]:
+    response = client.get("/api/workflows/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [hit["id"] for hit in response.json()]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("invoice", '"invoice"*'),
+        ("Send invoice", '"Send"* "invoice"*'),
+        ('name:foo OR "bar" NEAR(baz) -qux*', '"name"* "foo"* "OR"* "bar"* "NEAR"* "baz"* "qux"*'),
+        ('"', None),
+        ("  ()*^:-  ", None),
+    ],
+)
+def test_build_match_query_strips_operators_and_quotes(query, expected):
+    assert build_match_query(query) == expected
+
+
+def test_build_match_query_caps_token_count():
+    assert build_match_query(" ".join(f"w{idx}" for idx in range(40))).count("*") == 16
+
+
+def test_workflow_is_indexed_on_create(client, auth):
+    workflow_id = _create(client, auth, "Invoice flow", label="Send reminder")
+    assert _search(client, auth, "invoice") == [workflow_id]
+    assert _search(client, auth, "remind") == [workflow_id]
+    hit = client.get("/api/workflows/search", params={"q": "invoice"}, headers=auth).json()[0]
+    assert "[Invoice]" in hit["match"]
+
+
+def test_rename_and_graph_patch_update_the_index(client, auth):
+    workflow_id = _create(client, auth, "Invoice flow")
+    client.patch(f"/api/workflows/{workflow_id}", json={"name": "Billing flow"}, headers=auth)
+    assert _search(client, auth, "invoice") == []
+    assert _search(client, auth, "billing") == [workflow_id]
+
+    op = {"op": "replace", "path": "/nodes/0/data/label", "value": "Escalate"}
+    response = client.patch(f"/api/workflows/{workflow_id}/graph", json={"ops": [op]}, headers=auth)
+    assert response.status_code == 200
+    assert _search(client, auth, "escalate") == [workflow_id]
+    assert _search(client, auth, "start") == []
+
+
+def test_soft_delete_removes_the_entry(client, auth):
+    workflow_id = _create(client, auth, "Invoice flow")
+    kept = _create(client, auth, "Invoice archive")
+    assert client.delete(f"/api/workflows/{workflow_id}", headers=auth).status_code == 200
+    assert _search(client, auth, "invoice") == [kept]
+
+
+def test_owner_and_template_filters(client, auth, other_auth, admin_auth):
+    mine = _create(client, auth, "Invoice flow")
+    template = _create(client, auth, "Invoice template", is_template=True)
+    theirs = _create(client, other_auth, "Invoice other")
+    assert sorted(_search(client, auth, "invoice")) == sorted([mine, template])
+    assert _search(client, other_auth, "invoice") == [theirs]
+    assert sorted(_search(client, admin_auth, "invoice")) == sorted([mine, template, theirs])
+    assert _search(client, auth, "invoice", templates="only") == [template]
+    assert _search(client, auth, "invoice", templates="exclude") == [mine]
+
+
+def test_search_pages_with_offset_cursor(client, auth):
+    ids = {_create(client, auth, f"Invoice {idx}") for idx in range(3)}
+    first = client.get("/api/workflows/search", params={"q": "invoice", "limit": 2}, headers=auth)
+    assert len(first.json()) == 2 and first.headers["X-Next-Cursor"] == "2"
+    rest = _search(client, auth, "invoice", limit=2, cursor="2")
+    assert {hit["id"] for hit in first.json()} | set(rest) == ids
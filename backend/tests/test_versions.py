@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.workflow import Workflow
+from app.models.workflow_version import WorkflowVersion
+from app.services.versions import DELTA, SNAPSHOT, materialize_version, record_version
+
+
+def _document(version: int) -> dict:
+    nodes = [
+        {"id": f"node_{idx}", "type": "task", "position": {"x": idx * 260, "y": 0}, "data": {"label": f"Step {idx}"}}
+        for idx in range(1, 20)
+    ]
+    nodes[version % len(nodes)]["data"]["label"] = f"Edited in v{version}"
+    header = {"id": "wf", "name": f"Workflow v{version}", "updatedAt": f"2026-01-{version:02d}"}
+    return {**header, "nodes": nodes, "edges": []}
+
+
+@pytest.fixture
+def history(db, user, monkeypatch):
+    """A workflow with versions 1..10 recorded the way saves do, with a snapshot every 4 versions."""
+    monkeypatch.setattr(settings, "WORKFLOW_VERSION_SNAPSHOT_INTERVAL", 4)
+    workflow = Workflow(owner_id=user.id, name="wf", version=1, data_json=json.dumps(_document(1)))
+    db.add(workflow)
+    db.flush()
+    record_version(db, workflow, _document(1))
+    for version in range(2, 11):
+        workflow.version = version
+        workflow.data_json = json.dumps(_document(version))
+        record_version(db, workflow, _document(version), previous=_document(version - 1))
+    db.commit()
+    return workflow
+
+
+def test_snapshots_are_written_at_the_interval(db, history):
+    kinds = dict(db.query(WorkflowVersion.version, WorkflowVersion.kind).filter_by(workflow_id=history.id).all())
+    assert [version for version, kind in sorted(kinds.items()) if kind == SNAPSHOT] == [1, 5, 9]
+    assert all(kinds[version] == DELTA for version in (2, 3, 4, 6, 7, 8, 10))
+
+
+@pytest.mark.parametrize("version", range(1, 11))
+def test_materialize_version_across_snapshot_boundaries(db, history, version):
+    assert materialize_version(db, history.id, version) == _document(version)
+
+
+def test_materialize_missing_version_returns_none(db, history):
+    assert materialize_version(db, history.id, 11) is None
+    assert materialize_version(db, "missing", 1) is None
+
+
+def test_materialize_reports_broken_chain(db, history):
+    db.query(WorkflowVersion).filter_by(workflow_id=history.id, version=6).delete()
+    db.commit()
+    with pytest.raises(ValueError, match="broken"):
+        materialize_version(db, history.id, 7)
+
+
+def test_delta_not_smaller_than_document_is_stored_as_snapshot(db, user, monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_VERSION_SNAPSHOT_INTERVAL", 100)
+    small = {"id": "w", "name": "a", "updatedAt": "1", "nodes": [], "edges": []}
+    workflow = Workflow(owner_id=user.id, name="w", version=2, data_json=json.dumps(small))
+    db.add(workflow)
+    db.flush()
+    entry = record_version(db, workflow, small, previous={**small, "nodes": [{"id": "n"}]})
+    assert entry.kind == SNAPSHOT
+
+
+def _graph() -> dict:
+    nodes = [
+        {"id": f"node_{idx}", "type": "task", "position": {"x": idx * 260, "y": 0}, "data": {"label": f"Step {idx}"}}
+        for idx in range(1, 20)
+    ]
+    return {"id": "x", "name": "wf", "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": []}
+
+
+def _stored_versions(workflow_id: str) -> dict[int, WorkflowVersion]:
+    db = SessionLocal()
+    try:
+        return {row.version: row for row in db.query(WorkflowVersion).filter_by(workflow_id=workflow_id)}
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def edited(client, auth):
+    """A workflow at version 7: created, then six single-label graph patches."""
+    workflow_id = client.post("/api/workflows", json={"name": "wf", "data": _graph()}, headers=auth).json()["id"]
+    for version in range(2, 8):
+        op = {"op": "replace", "path": f"/nodes/{version}/data/label", "value": f"Edited in v{version}"}
+        response = client.patch(f"/api/workflows/{workflow_id}/graph", json={"ops": [op]}, headers=auth)
+        assert response.json()["version"] == version
+    return workflow_id
+
+
+def test_version_list_pages_by_keyset(client, auth, edited):
+    url = f"/api/workflows/{edited}/versions"
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={"limit": 3, **({"cursor": cursor} if cursor else {})}, headers=auth)
+        pages.append([item["version"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert pages == [[7, 6, 5], [4, 3, 2], [1]]
+    assert [item["version"] for item in client.get(url, params={"cursor": 3}, headers=auth).json()] == [2, 1]
+
+
+def test_get_version_materializes_a_delta_chain(client, auth, edited):
+    stored = _stored_versions(edited)
+    assert stored[1].kind == SNAPSHOT and all(stored[version].kind == DELTA for version in range(2, 8))
+    data = client.get(f"/api/workflows/{edited}/versions/4", headers=auth).json()["data"]
+    labels = [node["data"]["label"] for node in data["nodes"][:6]]
+    assert labels == ["Step 1", "Step 2", "Edited in v2", "Edited in v3", "Edited in v4", "Step 6"]
+    assert client.get(f"/api/workflows/{edited}/versions/8", headers=auth).status_code == 404
+
+
+def test_restore_records_a_new_version(client, auth, other_auth, edited):
+    assert client.post(f"/api/workflows/{edited}/versions/3/restore", headers=other_auth).status_code == 404
+    assert client.post(f"/api/workflows/{edited}/versions/99/restore", headers=auth).status_code == 404
+    response = client.post(f"/api/workflows/{edited}/versions/3/restore", headers=auth)
+    assert response.status_code == 200 and response.json()["version"] == 8
+    restored = client.get(f"/api/workflows/{edited}/versions/8", headers=auth).json()["data"]
+    original = client.get(f"/api/workflows/{edited}/versions/3", headers=auth).json()["data"]
+    assert restored["nodes"] == original["nodes"] == response.json()["data"]["nodes"]
+    stored = _stored_versions(edited)
+    assert sorted(stored) == list(range(1, 9))
+    assert stored[8].kind == DELTA and stored[8].base_version == 7
@@ -0,0 +1,153 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+
+import app.services.webhooks as webhooks_module
+from app.core.config import settings
+from app.db.session import engine
+from app.services.webhooks import webhooks
+
+
+def _graph(**trigger) -> dict:
+    nodes = [
+        {"id": "node_1", "type": "webhook_trigger", "position": {"x": 0, "y": 0}, "data": {"label": "Hook", **trigger}},
+        {"id": "node_2", "type": "end", "position": {"x": 260, "y": 0}, "data": {"label": "End"}},
+    ]
+    edges = [{"id": "edge_1", "source": "node_1", "target": "node_2"}]
+    return {"id": "x", "name": "hook", "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": edges}
+
+
+def _create(client, headers, **trigger) -> str:
+    return client.post("/api/workflows", json={"name": "hook", "data": _graph(**trigger)}, headers=headers).json()["id"]
+
+
+def _wait(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def small_queue(monkeypatch):
+    # Must come before the client fixture: the queue is sized when the service starts.
+    monkeypatch.setattr(settings, "WEBHOOK_QUEUE_SIZE", 2)
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Hold the writer inside its first write until released, recording each batch size."""
+
+    class Gate:
+        started = threading.Event()
+        release = threading.Event()
+        sizes: list[int] = []
+
+    persist = webhooks_module._persist
+
+    def gated(batch):
+        Gate.sizes.append(len(batch))
+        Gate.started.set()
+        Gate.release.wait(5)
+        return persist(batch)
+
+    monkeypatch.setattr(webhooks_module, "_persist", gated)
+    yield Gate
+    Gate.release.set()
+
+
+def test_secret_is_checked(client, auth):
+    workflow_id = _create(client, auth, secret="s3cret")
+    url = f"/api/hooks/{workflow_id}/node_1"
+    assert client.post(url, json={}).status_code == 401
+    assert client.post(url, json={}, headers={"X-Webhook-Secret": "wrong"}).status_code == 401
+    assert client.post(url, json={}, headers={"X-Webhook-Secret": "s3cret"}).status_code == 202
+    assert client.post(f"/api/hooks/{workflow_id}/node_2", json={}).status_code == 404
+
+
+def test_check_secret_without_a_secret():
+    assert webhooks.check_secret({"secret": None}, None)
+    assert not webhooks.check_secret({"secret": "x"}, None)
+    assert webhooks.check_secret({"secret": "x"}, "x")
+
+
+def test_full_queue_answers_429(small_queue, client, auth, gate):
+    workflow_id = _create(client, auth)
+    url = f"/api/hooks/{workflow_id}/node_1"
+    rejected = webhooks.rejected
+    assert client.post(url, json={"i": 0}).status_code == 202
+    assert gate.started.wait(5)
+    # The writer is stuck on the first event; two more fill the queue and the next one is turned away.
+    assert [client.post(url, json={"i": i}).status_code for i in range(1, 4)] == [202, 202, 429]
+    response = client.post(url, json={"i": 4})
+    assert response.status_code == 429 and response.headers["retry-after"] == "1"
+    assert webhooks.rejected == rejected + 2
+    gate.release.set()
+    _wait(lambda: webhooks.stats()["queued"] == 0 and len(gate.sizes) == 2)
+    assert gate.sizes == [1, 2]
+
+
+def test_queued_events_are_persisted_in_one_insert(client, auth, gate):
+    workflow_id = _create(client, auth)
+    url = f"/api/hooks/{workflow_id}/node_1"
+    persisted, batches = webhooks.persisted, webhooks.batches
+    assert client.post(url, json={"i": 0}).status_code == 202
+    assert gate.started.wait(5)
+    assert all(client.post(url, json={"i": i}).status_code == 202 for i in range(1, 6))
+    inserts = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO webhook_events"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        gate.release.set()
+        _wait(lambda: webhooks.persisted == persisted + 6)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert gate.sizes == [1, 5]
+    assert webhooks.batches == batches + 2 and len(inserts) == 2
+    events = client.get(f"/api/hooks/{workflow_id}/events", headers=auth).json()
+    assert sorted(item["payload"]["i"] for item in events) == list(range(6))
+
+
+def test_failed_writes_are_retried_with_backoff(client, auth, monkeypatch):
+    workflow_id = _create(client, auth)
+    persist = webhooks_module._persist
+    calls = []
+
+    def flaky(batch):
+        calls.append(time.monotonic())
+        if len(calls) <= 2:
+            raise RuntimeError("database is locked")
+        return persist(batch)
+
+    monkeypatch.setattr(webhooks_module, "_persist", flaky)
+    monkeypatch.setattr(webhooks_module, "WRITE_BACKOFF_SECONDS", 0.05)
+    failures, persisted = webhooks.write_failures, webhooks.persisted
+    assert client.post(f"/api/hooks/{workflow_id}/node_1", json={"x": 1}).status_code == 202
+    _wait(lambda: webhooks.persisted == persisted + 1)
+    assert webhooks.write_failures == failures + 2 and len(calls) == 3
+    # The delay doubles between attempts.
+    assert calls[1] - calls[0] >= 0.05 and calls[2] - calls[1] >= 0.1
+    events = client.get(f"/api/hooks/{workflow_id}/events", headers=auth).json()
+    assert [item["payload"] for item in events] == [{"x": 1}]
+
+
+def test_batch_that_keeps_failing_is_dropped(client, auth, monkeypatch):
+    workflow_id = _create(client, auth)
+
+    def broken(batch):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(webhooks_module, "_persist", broken)
+    monkeypatch.setattr(webhooks_module, "WRITE_ATTEMPTS", 2)
+    monkeypatch.setattr(webhooks_module, "WRITE_BACKOFF_SECONDS", 0.01)
+    dropped, failures = webhooks.dropped, webhooks.write_failures
+    assert client.post(f"/api/hooks/{workflow_id}/node_1", json={}).status_code == 202
+    _wait(lambda: webhooks.dropped == dropped + 1)
+    assert webhooks.write_failures == failures + 2
+    assert client.get(f"/api/hooks/{workflow_id}/events", headers=auth).json() == []
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+
+def _graph(name: str) -> dict:
+    nodes = [
+        {"id": "node_1", "type": "start", "position": {"x": 0, "y": 0}, "data": {"label": "Start"}},
+        {
+            "id": "node_2",
+            "type": "http_request",
+            "position": {"x": 260.5, "y": -10},
+            "data": {"label": "Call \"API\" ✓", "url": "https://example.com", "headers": {"X": "1"}},
+        },
+        {"id": "node_3", "type": "end", "position": {"x": 520, "y": 0}, "data": {"label": "End", "color": None}},
+    ]
+    edges = [
+        {"id": "edge_1", "source": "node_1", "target": "node_2"},
+        {"id": "edge_2", "source": "node_2", "target": "node_3", "sourceHandle": "default"},
+    ]
+    return {"id": "x", "name": name, "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": edges}
+
+
+@pytest.fixture
+def workflows(client, auth):
+    ids = []
+    for idx in range(3):
+        payload = {"name": f"wf {idx}", "description": "ünïcode" if idx else None, "data": _graph(f"wf {idx}")}
+        ids.append(client.post("/api/workflows", json=payload, headers=auth).json()["id"])
+    return ids
+
+
+def _both(client, auth, url: str, params: dict | None = None):
+    params = params or {}
+    parsed = client.get(url, params=params, headers=auth)
+    raw = client.get(url, params={**params, "raw": "true"}, headers=auth)
+    assert parsed.status_code == raw.status_code == 200
+    assert raw.headers["content-type"] == "application/json"
+    assert json.loads(raw.content) == parsed.json()
+    return parsed, raw
+
+
+def test_raw_workflow_matches_parsed(client, auth, workflows):
+    _both(client, auth, f"/api/workflows/{workflows[0]}")
+
+
+def test_raw_unpaged_list_matches_parsed(client, auth, workflows):
+    parsed, raw = _both(client, auth, "/api/workflows")
+    assert len(parsed.json()) == 3
+    assert "X-Next-Cursor" not in raw.headers
+
+
+def test_raw_paged_list_matches_parsed_and_keeps_cursor(client, auth, workflows):
+    parsed, raw = _both(client, auth, "/api/workflows", {"limit": 2})
+    assert len(parsed.json()) == 2
+    assert raw.headers["X-Next-Cursor"] == parsed.headers["X-Next-Cursor"]
+    params = {"limit": 2, "cursor": raw.headers["X-Next-Cursor"]}
+    parsed, raw = _both(client, auth, "/api/workflows", params)
+    assert [item["id"] for item in parsed.json()] == [workflows[0]]
+    assert "X-Next-Cursor" not in raw.headers
+
+
+def test_raw_list_after_graph_edit(client, auth, workflows):
+    graph = _graph("edited")
+    graph["nodes"][1]["data"]["label"] = "Edited"
+    client.patch(f"/api/workflows/{workflows[1]}", json={"data": graph}, headers=auth)
+    _both(client, auth, "/api/workflows")
@@ -0,0 +1,91 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.api.routes.workflows import DEFAULT_PAGE_SIZE
+from app.db.session import SessionLocal, engine
+from app.models.workflow import Workflow
+
+
+def _graph(name: str) -> dict:
+    nodes = [
+        {"id": "node_1", "type": "start", "position": {"x": 0, "y": 0}, "data": {"label": "Start"}},
+        {"id": "node_2", "type": "end", "position": {"x": 260, "y": 0}, "data": {"label": "End"}},
+    ]
+    edges = [{"id": "edge_1", "source": "node_1", "target": "node_2"}]
+    return {"id": "x", "name": name, "updatedAt": "2026-01-01T00:00:00", "nodes": nodes, "edges": edges}
+
+
+def _create(client, headers, count: int, same_updated_at: bool = False) -> list[str]:
+    ids = []
+    for idx in range(count):
+        payload = {"name": f"wf {idx}", "data": _graph(f"wf {idx}")}
+        ids.append(client.post("/api/workflows", json=payload, headers=headers).json()["id"])
+    if same_updated_at:
+        db = SessionLocal()
+        db.query(Workflow).filter(Workflow.id.in_(ids)).update({"updated_at": datetime(2026, 1, 1)})
+        db.commit()
+        db.close()
+    return ids
+
+
+def _pages(client, headers, limit: int) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/workflows", params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip(client, auth):
+    ids = _create(client, auth, 5)
+    pages = _pages(client, auth, 2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [item for page in pages for item in page] == ids[::-1]
+
+
+def test_cursor_is_stable_when_updated_at_ties(client, auth):
+    ids = _create(client, auth, 7, same_updated_at=True)
+    pages = _pages(client, auth, 3)
+    assert [item for page in pages for item in page] == sorted(ids, reverse=True)
+
+
+def test_malformed_cursor_is_rejected(client, auth):
+    for cursor in ("not-base64!", base64.urlsafe_b64encode(b"no separator").decode(), "@@"):
+        response = client.get("/api/workflows", params={"cursor": cursor}, headers=auth)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_unpaged_listing(client, auth, admin_auth, monkeypatch):
+    monkeypatch.setattr("app.api.routes.workflows.DEFAULT_PAGE_SIZE", 2)
+    _create(client, auth, 3)
+    response = client.get("/api/workflows", headers=auth)
+    assert len(response.json()) == 3 and "X-Next-Cursor" not in response.headers
+    # Admins see everyone's workflows and get the default page size.
+    response = client.get("/api/workflows", headers=admin_auth)
+    assert len(response.json()) == 2 and "X-Next-Cursor" in response.headers
+    assert DEFAULT_PAGE_SIZE == 50
+
+
+def test_summary_never_loads_data_json(client, auth):
+    _create(client, auth, 2)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/api/workflows", params={"fields": "summary"}, headers=auth)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code == 200
+    assert len(response.json()) == 2 and all("data" not in item for item in response.json())
+    listing = [statement for statement in statements if "FROM workflows" in statement]
+    assert listing and not any("data_json" in statement for statement in listing)